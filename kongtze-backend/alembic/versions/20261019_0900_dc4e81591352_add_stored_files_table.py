@@ -0,0 +1,36 @@
+"""add_stored_files_table
+
+Revision ID: dc4e81591352
+Revises: d22aa8e43ca2
+Create Date: 2026-10-19 09:00:12.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dc4e81591352'
+down_revision: Union[str, None] = 'd22aa8e43ca2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stored_files',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('storage_path', sa.String(length=500), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('ocr_text', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash'),
+        sa.UniqueConstraint('storage_path')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stored_files')
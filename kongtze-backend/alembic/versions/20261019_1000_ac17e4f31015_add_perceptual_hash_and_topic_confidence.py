@@ -0,0 +1,30 @@
+"""add_perceptual_hash_and_topic_confidence
+
+Revision ID: ac17e4f31015
+Revises: dc4e81591352
+Create Date: 2026-10-19 10:00:41.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac17e4f31015'
+down_revision: Union[str, None] = 'dc4e81591352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stored_files', sa.Column('perceptual_hash', sa.String(length=16), nullable=True))
+    op.create_index(op.f('ix_stored_files_perceptual_hash'), 'stored_files', ['perceptual_hash'], unique=False)
+    op.add_column('topics', sa.Column('confidence', sa.Float(), nullable=False, server_default='1.0'))
+
+
+def downgrade() -> None:
+    op.drop_column('topics', 'confidence')
+    op.drop_index(op.f('ix_stored_files_perceptual_hash'), table_name='stored_files')
+    op.drop_column('stored_files', 'perceptual_hash')
@@ -0,0 +1,32 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 5b2e9c7d4a18
+Revises: ac17e4f31015
+Create Date: 2026-10-19 11:00:27.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c7d4a18'
+down_revision: Union[str, None] = 'ac17e4f31015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tests_user_created_at', 'tests', ['user_id', 'created_at', 'test_id'], unique=False)
+    op.create_index('ix_test_results_user_submitted_at', 'test_results', ['user_id', 'submitted_at', 'result_id'], unique=False)
+    op.create_index('ix_homework_user_uploaded_at', 'homework', ['user_id', 'uploaded_at', 'homework_id'], unique=False)
+    op.create_index('ix_class_notes_user_uploaded_at', 'class_notes', ['user_id', 'uploaded_at', 'note_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_class_notes_user_uploaded_at', table_name='class_notes')
+    op.drop_index('ix_homework_user_uploaded_at', table_name='homework')
+    op.drop_index('ix_test_results_user_submitted_at', table_name='test_results')
+    op.drop_index('ix_tests_user_created_at', table_name='tests')
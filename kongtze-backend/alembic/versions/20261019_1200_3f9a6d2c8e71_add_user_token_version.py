@@ -0,0 +1,26 @@
+"""add_user_token_version
+
+Revision ID: 3f9a6d2c8e71
+Revises: 5b2e9c7d4a18
+Create Date: 2026-10-19 12:00:12.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6d2c8e71'
+down_revision: Union[str, None] = '5b2e9c7d4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,43 @@
+"""add_student_parent_and_pin_index
+
+Revision ID: 8c41e7b05d3a
+Revises: 3f9a6d2c8e71
+Create Date: 2026-10-19 13:00:48.116204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e7b05d3a'
+down_revision: Union[str, None] = '3f9a6d2c8e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_users_parent_id_users', 'users', 'users', ['parent_id'], ['user_id'])
+    op.create_index('uq_users_pin_parent_id', 'users', ['pin', 'parent_id'], unique=True)
+    # Nothing records which parent created an existing student, so they keep
+    # parent_id NULL and log in by PIN alone. Their PINs were globally unique
+    # until now; this index keeps them so, since (pin, parent_id) treats NULLs
+    # as distinct
+    op.create_index(
+        'uq_users_pin_legacy',
+        'users',
+        ['pin'],
+        unique=True,
+        postgresql_where=sa.text('parent_id IS NULL AND pin IS NOT NULL'),
+        sqlite_where=sa.text('parent_id IS NULL AND pin IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_users_pin_legacy', table_name='users')
+    op.drop_index('uq_users_pin_parent_id', table_name='users')
+    op.drop_constraint('fk_users_parent_id_users', 'users', type_='foreignkey')
+    op.drop_column('users', 'parent_id')
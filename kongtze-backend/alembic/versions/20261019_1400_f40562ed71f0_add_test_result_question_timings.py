@@ -0,0 +1,101 @@
+"""add_test_result_question_timings
+
+Revision ID: f40562ed71f0
+Revises: 8c41e7b05d3a
+Create Date: 2026-10-19 14:00:12.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f40562ed71f0'
+down_revision: Union[str, None] = '8c41e7b05d3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+test_results = sa.table(
+    'test_results',
+    sa.column('result_id', sa.Integer),
+    sa.column('test_id', sa.Integer),
+    sa.column('answers', sa.JSON),
+    sa.column('question_timings', sa.JSON),
+)
+questions = sa.table(
+    'questions',
+    sa.column('question_id', sa.Integer),
+    sa.column('test_id', sa.Integer),
+    sa.column('question_order', sa.Integer),
+    sa.column('correct_answer', sa.String),
+)
+
+
+def _backfill_question_timings(conn) -> None:
+    """Correctness per question from stored answers; old results have no times"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(test_results.c.result_id, test_results.c.test_id, test_results.c.answers)
+            .where(test_results.c.result_id > last_id)
+            .order_by(test_results.c.result_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].result_id
+
+        questions_by_test = {}
+        for question in conn.execute(
+            sa.select(questions.c.question_id, questions.c.test_id, questions.c.correct_answer)
+            .where(questions.c.test_id.in_({row.test_id for row in rows}))
+            .order_by(questions.c.test_id, questions.c.question_order)
+        ):
+            questions_by_test.setdefault(question.test_id, []).append(question)
+
+        updates = []
+        for row in rows:
+            test_questions = questions_by_test.get(row.test_id)
+            if not test_questions:
+                continue
+            answers = row.answers or {}
+            updates.append({
+                'target_id': row.result_id,
+                'timings': {
+                    'question_ids': [q.question_id for q in test_questions],
+                    'correct': [int(answers.get(str(q.question_id)) == q.correct_answer) for q in test_questions],
+                    'seconds': None,
+                },
+            })
+        if updates:
+            conn.execute(
+                test_results.update()
+                .where(test_results.c.result_id == sa.bindparam('target_id'))
+                .values(question_timings=sa.bindparam('timings', type_=sa.JSON)),
+                updates,
+            )
+
+
+def upgrade() -> None:
+    op.add_column('test_results', sa.Column('question_count', sa.Integer(), nullable=True))
+    op.add_column('test_results', sa.Column('question_timings', sa.JSON(), nullable=True))
+
+    # Questions actually stored for the test; tests.total_questions if none were
+    op.execute(
+        """
+        UPDATE test_results SET question_count = COALESCE(
+            NULLIF((SELECT COUNT(*) FROM questions WHERE questions.test_id = test_results.test_id), 0),
+            (SELECT total_questions FROM tests WHERE tests.test_id = test_results.test_id)
+        )
+        """
+    )
+    _backfill_question_timings(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_column('test_results', 'question_timings')
+    op.drop_column('test_results', 'question_count')
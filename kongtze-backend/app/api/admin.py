@@ -0,0 +1,103 @@
+"""Admin diagnostics routes for Kongtze API"""
+
+import os
+import threading
+import time
+from typing import Literal
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.core.config import settings
+from app.core.profiling import ProfilerBusyError, dump_tasks, sampling_profiler
+from app.core.slow_queries import slow_query_log
+from app.models.user import User
+from app.api.deps import get_current_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    all_threads: bool = False,
+    current_user: User = Depends(get_current_admin),
+) -> Response:
+    """
+    Sample this worker's stacks for a while and return them collapsed.
+
+    The sampler runs in a background thread while the event loop keeps
+    serving requests. The response can be fed to flamegraph.pl or opened
+    in speedscope.
+
+    - **seconds**: How long to sample (up to PROFILE_MAX_SECONDS)
+    - **interval_ms**: Milliseconds between samples
+    - **all_threads**: Also sample worker threads (bcrypt, image processing)
+    """
+    if seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {settings.PROFILE_MAX_SECONDS}",
+        )
+
+    # This handler runs on the event loop thread, which is the one to watch
+    thread_ids = None if all_threads else {threading.get_ident()}
+    try:
+        stacks = await anyio.to_thread.run_sync(
+            sampling_profiler.sample, seconds, interval_ms / 1000, thread_ids
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    filename = f"profile-{os.getpid()}-{int(time.time())}.collapsed"
+    return Response(
+        content=sampling_profiler.render(stacks),
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(sum(stacks.values())),
+        },
+    )
+
+
+@router.get("/tasks")
+async def get_task_dump(
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    List the asyncio tasks pending on this worker and what each awaits.
+
+    Each task's await chain is followed down to the innermost frame and
+    classified as db, gemini, http, file_io, thread or other.
+    """
+    return {"pid": os.getpid(), **dump_tasks()}
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: Literal["total", "max", "count"] = "total",
+    current_user: User = Depends(get_current_admin),
+):
+    """
+    Slowest normalized statements seen by this worker.
+
+    Each entry has execution counts and timings, bound-parameter types,
+    the routes and source lines that issued it, and the latest sampled
+    EXPLAIN plan. Requires SLOW_QUERY_LOG to be enabled.
+
+    - **order_by**: Rank by total time, worst single execution, or count
+    """
+    return {
+        "enabled": settings.SLOW_QUERY_LOG,
+        "threshold_ms": slow_query_log.threshold_ms,
+        "statements": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    current_user: User = Depends(get_current_admin),
+):
+    """Clear this worker's slow-query log"""
+    slow_query_log.reset()
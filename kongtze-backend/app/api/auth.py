@@ -7,7 +7,7 @@ from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import PasswordHasherBusyError, password_hasher, create_access_token
 from app.models.user import User
 from app.schemas.user import (
     UserCreateParent,
@@ -22,6 +22,30 @@ from app.services.student_profile_service import student_profile_service
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login attempts in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _hash_password(password: str) -> str:
+    """Hash a password off the event loop, shedding load when saturated"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusyError:
+        raise _busy_exception()
+
+
+async def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop, shedding load when saturated"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusyError:
+        raise _busy_exception()
+
+
 @router.post("/register/parent", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register_parent(
     user_data: UserCreateParent,
@@ -50,7 +74,7 @@ async def register_parent(
     new_user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await _hash_password(user_data.password),
         is_parent=True,
     )
 
@@ -60,7 +84,7 @@ async def register_parent(
 
     # Create access token
     access_token = create_access_token(
-        data={"user_id": new_user.user_id, "is_parent": True},
+        data={"user_id": new_user.user_id, "is_parent": True, "ver": new_user.token_version},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
@@ -79,9 +103,12 @@ async def register_student(
     - **name**: Student's name
     - **pin**: 4-digit PIN for student login
     """
-    # Check if PIN already exists
+    # PINs only need to be unique within the family
     result = await db.execute(
-        select(User).where(User.pin == user_data.pin)
+        select(User.user_id).where(
+            User.pin == user_data.pin,
+            User.parent_id == current_parent.user_id,
+        )
     )
     existing_user = result.scalar_one_or_none()
 
@@ -95,6 +122,7 @@ async def register_student(
     new_student = User(
         name=user_data.name,
         pin=user_data.pin,
+        parent_id=current_parent.user_id,
         is_parent=False,
     )
 
@@ -125,6 +153,8 @@ async def login(
 
     For student login:
     - **pin**: Student's 4-digit PIN
+    - **family_id**: The parent's user ID (required for students created by
+      a parent; omitted only by students from before families)
     """
     user = None
 
@@ -141,7 +171,7 @@ async def login(
                 detail="Invalid email or password",
             )
 
-        if not verify_password(credentials.password, user.password_hash):
+        if not await _verify_password(credentials.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
@@ -149,9 +179,15 @@ async def login(
 
     # Student login
     elif credentials.pin:
-        result = await db.execute(
-            select(User).where(User.pin == credentials.pin)
-        )
+        # Students created in a family log in with its family_id; the PIN alone
+        # only matches students from before families, whose PINs are globally
+        # unique. Either lookup is one probe of a unique index
+        query = select(User).where(User.pin == credentials.pin)
+        if credentials.family_id is not None:
+            query = query.where(User.parent_id == credentials.family_id)
+        else:
+            query = query.where(User.parent_id.is_(None))
+        result = await db.execute(query)
         user = result.scalar_one_or_none()
 
         if not user or user.is_parent:
@@ -168,7 +204,7 @@ async def login(
 
     # Create access token
     access_token = create_access_token(
-        data={"user_id": user.user_id, "is_parent": user.is_parent},
+        data={"user_id": user.user_id, "is_parent": user.is_parent, "ver": user.token_version},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
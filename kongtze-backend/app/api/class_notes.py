@@ -1,26 +1,32 @@
 """Class notes routes for Kongtze API"""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, bulk_insert_returning
+from app.core.responses import FastJSONResponse
 from app.models.class_note import ClassNote
 from app.models.topic import Topic
 from app.models.subject import Subject
 from app.models.user import User
 from app.schemas.class_note import ClassNoteResponse, ClassNoteWithTopics, ClassNoteUpdate
 from app.api.deps import get_current_user
-from app.services.ocr_service import ocr_service
+from app.api.pagination import PageParams, page_params, paginate, page_response
 from app.services.ai_service import ai_service
-from app.services.file_storage import file_storage
+from app.services.file_storage import file_storage, UploadTooLargeError
+from app.services.image_upload import image_upload_service
+from app.services.perceptual_hash import perceptual_hash_index
+from app.services.image_derivatives import image_derivative_service
 
 router = APIRouter(prefix="/class-notes", tags=["Class Notes"])
 
 
 @router.post("", response_model=ClassNoteWithTopics, status_code=status.HTTP_201_CREATED)
 async def upload_class_note(
+    background_tasks: BackgroundTasks,
     subject_id: int = Form(...),
     title: str = Form(...),
     photo: UploadFile = File(...),
@@ -46,26 +52,28 @@ async def upload_class_note(
             detail="Subject not found",
         )
 
-    # Validate image file
-    file_content = await photo.read()
-    await photo.seek(0)  # Reset file pointer
-
-    is_valid = await ocr_service.validate_image(file_content)
-    if not is_valid:
+    # Store the photo and extract text, reusing identical or re-photographed pages
+    try:
+        upload = await image_upload_service.ingest(
+            photo, current_user.user_id, db, prefer_notes=True
+        )
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image is too large. Maximum size is {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB",
+        )
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image file. Please upload a valid image (JPG, PNG, etc.)",
         )
 
-    # Save file
-    relative_path, absolute_path = await file_storage.save_upload(
-        file=photo,
-        category="class_notes",
-        user_id=current_user.user_id,
-    )
+    relative_path = upload.relative_path
+    ocr_text = upload.ocr_text
 
-    # Extract text using OCR
-    ocr_text = await ocr_service.extract_text_from_image(absolute_path)
+    if settings.IMAGE_DERIVATIVES_ON_UPLOAD:
+        # Render thumbnails after the response is sent
+        background_tasks.add_task(image_derivative_service.generate_all, relative_path)
 
     # Create class note record
     new_note = ClassNote(
@@ -80,37 +88,51 @@ async def upload_class_note(
     await db.flush()
     await db.refresh(new_note)
 
+    perceptual_hash_index.add_after_commit(
+        db,
+        current_user.user_id,
+        upload.stored_file.perceptual_hash,
+        relative_path,
+        new_note.note_id,
+    )
+
+    # Reuse topics from an earlier photo of the same page
+    topic_data_list = []
+    if upload.match is not None and upload.match.note_id is not None:
+        result = await db.execute(
+            select(Topic.topic_name, Topic.confidence).where(
+                Topic.note_id == upload.match.note_id
+            )
+        )
+        topic_data_list = [
+            {"topic": topic_name, "confidence": confidence}
+            for topic_name, confidence in result.all()
+        ]
+
     # Extract topics using AI (if OCR text is available)
-    topics = []
-    if ocr_text and len(ocr_text) > 20:  # Only extract if sufficient text
-        ai_topics = await ai_service.extract_topics_from_notes(
+    if not topic_data_list and ocr_text and len(ocr_text) > 20:  # Only extract if sufficient text
+        topic_data_list = await ai_service.extract_topics_from_notes(
             ocr_text=ocr_text,
             subject=subject.display_name,
         )
 
-        # Create topic records
-        for topic_data in ai_topics:
-            topic = Topic(
-                note_id=new_note.note_id,
-                subject_id=subject_id,
-                topic_name=topic_data["topic"],
-                confidence=topic_data["confidence"],
-            )
-            db.add(topic)
-            topics.append(topic)
-
-        await db.flush()
+    # Create topic records in one INSERT ... RETURNING
+    topics = await bulk_insert_returning(db, Topic, [
+        {
+            "note_id": new_note.note_id,
+            "subject_id": subject_id,
+            "topic_name": topic_data["topic"],
+            "confidence": topic_data["confidence"],
+        }
+        for topic_data in topic_data_list
+    ])
 
-        # Refresh topics to get IDs
-        for topic in topics:
-            await db.refresh(topic)
+    from app.schemas.class_note import TopicResponse
 
     # Build response
     note_response = ClassNoteResponse.model_validate(new_note)
     topic_responses = [TopicResponse.model_validate(t) for t in topics]
 
-    from app.schemas.class_note import TopicResponse
-
     return ClassNoteWithTopics(
         **note_response.model_dump(),
         topics=topic_responses,
@@ -120,25 +142,27 @@ async def upload_class_note(
 @router.get("", response_model=List[ClassNoteResponse])
 async def get_class_notes(
     subject_id: int = None,
+    page: PageParams = Depends(page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[ClassNoteResponse]:
+) -> FastJSONResponse:
     """
-    Get all class notes for the current user, with optional subject filter.
+    Get class notes for the current user, newest first, with optional subject filter.
 
     - **subject_id**: Optional subject filter
+    - **limit** / **cursor**: Page size and the X-Next-Cursor of the previous page
+    - **fields**: Optional comma-separated fields to return
+    - **include_total**: Return the total count in X-Total-Count
     """
     query = select(ClassNote).where(ClassNote.user_id == current_user.user_id)
 
     if subject_id:
         query = query.where(ClassNote.subject_id == subject_id)
 
-    query = query.order_by(ClassNote.created_at.desc())
-
-    result = await db.execute(query)
-    notes = result.scalars().all()
-
-    return [ClassNoteResponse.model_validate(note) for note in notes]
+    result_page = await paginate(
+        db, query, page, ClassNote.uploaded_at, ClassNote.note_id, ClassNoteResponse
+    )
+    return page_response(result_page, ClassNoteResponse)
 
 
 @router.get("/{note_id}", response_model=ClassNoteWithTopics)
@@ -255,7 +279,7 @@ async def delete_class_note(
         )
 
     # Delete file from storage
-    file_storage.delete_file(note.photo_path)
+    await file_storage.delete_file(note.photo_path, db)
 
     # Delete topics (cascade)
     await db.execute(
@@ -1,89 +1,154 @@
 """Dependency injection utilities for FastAPI routes"""
 
+import secrets
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.services.user_cache import user_cache
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+# Same scheme for scrapers; missing credentials get a 401 from require_metrics_token
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """
-    Dependency to get the current authenticated user from JWT token.
-
-    Raises:
-        HTTPException: If token is invalid or user not found
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Verify and decode token
-    token = credentials.credentials
-    payload = verify_token(token)
 
+async def get_token_data(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TokenData:
+    """
+    Dependency to decode the JWT claims without touching the database.
+
+    Raises:
+        HTTPException: If the token is invalid or lacks required claims
+    """
+    payload = verify_token(credentials.credentials)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    # Extract user_id from token
-    user_id: Optional[int] = payload.get("user_id")
-    if user_id is None:
-        raise credentials_exception
+    try:
+        return TokenData(
+            user_id=payload.get("user_id"),
+            is_parent=payload.get("is_parent"),
+            token_version=payload.get("ver", 0),
+        )
+    except ValidationError:
+        raise _credentials_exception()
 
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
 
+async def _load_user(token_data: TokenData, db: AsyncSession) -> User:
+    """Resolve the token's user through the user cache"""
+    user = await user_cache.get(token_data.user_id, token_data.token_version, db)
     if user is None:
-        raise credentials_exception
-
+        raise _credentials_exception()
     return user
 
 
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token.
+
+    The user row is served from an in-process cache keyed by user ID and
+    token version, so most requests run no query here.
+
+    Raises:
+        HTTPException: If token is invalid, revoked, or user not found
+    """
+    return await _load_user(token_data, db)
+
+
 async def get_current_parent(
-    current_user: User = Depends(get_current_user),
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Dependency to ensure the current user is a parent.
 
+    The role is checked from the is_parent claim, so non-parents are
+    rejected without a database lookup.
+
     Raises:
-        HTTPException: If user is not a parent
+        HTTPException: If token is invalid or user is not a parent
     """
-    if not current_user.is_parent:
+    if not token_data.is_parent:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only parents can access this resource",
         )
-    return current_user
+    return await _load_user(token_data, db)
 
 
 async def get_current_student(
-    current_user: User = Depends(get_current_user),
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Dependency to ensure the current user is a student.
 
+    The role is checked from the is_parent claim, so parents are rejected
+    without a database lookup.
+
     Raises:
-        HTTPException: If user is not a student
+        HTTPException: If token is invalid or user is not a student
     """
-    if current_user.is_parent:
+    if token_data.is_parent:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only students can access this resource",
         )
+    return await _load_user(token_data, db)
+
+
+async def get_current_admin(
+    current_user: User = Depends(get_current_parent),
+) -> User:
+    """
+    Dependency to ensure the current user is an administrator.
+
+    Administrators are parents whose email is listed in ADMIN_EMAILS.
+
+    Raises:
+        HTTPException: If token is invalid or user is not an administrator
+    """
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can access this resource",
+        )
     return current_user
+
+
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> None:
+    """
+    Dependency to ensure a metrics scraper sent METRICS_TOKEN.
+
+    Raises:
+        HTTPException: 404 if METRICS_TOKEN is not configured, 401 if the
+            bearer token is missing or wrong
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise _credentials_exception()
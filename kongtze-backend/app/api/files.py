@@ -0,0 +1,168 @@
+"""Image serving routes for Kongtze API"""
+
+import os
+from typing import Literal, Optional
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+
+from app.core.database import get_db
+from app.core.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.models.class_note import ClassNote
+from app.models.gift import Gift
+from app.models.homework import Homework
+from app.models.user import User
+from app.api.deps import get_current_user
+from app.services.file_storage import file_storage
+from app.services.image_derivatives import image_derivative_service
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+ImageSize = Literal["sm", "md", "lg", "original"]
+
+MUTABLE_CACHE_CONTROL = "private, max-age=3600"
+
+MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+}
+
+
+def _etag(stat_result: os.stat_result) -> str:
+    """Strong validator from file modification time and size"""
+    return make_etag(stat_result.st_mtime_ns, stat_result.st_size)
+
+
+async def _serve_image(
+    request: Request,
+    relative_path: Optional[str],
+    size: ImageSize,
+) -> Response:
+    """Serve a stored image or one of its derivatives with cache validators"""
+    if not relative_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found",
+        )
+
+    try:
+        if size == "original":
+            path = file_storage.resolve_path(relative_path)
+            if path is None:
+                raise FileNotFoundError(relative_path)
+            media_type = MEDIA_TYPES.get(path.suffix.lower(), "application/octet-stream")
+        else:
+            path = await image_derivative_service.get_path(relative_path, size)
+            media_type = image_derivative_service.MEDIA_TYPE
+        stat_result = await anyio.Path(path).stat()
+    except (FileNotFoundError, ValueError):
+        # Missing file, or a stored file that cannot be decoded for resizing
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found",
+        )
+
+    etag = _etag(stat_result)
+    headers = cache_headers(
+        etag,
+        stat_result.st_mtime,
+        IMMUTABLE_CACHE_CONTROL
+        if file_storage.is_immutable(relative_path)
+        else MUTABLE_CACHE_CONTROL,
+    )
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return not_modified_response(headers)
+
+    # FileResponse handles Range requests and uses the server's
+    # http.response.pathsend (sendfile) extension when available
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat_result,
+    )
+
+
+@router.get("/homework/{homework_id}")
+async def get_homework_image(
+    homework_id: int,
+    request: Request,
+    size: ImageSize = "md",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """
+    Get a homework photo or thumbnail.
+
+    - **homework_id**: The homework ID
+    - **size**: sm (160px), md (480px), lg (1024px) or original
+    """
+    result = await db.execute(
+        select(Homework.photo_path).where(
+            and_(
+                Homework.homework_id == homework_id,
+                Homework.user_id == current_user.user_id,
+            )
+        )
+    )
+    return await _serve_image(request, result.scalar_one_or_none(), size)
+
+
+@router.get("/class-notes/{note_id}")
+async def get_class_note_image(
+    note_id: int,
+    request: Request,
+    size: ImageSize = "md",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """
+    Get a class note photo or thumbnail.
+
+    - **note_id**: The class note ID
+    - **size**: sm (160px), md (480px), lg (1024px) or original
+    """
+    result = await db.execute(
+        select(ClassNote.photo_path).where(
+            and_(
+                ClassNote.note_id == note_id,
+                ClassNote.user_id == current_user.user_id,
+            )
+        )
+    )
+    return await _serve_image(request, result.scalar_one_or_none(), size)
+
+
+@router.get("/gifts/{gift_id}")
+async def get_gift_image(
+    gift_id: int,
+    request: Request,
+    size: ImageSize = "md",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    """
+    Get a gift image or thumbnail.
+
+    - **gift_id**: The gift ID
+    - **size**: sm (160px), md (480px), lg (1024px) or original
+    """
+    result = await db.execute(
+        select(Gift.image_path).where(Gift.gift_id == gift_id)
+    )
+    return await _serve_image(request, result.scalar_one_or_none(), size)
@@ -1,24 +1,30 @@
 """Homework routes for Kongtze API"""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.responses import FastJSONResponse
 from app.models.homework import Homework
 from app.models.subject import Subject
 from app.models.user import User
 from app.schemas.homework import HomeworkResponse, HomeworkUpdate
 from app.api.deps import get_current_user, get_current_parent
-from app.services.ocr_service import ocr_service
-from app.services.file_storage import file_storage
+from app.api.pagination import PageParams, page_params, paginate, page_response
+from app.services.file_storage import file_storage, UploadTooLargeError
+from app.services.image_upload import image_upload_service
+from app.services.perceptual_hash import perceptual_hash_index
+from app.services.image_derivatives import image_derivative_service
 
 router = APIRouter(prefix="/homework", tags=["Homework"])
 
 
 @router.post("", response_model=HomeworkResponse, status_code=status.HTTP_201_CREATED)
 async def upload_homework(
+    background_tasks: BackgroundTasks,
     subject_id: int = Form(...),
     title: str = Form(...),
     photo: UploadFile = File(...),
@@ -44,26 +50,28 @@ async def upload_homework(
             detail="Subject not found",
         )
 
-    # Validate image file
-    file_content = await photo.read()
-    await photo.seek(0)  # Reset file pointer
-
-    is_valid = await ocr_service.validate_image(file_content)
-    if not is_valid:
+    # Store the photo and extract text, reusing identical or re-photographed pages
+    try:
+        upload = await image_upload_service.ingest(
+            photo, current_user.user_id, db
+        )
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image is too large. Maximum size is {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB",
+        )
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image file. Please upload a valid image (JPG, PNG, etc.)",
         )
 
-    # Save file
-    relative_path, absolute_path = await file_storage.save_upload(
-        file=photo,
-        category="homework",
-        user_id=current_user.user_id,
-    )
+    relative_path = upload.relative_path
+    ocr_text = upload.ocr_text
 
-    # Extract text using OCR
-    ocr_text = await ocr_service.extract_text_from_image(absolute_path)
+    if settings.IMAGE_DERIVATIVES_ON_UPLOAD:
+        # Render thumbnails after the response is sent
+        background_tasks.add_task(image_derivative_service.generate_all, relative_path)
 
     # Create homework record
     new_homework = Homework(
@@ -79,6 +87,10 @@ async def upload_homework(
     await db.flush()
     await db.refresh(new_homework)
 
+    perceptual_hash_index.add_after_commit(
+        db, current_user.user_id, upload.stored_file.perceptual_hash, relative_path
+    )
+
     return HomeworkResponse.model_validate(new_homework)
 
 
@@ -86,14 +98,18 @@ async def upload_homework(
 async def get_homework_list(
     subject_id: int = None,
     reviewed: bool = None,
+    page: PageParams = Depends(page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[HomeworkResponse]:
+) -> FastJSONResponse:
     """
-    Get all homework for the current user, with optional filters.
+    Get homework for the current user, newest first, with optional filters.
 
     - **subject_id**: Optional subject filter
     - **reviewed**: Optional filter for parent review status
+    - **limit** / **cursor**: Page size and the X-Next-Cursor of the previous page
+    - **fields**: Optional comma-separated fields to return
+    - **include_total**: Return the total count in X-Total-Count
     """
     query = select(Homework).where(Homework.user_id == current_user.user_id)
 
@@ -101,14 +117,12 @@ async def get_homework_list(
         query = query.where(Homework.subject_id == subject_id)
 
     if reviewed is not None:
-        query = query.where(Homework.parent_reviewed == reviewed)
-
-    query = query.order_by(Homework.created_at.desc())
+        query = query.where(Homework.is_reviewed == reviewed)
 
-    result = await db.execute(query)
-    homework_list = result.scalars().all()
-
-    return [HomeworkResponse.model_validate(hw) for hw in homework_list]
+    result_page = await paginate(
+        db, query, page, Homework.uploaded_at, Homework.homework_id, HomeworkResponse
+    )
+    return page_response(result_page, HomeworkResponse)
 
 
 @router.get("/{homework_id}", response_model=HomeworkResponse)
@@ -220,7 +234,7 @@ async def delete_homework(
         )
 
     # Delete file from storage
-    file_storage.delete_file(homework.photo_path)
+    await file_storage.delete_file(homework.photo_path, db)
 
     # Delete database record
     await db.delete(homework)
@@ -0,0 +1,136 @@
+"""Prometheus metrics endpoint for Kongtze API"""
+
+import os
+import time
+from fastapi import APIRouter, Depends, Response
+
+from app.core.cache import cache
+from app.core.database import engine
+from app.core.metrics import (
+    PrometheusWriter,
+    ai_call_metrics,
+    loop_lag_monitor,
+    route_metrics,
+)
+from app.core.security import password_hasher
+from app.api.deps import require_metrics_token
+from app.services.ai_service import ai_service
+
+router = APIRouter(tags=["Metrics"])
+
+PROCESS_START = time.time()
+
+
+def _write_requests(writer: PrometheusWriter):
+    routes = sorted(route_metrics.routes.items())
+    for (method, route), stats in routes:
+        writer.histogram(
+            "http_request_duration_seconds", "Request wall time by route",
+            stats.latency, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.histogram(
+            "http_request_db_seconds", "Database time per request by route",
+            stats.db_time, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.histogram(
+            "http_request_db_statements", "SQL statements per request by route",
+            stats.db_statements, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.counter(
+            "http_request_errors_total", "Responses with a 5xx status by route",
+            stats.errors, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.counter(
+            "http_request_n_plus_one_total", "Requests that repeated one statement past the N+1 threshold",
+            stats.n_plus_one, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.counter(
+            "http_request_bytes_total", "Request body bytes received by route",
+            stats.bytes_in, method=method, route=route,
+        )
+    for (method, route), stats in routes:
+        writer.counter(
+            "http_response_bytes_total", "Response body bytes sent by route",
+            stats.bytes_out, method=method, route=route,
+        )
+
+
+def _write_cache(writer: PrometheusWriter):
+    stats = cache.stats()
+    writer.gauge("cache_entries", "Entries in the in-process cache", stats["size"])
+    writer.counter("cache_hits_total", "In-process cache hits", stats["hits"])
+    writer.counter("cache_misses_total", "In-process cache misses (including expired entries)", stats["misses"])
+    writer.gauge("cache_hit_ratio", "In-process cache hits / lookups since startup", stats["hit_ratio"])
+    writer.counter(
+        "explanation_cache_hits_total", "AI explanations served from CachedExplanation",
+        ai_service.explanation_cache_hits,
+    )
+    writer.counter(
+        "explanation_cache_misses_total", "AI explanations that needed a Gemini call",
+        ai_service.explanation_cache_misses,
+    )
+
+
+def _write_db_pool(writer: PrometheusWriter):
+    pool = engine.sync_engine.pool
+    # Only QueuePool (the default for server databases) reports usage
+    for name, help_text, attr in (
+        ("db_pool_size", "Configured connection pool size", "size"),
+        ("db_pool_checked_out", "Connections currently in use", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+        ("db_pool_overflow", "Connections opened beyond the pool size", "overflow"),
+    ):
+        method = getattr(pool, attr, None)
+        if method is not None:
+            # overflow() counts up from -size until the pool is full
+            writer.gauge(name, help_text, max(method(), 0))
+
+
+def _write_ai(writer: PrometheusWriter):
+    for call_type, histogram in sorted(ai_call_metrics.latency.items()):
+        writer.histogram("ai_call_duration_seconds", "Gemini call latency by call type", histogram, call_type=call_type)
+    for call_type in sorted(ai_call_metrics.latency):
+        writer.counter(
+            "ai_call_errors_total", "Gemini calls that raised by call type",
+            ai_call_metrics.errors[call_type], call_type=call_type,
+        )
+
+
+def _write_runtime(writer: PrometheusWriter):
+    writer.histogram("event_loop_lag_seconds", "Event loop wake-up delay", loop_lag_monitor.lag)
+    writer.gauge("event_loop_lag_last_seconds", "Most recent event loop wake-up delay", loop_lag_monitor.last)
+    writer.gauge("event_loop_lag_max_seconds", "Largest event loop wake-up delay since startup", loop_lag_monitor.max)
+
+    hasher = password_hasher.stats()
+    writer.gauge("password_hash_workers", "Password hashing threads", hasher["workers"])
+    writer.gauge("password_hash_in_flight", "Password hashes currently running", hasher["in_flight"])
+    writer.gauge("password_hash_queue_depth", "Password hashes waiting for a thread", hasher["queue_depth"])
+    writer.gauge("password_hash_queue_depth_peak", "Largest password hash queue since startup", hasher["peak_queue_depth"])
+    writer.counter("password_hash_completed_total", "Password hashes completed", hasher["completed"])
+    writer.counter("password_hash_rejected_total", "Password hashes rejected with 503", hasher["rejected"])
+
+    writer.gauge("process_start_time_seconds", "Worker start time (Unix seconds)", PROCESS_START, pid=os.getpid())
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def get_metrics() -> Response:
+    """
+    Metrics of this worker in Prometheus text format.
+
+    Requires the METRICS_TOKEN bearer token (Prometheus: the scrape job's
+    authorization credentials); without METRICS_TOKEN the endpoint is off.
+    Every worker keeps its own counters, so each one should be scraped
+    directly; the pid label tells workers apart.
+    """
+    writer = PrometheusWriter()
+    _write_requests(writer)
+    _write_cache(writer)
+    _write_db_pool(writer)
+    _write_ai(writer)
+    _write_runtime(writer)
+    return Response(content=writer.render(), media_type=PrometheusWriter.CONTENT_TYPE)
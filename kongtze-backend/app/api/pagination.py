@@ -0,0 +1,178 @@
+"""Keyset pagination and field projection for list endpoints"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, load_only
+
+from app.core.responses import FastJSONResponse
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+@dataclass
+class PageParams:
+    """Pagination query parameters"""
+    limit: int
+    cursor: Optional[str]
+    fields: Optional[List[str]]
+    include_total: bool
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description=f"Value of {NEXT_CURSOR_HEADER} from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. skip ocr_text)"),
+    include_total: bool = Query(False, description=f"Return the total row count in {TOTAL_COUNT_HEADER}"),
+) -> PageParams:
+    """Dependency that parses pagination query parameters"""
+    field_list = None
+    if fields:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+    return PageParams(limit=limit, cursor=cursor, fields=field_list, include_total=include_total)
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode a (timestamp, id) position as an opaque URL-safe cursor"""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+@dataclass
+class Page:
+    """One page of rows plus navigation metadata"""
+    items: Sequence[Any]
+    next_cursor: Optional[str]
+    total: Optional[int]
+    fields: Optional[List[str]]
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    params: PageParams,
+    timestamp_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    schema: Type[BaseModel],
+) -> Page:
+    """
+    Fetch one page of a query, newest first, using keyset pagination.
+
+    Rows are ordered by (timestamp, id) descending and the cursor holds the
+    last row's position, so each page is an index range scan regardless of
+    how deep the client has paged.
+
+    Args:
+        db: Database session
+        query: Filtered select() of a single entity (without ordering)
+        params: Pagination parameters
+        timestamp_column: Creation timestamp column to order by
+        id_column: Primary key column (tie-breaker)
+        schema: Response schema; projected fields must be columns in it
+
+    Returns:
+        Page of ORM instances
+
+    Raises:
+        HTTPException: If the cursor or requested fields are invalid
+    """
+    total = None
+    if params.include_total:
+        total = await db.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    fields = None
+    if params.fields:
+        model = id_column.class_
+        columns = model.__mapper__.column_attrs.keys()
+        allowed = [name for name in schema.model_fields if name in columns]
+        unknown = [f for f in params.fields if f not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+            )
+        # The primary key is always returned so clients can address rows
+        fields = list(dict.fromkeys([id_column.key, *params.fields]))
+        query = query.options(
+            load_only(
+                *[getattr(model, f) for f in fields],
+                timestamp_column,
+                raiseload=True,
+            )
+        )
+
+    if params.cursor:
+        cursor_timestamp, cursor_id = decode_cursor(params.cursor)
+        query = query.where(
+            tuple_(timestamp_column, id_column) < tuple_(cursor_timestamp, cursor_id)
+        )
+
+    query = query.order_by(timestamp_column.desc(), id_column.desc()).limit(params.limit + 1)
+    rows = (await db.execute(query)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, timestamp_column.key), getattr(last, id_column.key)
+        )
+
+    return Page(items=rows, next_cursor=next_cursor, total=total, fields=fields)
+
+
+def page_response(
+    page: Page,
+    schema: Type[BaseModel],
+) -> FastJSONResponse:
+    """
+    Build the response for a page with its navigation headers.
+
+    Args:
+        page: Page returned by paginate
+        schema: Response schema for full rows
+
+    Returns:
+        FastJSONResponse of schema instances, or of projected fields
+    """
+    headers = {}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(page.total)
+
+    if page.fields:
+        body = [{f: getattr(row, f) for f in page.fields} for row in page.items]
+    else:
+        body = [schema.model_validate(row) for row in page.items]
+    return FastJSONResponse(content=body, headers=headers)
@@ -1,11 +1,18 @@
 """AI Prompt Template routes for Kongtze API"""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 
 from app.core.database import get_db
+from app.core.http_cache import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.core.responses import FastJSONResponse
 from app.models.ai_prompt_template import AIPromptTemplate
 from app.models.user import User
 from app.api.deps import get_current_user
@@ -47,11 +54,12 @@ router = APIRouter(prefix="/prompt-templates", tags=["Prompt Templates"])
 
 @router.get("", response_model=List[PromptTemplateResponse])
 async def get_prompt_templates(
+    request: Request,
     template_type: Optional[str] = None,
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[PromptTemplateResponse]:
+) -> FastJSONResponse:
     """Get all prompt templates, optionally filtered by type"""
     query = select(AIPromptTemplate)
 
@@ -61,20 +69,36 @@ async def get_prompt_templates(
     if active_only:
         query = query.where(AIPromptTemplate.is_active == True)
 
+    # Any edit bumps updated_at and any delete changes the count, so the
+    # pair versions the list without loading the template bodies
+    subquery = query.subquery()
+    result = await db.execute(
+        select(func.count(), func.max(subquery.c.updated_at)).select_from(subquery)
+    )
+    count, last_modified = result.one()
+    etag = make_etag("prompt_templates", count, last_modified)
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+
     query = query.order_by(AIPromptTemplate.template_name)
 
     result = await db.execute(query)
     templates = result.scalars().all()
 
-    return [PromptTemplateResponse.model_validate(t) for t in templates]
+    return FastJSONResponse(
+        [PromptTemplateResponse.model_validate(t) for t in templates],
+        headers=headers,
+    )
 
 
 @router.get("/{template_id}", response_model=PromptTemplateResponse)
 async def get_prompt_template(
     template_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> PromptTemplateResponse:
+) -> FastJSONResponse:
     """Get a specific prompt template by ID"""
     result = await db.execute(
         select(AIPromptTemplate).where(AIPromptTemplate.template_id == template_id)
@@ -87,7 +111,13 @@ async def get_prompt_template(
             detail="Prompt template not found",
         )
 
-    return PromptTemplateResponse.model_validate(template)
+    # Templates are editable, so clients revalidate on every use
+    etag = make_etag("prompt_template", template.template_id, template.updated_at)
+    headers = cache_headers(etag, template.updated_at)
+    if is_not_modified(request, etag, template.updated_at):
+        return not_modified_response(headers)
+
+    return FastJSONResponse(PromptTemplateResponse.model_validate(template), headers=headers)
 
 
 @router.post("", response_model=PromptTemplateResponse, status_code=status.HTTP_201_CREATED)
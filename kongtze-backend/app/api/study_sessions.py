@@ -1,22 +1,29 @@
 """Study session routes for Kongtze API"""
 
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete
 
-from app.core.database import get_db
+from app.core.database import get_db, bulk_insert_returning
 from app.models.study_session import StudySession
 from app.models.subject import Subject
 from app.models.user import User
 from app.schemas.study_session import (
     StudySessionCreate,
+    StudySessionWeekReplace,
     StudySessionUpdate,
     StudySessionResponse,
 )
 from app.api.deps import get_current_user
 from app.services.ai_service import ai_service
 from app.services.adaptive_difficulty_service import adaptive_difficulty_service
+from app.services.schedule_solver import (
+    DIFFICULTY_LABELS,
+    PHASE_LABELS,
+    SubjectPlan,
+    solve_weekly_schedule,
+)
 import json
 
 router = APIRouter(prefix="/study-sessions", tags=["Study Sessions"])
@@ -118,6 +125,48 @@ async def create_study_session(
     return StudySessionResponse.model_validate(new_session)
 
 
+@router.put("/week", response_model=List[StudySessionResponse])
+async def replace_week(
+    week_data: StudySessionWeekReplace,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> List[StudySessionResponse]:
+    """
+    Replace the current user's whole weekly schedule in one transaction.
+
+    Existing sessions are deleted and the new ones inserted with a single
+    multi-row INSERT ... RETURNING, e.g. to apply a generated schedule.
+
+    - **sessions**: List of sessions (same fields as creating a session)
+    """
+    # Verify all subjects exist in one query
+    subject_ids = {s.subject_id for s in week_data.sessions}
+    if subject_ids:
+        result = await db.execute(
+            select(Subject.subject_id).where(Subject.subject_id.in_(subject_ids))
+        )
+        missing = subject_ids - set(result.scalars().all())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Subject not found: {', '.join(str(i) for i in sorted(missing))}",
+            )
+
+    await db.execute(
+        delete(StudySession).where(StudySession.user_id == current_user.user_id)
+    )
+
+    sessions = await bulk_insert_returning(db, StudySession, [
+        {"user_id": current_user.user_id, **session.model_dump()}
+        for session in week_data.sessions
+    ])
+
+    await db.commit()
+
+    sessions.sort(key=lambda session: (session.day_of_week, session.start_time))
+    return [StudySessionResponse.model_validate(session) for session in sessions]
+
+
 @router.put("/{session_id}", response_model=StudySessionResponse)
 async def update_study_session(
     session_id: int,
@@ -185,15 +234,10 @@ async def delete_all_study_sessions(
     """
     Delete all study sessions for the current user.
     """
-    # Delete all sessions for the current user
-    result = await db.execute(
-        select(StudySession).where(StudySession.user_id == current_user.user_id)
+    # Set-based delete instead of loading and deleting each row
+    await db.execute(
+        delete(StudySession).where(StudySession.user_id == current_user.user_id)
     )
-    sessions = result.scalars().all()
-
-    for session in sessions:
-        await db.delete(session)
-
     await db.commit()
 
 
@@ -229,6 +273,43 @@ async def delete_study_session(
     await db.commit()
 
 
+async def _generate_ai_titles(schedule: List[dict], goals: Optional[str]) -> None:
+    """
+    Replace deterministic session titles with AI-written ones, in place.
+
+    The schedule itself is never changed; any AI failure keeps the
+    default titles.
+    """
+    lines = "\n".join(
+        f"{i}. Day {session['day_of_week']}, {session['subject_name']}, "
+        f"{DIFFICULTY_LABELS.get(session['recommended_difficulty'], 'intermediate')} level, "
+        f"{PHASE_LABELS[session['day_of_week']]}"
+        for i, session in enumerate(schedule)
+    )
+    prompt = f"""Write a short, motivating title (max 60 characters) for each study session below.
+Goals: {goals or 'Balanced learning across all subjects'}
+
+{lines}
+
+Return ONLY a JSON array of {len(schedule)} strings in the same order (no markdown, no explanation)."""
+
+    try:
+        response_text = (await ai_service.generate_text(prompt, call_type="schedule")).strip()
+        if response_text.startswith("```"):
+            response_text = response_text.replace("```json", "").replace("```", "").strip()
+        titles = json.loads(response_text)
+    except Exception as e:
+        print(f"Schedule title generation error: {e}")
+        return
+
+    if not isinstance(titles, list) or len(titles) != len(schedule):
+        return
+
+    for session, title in zip(schedule, titles):
+        if isinstance(title, str) and title.strip():
+            session["title"] = title.strip()[:255]
+
+
 @router.post("/generate-schedule")
 async def generate_schedule(
     preferences: dict,
@@ -236,14 +317,20 @@ async def generate_schedule(
     current_user: User = Depends(get_current_user),
 ) -> dict:
     """
-    Generate an optimized weekly study schedule using AI.
+    Generate a weekly study schedule from preferences and adaptive difficulty.
+
+    The schedule is solved locally so it always satisfies the weekly rules
+    (max 3 sessions per day, no repeated subject per day, 30/45-minute
+    sessions, no dinner overlap, weekend windows).
 
     - **subjects**: List of subject IDs to include
     - **subjectDifficulties**: Dict mapping subject IDs to difficulty levels
     - **hoursPerDay**: Target study hours per day (supports 0.5 increments)
     - **startTime**: Preferred start time (HH:MM)
-    - **endTime**: Preferred end time (HH:MM)
+    - **endTime**: Time all sessions must end by (HH:MM, optional); 400 if too
+      early for the sessions above
     - **goals**: Study goals (optional)
+    - **aiTitles**: Ask the AI to write session titles (optional, default false)
     """
     # Get subject names
     result = await db.execute(select(Subject))
@@ -259,245 +346,41 @@ async def generate_schedule(
             detail="At least one subject must be selected",
         )
 
-    # Build subject info with difficulty levels
-    subject_difficulties = preferences.get("subjectDifficulties", {})
-    subject_info = []
+    # Get adaptive difficulty for all subjects in one query
+    adaptive_difficulties = await adaptive_difficulty_service.calculate_recommended_difficulties(
+        user_id=current_user.user_id,
+        subject_ids=[s.subject_id for s in selected_subjects],
+        db=db
+    )
 
-    # Get adaptive difficulty for each subject
-    adaptive_difficulties = {}
-    for s in selected_subjects:
-        # Try to get recommended difficulty from analytics
-        recommended_difficulty = await adaptive_difficulty_service.calculate_recommended_difficulty(
-            user_id=current_user.user_id,
+    subject_plans = [
+        SubjectPlan(
             subject_id=s.subject_id,
-            db=db
+            name=s.display_name,
+            difficulty=adaptive_difficulties[s.subject_id],
         )
-        adaptive_difficulties[s.subject_id] = recommended_difficulty
-
-        # Map difficulty level to text
-        difficulty_map = {1: "beginner", 2: "intermediate", 3: "advanced", 4: "expert"}
-        difficulty_text = difficulty_map.get(recommended_difficulty, "intermediate")
-
-        subject_info.append(f"{s.display_name} ({difficulty_text} level - adaptive)")
-
-
-    # Build AI prompt
-    prompt = f"""Generate an optimized weekly study schedule with the following requirements:
-
-Subjects to study: {', '.join(subject_info)}
-Target study hours per day: {preferences.get('hoursPerDay', 2)} hours
-Time window: {preferences.get('startTime', '14:00')} to {preferences.get('endTime', '20:00')}
-Goals: {preferences.get('goals', 'Balanced learning across all subjects')}
-
-ADAPTIVE DIFFICULTY GUIDANCE:
-The difficulty levels shown are based on the student's recent performance analytics.
-These levels have been automatically calculated to optimize learning progression.
-
-PROGRESSIVE DIFFICULTY CURVE:
-- Early week (Monday-Tuesday): Focus on review and reinforcement
-- Mid week (Wednesday-Thursday): Introduce new concepts at recommended difficulty
-- Late week (Friday-Sunday): Challenge sessions and practice
-
-IMPORTANT CONSTRAINTS:
-1. ALL sessions MUST be within the time window {preferences.get('startTime', '14:00')} to {preferences.get('endTime', '20:00')}
-2. AVOID dinner time: 19:00-19:40 (7:00 PM - 7:40 PM) - do NOT schedule any sessions during this time
-3. Session durations should be 30 or 45 minutes ONLY (no 60 or 90 minute sessions)
-4. Maximum 3 sessions per day - NEVER schedule more than 3 sessions on any single day
-5. Each subject can only appear ONCE per day - do NOT schedule the same subject twice on the same day
-6. Distribute subjects evenly across the week
-7. Consider each subject's difficulty level when planning
-8. Include rest days (1-2 days with no or minimal study)
-9. More difficult subjects may need longer or more frequent sessions
-10. WEEKDAY SESSIONS (Monday-Friday, days 0-4): Schedule EXACTLY 1 session BEFORE dinner (before 19:00) and EXACTLY 2 sessions AFTER dinner (after 19:40)
-11. WEEKEND SESSIONS (Saturday=day 5, Sunday=day 6): Schedule EXACTLY 2 sessions between 11:00 AM and 4:00 PM (11:00-16:00) for BOTH Saturday AND Sunday
-
-IMPORTANT: You MUST include sessions for ALL 7 days of the week (Monday through Sunday, days 0-6). Do NOT skip Sunday (day 6)!
-
-Create a balanced weekly schedule covering ALL 7 days (Monday=0 to Sunday=6) that respects ALL constraints above.
-
-Return ONLY a JSON array with this exact structure (no markdown, no explanation):
-[
-  {{
-    "day_of_week": 0,
-    "subject_name": "Math",
-    "start_time": "14:00:00",
-    "duration_minutes": 60
-  }}
-]
-
-day_of_week: 0=Monday, 1=Tuesday, ..., 6=Sunday
-start_time: Must be in HH:MM:SS format and within the specified time window
-duration_minutes: Must be 30 or 45 ONLY
-subject_name: Must match exactly one of the subjects listed above
-
-CRITICAL: Ensure NO sessions overlap with 19:00-19:40 (dinner time) and ALL sessions are within {preferences.get('startTime', '14:00')} to {preferences.get('endTime', '20:00')}. Maximum 3 sessions per day. Each subject appears only once per day. Weekdays (days 0-4): 1 before dinner + 2 after dinner. Weekends (days 5-6): 2 sessions between 11:00-16:00. MUST include BOTH Saturday (day 5) AND Sunday (day 6) sessions!
-"""
-
-    # Call AI service
-    try:
-        ai_response = await ai_service.generate_text(prompt)
-
-        # Parse JSON response
-        # Remove markdown code blocks if present
-        response_text = ai_response.strip()
-        if response_text.startswith("```"):
-            # Remove markdown code blocks
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-            response_text = response_text.replace("```json", "").replace("```", "").strip()
-
-        schedule_data = json.loads(response_text)
-
-        # Validate schedule constraints
-        validation_errors = []
-
-        # Group sessions by day for validation
-        sessions_by_day = {}
-        for session in schedule_data:
-            day = session.get("day_of_week")
-            if day not in sessions_by_day:
-                sessions_by_day[day] = []
-            sessions_by_day[day].append(session)
-
-        # Validate each day
-        for day, day_sessions in sessions_by_day.items():
-            # Check max 3 sessions per day
-            if len(day_sessions) > 3:
-                validation_errors.append(f"Day {day} has {len(day_sessions)} sessions (max 3 allowed)")
-
-            # Check no repeated subjects per day
-            subjects_seen = set()
-            for session in day_sessions:
-                subject = session.get("subject_name")
-                if subject in subjects_seen:
-                    validation_errors.append(f"Day {day} has duplicate subject: {subject}")
-                subjects_seen.add(subject)
-
-            # Check session durations
-            for session in day_sessions:
-                duration = session.get("duration_minutes")
-                if duration not in [30, 45]:
-                    validation_errors.append(f"Invalid duration {duration} minutes (must be 30 or 45)")
-
-            # Check dinner time conflict (19:00-19:40)
-            for session in day_sessions:
-                start_time = session.get("start_time", "")
-                duration = session.get("duration_minutes", 0)
-
-                # Parse start time
-                if start_time:
-                    try:
-                        time_parts = start_time.split(":")
-                        if len(time_parts) < 2:
-                            validation_errors.append(f"Invalid time format: {start_time}")
-                            continue
-                        hour, minute = int(time_parts[0]), int(time_parts[1])
-                        if hour < 0 or hour > 23 or minute < 0 or minute > 59:
-                            validation_errors.append(f"Invalid time values: {start_time}")
-                            continue
-                        start_minutes = hour * 60 + minute
-                        end_minutes = start_minutes + duration
-
-                        # Dinner time: 19:00 (1140 min) to 19:40 (1180 min)
-                        dinner_start = 19 * 60  # 1140
-                        dinner_end = 19 * 60 + 40  # 1180
-
-                        # Check if session overlaps with dinner time
-                        if not (end_minutes <= dinner_start or start_minutes >= dinner_end):
-                            validation_errors.append(f"Session at {start_time} conflicts with dinner time (19:00-19:40)")
-                    except (ValueError, IndexError) as e:
-                        validation_errors.append(f"Invalid time format: {start_time}")
-
-            # Check weekday/weekend session distribution
-            if day in [0, 1, 2, 3, 4]:  # Monday-Friday (weekdays)
-                # Count sessions before and after dinner
-                before_dinner = 0
-                after_dinner = 0
-                for session in day_sessions:
-                    start_time = session.get("start_time", "")
-                    if start_time:
-                        try:
-                            time_parts = start_time.split(":")
-                            if len(time_parts) >= 2:
-                                hour = int(time_parts[0])
-                                minute = int(time_parts[1])
-                                start_minutes = hour * 60 + minute
-
-                                # Before dinner: before 19:00 (1140 minutes)
-                                if start_minutes < 19 * 60:
-                                    before_dinner += 1
-                                # After dinner: after 19:40 (1180 minutes)
-                                elif start_minutes >= 19 * 60 + 40:
-                                    after_dinner += 1
-                        except (ValueError, IndexError):
-                            pass
-
-                if before_dinner != 1:
-                    validation_errors.append(f"Weekday {day} must have exactly 1 session before dinner (has {before_dinner})")
-                if after_dinner != 2:
-                    validation_errors.append(f"Weekday {day} must have exactly 2 sessions after dinner (has {after_dinner})")
-
-            elif day in [5, 6]:  # Saturday-Sunday (weekends)
-                # Check all sessions are between 11:00 and 16:00
-                for session in day_sessions:
-                    start_time = session.get("start_time", "")
-                    if start_time:
-                        try:
-                            time_parts = start_time.split(":")
-                            if len(time_parts) >= 2:
-                                hour = int(time_parts[0])
-                                minute = int(time_parts[1])
-                                start_minutes = hour * 60 + minute
-
-                                # Must be between 11:00 (660 min) and 16:00 (960 min)
-                                if start_minutes < 11 * 60 or start_minutes >= 16 * 60:
-                                    validation_errors.append(f"Weekend session at {start_time} must be between 11:00 and 16:00")
-                        except (ValueError, IndexError):
-                            pass
-
-                if len(day_sessions) != 2:
-                    validation_errors.append(f"Weekend day {day} must have exactly 2 sessions (has {len(day_sessions)})")
-
-        if validation_errors:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Generated schedule violates constraints: {'; '.join(validation_errors)}. Please try again.",
-            )
+        for s in selected_subjects
+    ]
 
-        # Map subject names to IDs
-        subject_map = {s.display_name: s.subject_id for s in all_subjects}
-
-        # Convert to proper format
-        schedule = []
-        for session in schedule_data:
-            subject_name = session.get("subject_name")
-            subject_id = subject_map.get(subject_name)
-
-            if subject_id:
-                # Add adaptive difficulty level for this subject
-                difficulty_level = adaptive_difficulties.get(subject_id, 2)
-
-                schedule.append({
-                    "day_of_week": session["day_of_week"],
-                    "subject_id": subject_id,
-                    "start_time": session["start_time"],
-                    "duration_minutes": session["duration_minutes"],
-                    "recommended_difficulty": difficulty_level,
-                })
-
-        return {
-            "schedule": schedule,
-            "adaptive_difficulties": adaptive_difficulties
-        }
-
-    except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to parse AI response: {str(e)}",
+    try:
+        planned = solve_weekly_schedule(
+            subject_plans,
+            hours_per_day=float(preferences.get("hoursPerDay", 2)),
+            start_time=preferences.get("startTime", "14:00"),
+            end_time=preferences.get("endTime"),
         )
-    except Exception as e:
+    except (TypeError, ValueError) as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate schedule: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid schedule preferences: {str(e)}",
         )
 
+    schedule = [session.to_dict() for session in planned]
+
+    if preferences.get("aiTitles"):
+        await _generate_ai_titles(schedule, preferences.get("goals"))
+
+    return {
+        "schedule": schedule,
+        "adaptive_difficulties": adaptive_difficulties
+    }
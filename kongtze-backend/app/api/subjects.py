@@ -1,11 +1,19 @@
 """Subject routes for Kongtze API"""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.http_cache import (
+    REFERENCE_CACHE_CONTROL,
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.core.responses import FastJSONResponse
 from app.models.subject import Subject
 from app.models.user import User
 from app.schemas.subject import SubjectResponse
@@ -16,26 +24,44 @@ router = APIRouter(prefix="/subjects", tags=["Subjects"])
 
 @router.get("", response_model=List[SubjectResponse])
 async def get_subjects(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[SubjectResponse]:
+) -> FastJSONResponse:
     """
     Get all available subjects.
 
     Returns a list of all subjects (Math, English, Chinese, Science).
     """
-    result = await db.execute(select(Subject))
-    subjects = result.scalars().all()
+    result = await db.execute(
+        select(
+            Subject.subject_id,
+            Subject.name,
+            Subject.display_name,
+            Subject.description,
+        ).order_by(Subject.subject_id)
+    )
+    rows = result.all()
+
+    # Subjects have no timestamps; the few seeded rows are the version
+    etag = make_etag("subjects", *rows)
+    headers = cache_headers(etag, cache_control=REFERENCE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
 
-    return [SubjectResponse.model_validate(subject) for subject in subjects]
+    return FastJSONResponse(
+        [SubjectResponse.model_validate(row) for row in rows],
+        headers=headers,
+    )
 
 
 @router.get("/{subject_id}", response_model=SubjectResponse)
 async def get_subject(
     subject_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> SubjectResponse:
+) -> FastJSONResponse:
     """
     Get a specific subject by ID.
 
@@ -52,4 +78,11 @@ async def get_subject(
             detail="Subject not found",
         )
 
-    return SubjectResponse.model_validate(subject)
+    etag = make_etag(
+        "subject", subject.subject_id, subject.name, subject.display_name, subject.description
+    )
+    headers = cache_headers(etag, cache_control=REFERENCE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
+
+    return FastJSONResponse(SubjectResponse.model_validate(subject), headers=headers)
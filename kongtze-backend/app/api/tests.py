@@ -1,12 +1,20 @@
 """Test routes for Kongtze API"""
 
 from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 import json
 
-from app.core.database import get_db
+from app.core.database import get_db, bulk_insert_returning
+from app.core.http_cache import (
+    STABLE_CACHE_CONTROL,
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from app.core.responses import FastJSONResponse
 from app.models.test import Test
 from app.models.question import Question
 from app.models.test_result import TestResult
@@ -23,15 +31,22 @@ from app.schemas.test import (
     QuestionWithAnswer,
     TestSubmission,
     TestResultResponse,
+    TestResultWithTimings,
     TestResultWithReview,
 )
 from app.api.deps import get_current_user
+from app.api.pagination import PageParams, page_params, paginate, page_response
 from app.services.ai_service import ai_service
 from app.services.test_context_builder import test_context_builder
 from app.services.adaptive_difficulty_service import adaptive_difficulty_service
+from app.services.analytics_kernels import question_timings
 
 router = APIRouter(prefix="/tests", tags=["Tests"])
 
+# Part of the test-result ETag; bump whenever TestResultWithReview's fields
+# change so clients drop cached copies (2: question_timings)
+TEST_RESULT_REPRESENTATION = 2
+
 
 @router.post("", response_model=TestWithQuestions, status_code=status.HTTP_201_CREATED)
 async def create_test(
@@ -168,21 +183,17 @@ async def create_test(
     )
 
     # Create test record
-    new_test = Test(
-        user_id=current_user.user_id,
-        subject_id=test_data.subject_id,
-        title=test_data.title,
-        difficulty_level=difficulty_level,
-        time_limit_minutes=test_data.time_limit_minutes,
-        total_questions=total_questions,
-        source_note_ids=json.dumps(test_data.note_ids) if test_data.note_ids else None,
-        source_homework_ids=json.dumps(test_data.homework_ids) if test_data.homework_ids else None,
-        generation_mode=test_data.generation_mode,
-    )
-
-    db.add(new_test)
-    await db.flush()
-    await db.refresh(new_test)
+    [new_test] = await bulk_insert_returning(db, Test, [{
+        "user_id": current_user.user_id,
+        "subject_id": test_data.subject_id,
+        "title": test_data.title,
+        "difficulty_level": difficulty_level,
+        "time_limit_minutes": test_data.time_limit_minutes,
+        "total_questions": total_questions,
+        "source_note_ids": json.dumps(test_data.note_ids) if test_data.note_ids else None,
+        "source_homework_ids": json.dumps(test_data.homework_ids) if test_data.homework_ids else None,
+        "generation_mode": test_data.generation_mode,
+    }])
 
     # Generate questions using AI
     ai_questions = await ai_service.generate_test_questions(
@@ -192,28 +203,22 @@ async def create_test(
         context_text=context_text,
     )
 
-    # Create question records
-    questions = []
+    # Create question records in one INSERT ... RETURNING
+    question_rows = []
     for i, q_data in enumerate(ai_questions):
         # Use individual time limit if available, otherwise use default
         time_limit = individual_time_limits[i] if i < len(individual_time_limits) else 60
 
-        question = Question(
-            test_id=new_test.test_id,
-            question_text=q_data["question_text"],
-            question_order=i,
-            options=q_data["options"],
-            correct_answer=q_data["correct_answer"],
-            time_limit_seconds=time_limit,
-        )
-        db.add(question)
-        questions.append(question)
-
-    await db.flush()
+        question_rows.append({
+            "test_id": new_test.test_id,
+            "question_text": q_data["question_text"],
+            "question_order": i,
+            "options": q_data["options"],
+            "correct_answer": q_data["correct_answer"],
+            "time_limit_seconds": time_limit,
+        })
 
-    # Refresh questions to get IDs
-    for question in questions:
-        await db.refresh(question)
+    questions = await bulk_insert_returning(db, Question, question_rows)
 
     # Return test with questions (without correct answers)
     test_response = TestResponse.model_validate(new_test)
@@ -230,33 +235,58 @@ async def create_test(
 @router.get("", response_model=List[TestResponse])
 async def get_tests(
     subject_id: int = None,
+    page: PageParams = Depends(page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[TestResponse]:
+) -> FastJSONResponse:
     """
-    Get all tests for the current user, optionally filtered by subject.
+    Get tests for the current user, newest first, optionally filtered by subject.
 
     - **subject_id**: Optional subject filter
+    - **limit** / **cursor**: Page size and the X-Next-Cursor of the previous page
+    - **fields**: Optional comma-separated fields to return
+    - **include_total**: Return the total count in X-Total-Count
     """
     query = select(Test).where(Test.user_id == current_user.user_id)
 
     if subject_id:
         query = query.where(Test.subject_id == subject_id)
 
-    query = query.order_by(Test.created_at.desc())
+    result_page = await paginate(
+        db, query, page, Test.created_at, Test.test_id, TestResponse
+    )
+    return page_response(result_page, TestResponse)
+
+
+# Declared before /{test_id} so "results" is not parsed as a test ID
+@router.get("/results", response_model=List[TestResultResponse])
+async def get_test_results(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> FastJSONResponse:
+    """
+    Get test results for the current user, newest first.
 
-    result = await db.execute(query)
-    tests = result.scalars().all()
+    - **limit** / **cursor**: Page size and the X-Next-Cursor of the previous page
+    - **fields**: Optional comma-separated fields to return
+    - **include_total**: Return the total count in X-Total-Count
+    """
+    query = select(TestResult).where(TestResult.user_id == current_user.user_id)
 
-    return [TestResponse.model_validate(test) for test in tests]
+    result_page = await paginate(
+        db, query, page, TestResult.submitted_at, TestResult.result_id, TestResultResponse
+    )
+    return page_response(result_page, TestResultResponse)
 
 
 @router.get("/{test_id}", response_model=TestWithQuestions)
 async def get_test(
     test_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> TestWithQuestions:
+) -> FastJSONResponse:
     """
     Get a specific test with its questions (without showing correct answers).
 
@@ -279,6 +309,12 @@ async def get_test(
             detail="Test not found",
         )
 
+    # Tests and their questions never change after creation
+    etag = make_etag("test", test.test_id, test.created_at)
+    headers = cache_headers(etag, test.created_at, STABLE_CACHE_CONTROL)
+    if is_not_modified(request, etag, test.created_at):
+        return not_modified_response(headers)
+
     # Get questions
     result = await db.execute(
         select(Question).where(Question.test_id == test_id)
@@ -290,24 +326,29 @@ async def get_test(
         QuestionResponse.model_validate(q) for q in questions
     ]
 
-    return TestWithQuestions(
-        **test_response.model_dump(),
-        questions=question_responses,
+    # Already validated, so skip the response_model pass
+    return FastJSONResponse(
+        TestWithQuestions(
+            **test_response.model_dump(),
+            questions=question_responses,
+        ),
+        headers=headers,
     )
 
 
-@router.post("/submit", response_model=TestResultResponse)
+@router.post("/submit", response_model=TestResultWithTimings)
 async def submit_test(
     submission: TestSubmission,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> TestResultResponse:
+) -> TestResultWithTimings:
     """
     Submit test answers and get results with rewards.
 
     - **test_id**: The test ID
     - **answers**: Map of question_id to answer (A/B/C/D)
     - **time_taken_seconds**: Time taken to complete the test
+    - **question_times**: Optional map of question_id to seconds spent on it
     """
     # Get test
     result = await db.execute(
@@ -328,19 +369,20 @@ async def submit_test(
 
     # Get questions
     result = await db.execute(
-        select(Question).where(Question.test_id == submission.test_id)
+        select(Question)
+        .where(Question.test_id == submission.test_id)
+        .order_by(Question.question_order)
     )
     questions = result.scalars().all()
 
     # Calculate score
-    score = 0
+    correct = [
+        submission.answers.get(str(question.question_id)) == question.correct_answer
+        for question in questions
+    ]
+    score = sum(correct)
     total_score = len(questions)
 
-    for question in questions:
-        user_answer = submission.answers.get(str(question.question_id))
-        if user_answer == question.correct_answer:
-            score += 1
-
     # Calculate reward points (1 point per correct answer, bonus for perfect score)
     reward_points = score
     if score == total_score:
@@ -354,6 +396,12 @@ async def submit_test(
         total_points=total_score,
         time_taken_seconds=submission.time_taken_seconds,
         answers=submission.answers,
+        question_count=len(questions),
+        question_timings=question_timings(
+            [question.question_id for question in questions],
+            correct,
+            submission.question_times,
+        ),
         reward_points=reward_points,
     )
 
@@ -391,15 +439,16 @@ async def submit_test(
         db=db
     )
 
-    return TestResultResponse.model_validate(test_result)
+    return TestResultWithTimings.model_validate(test_result)
 
 
 @router.get("/results/{result_id}", response_model=TestResultWithReview)
 async def get_test_result(
     result_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> TestResultWithReview:
+) -> FastJSONResponse:
     """
     Get detailed test result with review (shows correct answers and explanations).
 
@@ -422,6 +471,17 @@ async def get_test_result(
             detail="Test result not found",
         )
 
+    # Submitted results are never modified; only the representation changes
+    etag = make_etag(
+        "test_result",
+        TEST_RESULT_REPRESENTATION,
+        test_result.result_id,
+        test_result.submitted_at,
+    )
+    headers = cache_headers(etag, test_result.submitted_at, STABLE_CACHE_CONTROL)
+    if is_not_modified(request, etag, test_result.submitted_at):
+        return not_modified_response(headers)
+
     # Get questions
     result = await db.execute(
         select(Question).where(Question.test_id == test_result.test_id)
@@ -433,29 +493,14 @@ async def get_test_result(
         QuestionWithAnswer.model_validate(q) for q in questions
     ]
 
-    result_response = TestResultResponse.model_validate(test_result)
+    result_response = TestResultWithTimings.model_validate(test_result)
     percentage = (test_result.score / test_result.total_points * 100) if test_result.total_points > 0 else 0
 
-    return TestResultWithReview(
-        **result_response.model_dump(),
-        questions=question_responses,
-        percentage=percentage,
+    return FastJSONResponse(
+        TestResultWithReview(
+            **result_response.model_dump(),
+            questions=question_responses,
+            percentage=percentage,
+        ),
+        headers=headers,
     )
-
-
-@router.get("/results", response_model=List[TestResultResponse])
-async def get_test_results(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> List[TestResultResponse]:
-    """
-    Get all test results for the current user.
-    """
-    result = await db.execute(
-        select(TestResult)
-        .where(TestResult.user_id == current_user.user_id)
-        .order_by(TestResult.submitted_at.desc())
-    )
-    test_results = result.scalars().all()
-
-    return [TestResultResponse.model_validate(tr) for tr in test_results]
@@ -12,16 +12,20 @@ class SimpleCache:
     def __init__(self):
         self._cache: Dict[str, Tuple[Any, datetime]] = {}
         self._default_ttl = 300  # 5 minutes default
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
         if key in self._cache:
             value, expiry = self._cache[key]
             if datetime.now() < expiry:
+                self.hits += 1
                 return value
             else:
                 # Expired, remove from cache
                 del self._cache[key]
+        self.misses += 1
         return None
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
@@ -40,6 +44,16 @@ class SimpleCache:
         """Clear all cache entries"""
         self._cache.clear()
 
+    def stats(self) -> Dict[str, float]:
+        """Entry count and hit/miss counters since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
     def delete_pattern(self, pattern: str):
         """Delete all keys matching pattern (simple prefix match)"""
         keys_to_delete = [k for k in self._cache.keys() if k.startswith(pattern)]
@@ -0,0 +1,292 @@
+"""Negotiated gzip/brotli response compression with a compressed-body cache"""
+
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip only
+    brotli = None
+
+# Bodies at least this large are compressed in a worker thread
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Media that is already compressed; "type/*" matches every subtype
+EXCLUDED_CONTENT_TYPES = (
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "audio/*",
+    "font/woff",
+    "font/woff2",
+    "image/avif",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/webp",
+    "text/event-stream",
+    "video/*",
+)
+
+CacheKey = Tuple[str, str, str]
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Supported content codings, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+        available: Supported codings, most preferred first
+
+    Returns:
+        The coding with the highest q-value (ties go to the server's
+        preference), or None to send the identity encoding
+    """
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressedBodyCache:
+    """LRU cache of compressed bodies keyed by (URL, ETag, coding), bounded in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: CacheKey, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            data = self._brotli.process(body)
+            return data + (self._brotli.finish() if final else self._brotli.flush())
+        data = self._zlib.compress(body)
+        return data + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _CompressionResponder:
+    """
+    Compresses one response, reusing cached bodies for ETagged responses.
+
+    Bodies below minimum_size, excluded content types, pre-encoded, partial
+    (206) and pathsend responses are sent as they are. With no encoding
+    nothing is compressed, but large responses still get Vary so caches keep
+    the identity and compressed variants apart.
+    """
+
+    def __init__(self, app: ASGIApp, middleware: "CompressionMiddleware", encoding: Optional[str], url: str):
+        self.app = app
+        self.middleware = middleware
+        self.content_encoding = encoding
+        self.url = url
+        self.compressor = (
+            _Compressor(encoding, middleware.gzip_level, middleware.brotli_quality) if encoding else None
+        )
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.passthrough = False
+        self.started = False
+        self.first_chunk = True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def _is_excluded(self, headers: Headers) -> bool:
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        excluded = self.middleware.exclude_content_types
+        return media_type in excluded or f"{media_type.partition('/')[0]}/*" in excluded
+
+    async def send_with_compression(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk decides the headers
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or self._is_excluded(headers)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            if message_type == "http.response.pathsend" and not self.passthrough and not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.started:
+            # Later chunks of a streaming response
+            message["body"] = await self.apply_compression(body, more_body=more_body)
+            await self.send(message)
+            return
+
+        self.started = True
+        if len(body) < self.middleware.minimum_size and not more_body:
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.compressor is not None:
+            message["body"] = await self.apply_compression(body, more_body=more_body)
+            headers["Content-Encoding"] = self.content_encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(self.initial_message)
+        await self.send(message)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self.compressor is None:
+            return body
+        whole_body = self.first_chunk and not more_body
+        self.first_chunk = False
+        if not whole_body:
+            return self.compressor.compress(body, final=not more_body)
+
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        etag = headers.get("etag")
+        if etag is None:
+            return await self._compress(body)
+
+        # The compressed bytes are a different representation of the same
+        # resource, so the validator becomes weak (If-None-Match compares weakly)
+        if not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        # A response with an ETag is a fixed version of the resource, so its
+        # compressed body can be reused until the ETag changes
+        key = (self.url, etag.removeprefix("W/"), self.content_encoding)
+        cached = self.middleware.cache.get(key)
+        if cached is None:
+            cached = await self._compress(body)
+            self.middleware.cache.set(key, cached)
+        return cached
+
+    async def _compress(self, body: bytes) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            # Compressing large bodies inline would block the event loop
+            return await anyio.to_thread.run_sync(self.compressor.compress, body, True)
+        return self.compressor.compress(body, final=True)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, as negotiated with the client.
+
+    Bodies below minimum_size are sent as-is, since compressing them costs
+    more CPU than the bytes saved. Already-compressed media (images, archives)
+    are never recompressed. Compressed bodies of responses that carry an
+    ETag are kept in an LRU cache, so immutable payloads such as generated
+    tests are compressed once.
+
+    Args:
+        app: ASGI application
+        minimum_size: Smallest body (bytes) worth compressing
+        gzip_level: zlib compression level (1-9)
+        brotli_quality: Brotli quality (0-11)
+        cache_max_bytes: Budget for cached compressed bodies (0 disables)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_max_bytes: int = 16 * 1024 * 1024,
+        exclude_content_types: Tuple[str, ...] = EXCLUDED_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_content_types = frozenset(t.lower() for t in exclude_content_types)
+        self.cache = CompressedBodyCache(cache_max_bytes)
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""), self.encodings)
+        url = scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        await _CompressionResponder(self.app, self, encoding, url)(scope, receive, send)
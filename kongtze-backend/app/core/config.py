@@ -15,16 +15,54 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    USER_CACHE_TTL: int = 60  # Seconds an authenticated user is served from memory
+    PASSWORD_HASH_WORKERS: int = 2  # Threads running bcrypt concurrently
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting hashes before logins get 503
+
+    ADMIN_EMAILS: List[str] = []  # Parent accounts allowed to use /api/admin diagnostics
 
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
 
     # AI Services
     GEMINI_API_KEY: str = ""
+    GEMINI_API_BASE_URL: str = "https://generativelanguage.googleapis.com"  # benchmarks/fake_gemini.py for offline use
+    GEMINI_MODEL: str = "gemini-2.5-flash"  # Text generation (tests, topics, schedules)
+    GEMINI_VISION_MODEL: str = "gemini-1.5-flash"  # OCR
     GOOGLE_CLOUD_VISION_CREDENTIALS: str = ""
 
     # File Storage
     STORAGE_PATH: str = "/app/storage"
+    MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024  # 20 MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes read per chunk when streaming uploads
+
+    # Image Pre-processing
+    IMAGE_MAX_EDGE: int = 2048  # Longest edge in pixels after downscaling
+    IMAGE_JPEG_QUALITY: int = 80
+    IMAGE_GRAYSCALE_DOCUMENTS: bool = True  # Store low-colour document photos as grayscale
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_DERIVATIVE_QUALITY: int = 75  # WebP quality for thumbnails
+    IMAGE_DERIVATIVES_ON_UPLOAD: bool = False  # Otherwise generated on first request
+    PHASH_MAX_DISTANCE: int = 6  # Max differing dHash bits to treat photos as the same page
+
+    # Response Compression
+    COMPRESSION_MIN_SIZE: int = 1024  # Smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Used when the brotli package is installed
+    COMPRESSION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # Compressed bodies kept per ETag
+
+    # Request Metrics
+    SERVER_TIMING_HEADER: bool = True  # Report app/db/ai durations to clients
+    N_PLUS_ONE_THRESHOLD: int = 10  # Same statement this many times in one request logs a warning
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5  # Seconds between event-loop lag probes
+    PROFILE_MAX_SECONDS: int = 60  # Longest sampling profile an admin can request
+    METRICS_TOKEN: str = ""  # Bearer token scrapers send to /metrics; empty disables the endpoint
+
+    # Slow-query Log (served at /api/admin/slow-queries)
+    SLOW_QUERY_LOG: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # Fraction of slow SELECTs re-run under EXPLAIN
+    SLOW_QUERY_MAX_STATEMENTS: int = 200  # Distinct normalized statements kept
 
     class Config:
         env_file = ".env"
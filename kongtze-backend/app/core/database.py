@@ -1,6 +1,10 @@
+from typing import Any, Dict, List, Type, TypeVar
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.slow_queries import slow_query_log
 
 
 # Create async engine
@@ -9,6 +13,9 @@ engine = create_async_engine(
     echo=True,
     future=True,
 )
+instrument_engine(engine.sync_engine)
+if settings.SLOW_QUERY_LOG:
+    slow_query_log.install(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -23,6 +30,37 @@ class Base(DeclarativeBase):
     pass
 
 
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+async def bulk_insert_returning(
+    db: AsyncSession,
+    model: Type[ModelT],
+    rows: List[Dict[str, Any]],
+) -> List[ModelT]:
+    """
+    Insert rows with a single multi-row INSERT ... RETURNING.
+
+    Server defaults and generated keys come back in the same statement, so
+    no per-row flush/refresh is needed.
+
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+        rows: Column values for each row
+
+    Returns:
+        Persistent instances in the same order as rows
+    """
+    if not rows:
+        return []
+    result = await db.scalars(
+        insert(model).returning(model, sort_by_parameter_order=True),
+        rows,
+    )
+    return list(result.all())
+
+
 # Dependency for FastAPI routes
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,92 @@
+"""HTTP validators (ETag / Last-Modified) and conditional GET handling"""
+
+import hashlib
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional, Union
+from fastapi import Request, Response, status
+
+# Content-addressed files: the URL's bytes can never change
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Records that never change once created; bounded so a new API
+# representation reaches clients after a deploy
+STABLE_CACHE_CONTROL = "private, max-age=86400"
+# Reference data that changes only with deployments
+REFERENCE_CACHE_CONTROL = "private, max-age=3600"
+# Editable resources: clients may reuse them but must revalidate first
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+Timestamp = Union[datetime, float, None]
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from values that identify a resource version.
+
+    Args:
+        parts: Values that change whenever the representation changes
+            (e.g. primary key and updated_at)
+
+    Returns:
+        Quoted ETag header value
+    """
+    base = "|".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def _epoch(value: Timestamp) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Timestamp = None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against a resource.
+
+    If-Modified-Since is only considered when If-None-Match is absent
+    (RFC 9110 section 13.2.2).
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+        last_modified: Current modification time (datetime or epoch seconds)
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # GET uses weak comparison, so W/ prefixes are ignored
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    modified = _epoch(last_modified)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(modified) <= since
+
+    return False
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Timestamp = None,
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+) -> Dict[str, str]:
+    """Validator and Cache-Control headers for a response"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    modified = _epoch(last_modified)
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    return headers
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 response carrying the resource's validators"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
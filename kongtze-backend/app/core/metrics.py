@@ -0,0 +1,434 @@
+"""Per-request latency, database and AI call instrumentation"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Histogram upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Seconds
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)  # SQL statements per request
+AI_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)  # Seconds
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)  # Seconds
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetrics:
+    """Counters collected while one request is being handled"""
+
+    __slots__ = (
+        "scope", "db_statements", "db_seconds", "ai_calls", "ai_seconds", "bytes_in", "bytes_out", "statements",
+    )
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.ai_calls = 0
+        self.ai_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Parameterised SQL text -> executions, to spot N+1 loops
+        self.statements: Counter = Counter()
+
+    def repeated_statement(self) -> Tuple[Optional[str], int]:
+        """Return the most executed statement and its count"""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    @property
+    def route(self) -> Optional[str]:
+        """"METHOD /path/{template}" of the request, once it has been routed"""
+        if self.scope is None:
+            return None
+        return f"{self.scope['method']} {_route_template(self.scope)}"
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Metrics of the request being handled, or None outside a request"""
+    return _current.get()
+
+
+class Histogram:
+    """Fixed-bucket histogram (non-cumulative counts, plus an overflow bucket)"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Values in the overflow bucket report the largest bound.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def cumulative(self) -> list:
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append((float("inf"), self.count))
+        return pairs
+
+
+class RouteStats:
+    """Aggregated metrics of one route"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.db_statements = Histogram(STATEMENT_BUCKETS)
+        self.ai_calls = 0
+        self.ai_seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.n_plus_one = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_p50_ms": self.latency.quantile(0.5) * 1000,
+            "latency_p95_ms": self.latency.quantile(0.95) * 1000,
+            "latency_avg_ms": self.latency.sum / self.requests * 1000 if self.requests else 0.0,
+            "db_avg_ms": self.db_time.sum / self.requests * 1000 if self.requests else 0.0,
+            "db_statements_avg": self.db_statements.sum / self.requests if self.requests else 0.0,
+            "ai_calls": self.ai_calls,
+            "ai_seconds": self.ai_seconds,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "n_plus_one": self.n_plus_one,
+        }
+
+
+class RouteMetrics:
+    """
+    Per-route histograms and counters for the whole process.
+
+    Routes are keyed by method and path template (e.g.
+    "GET /api/tests/{test_id}"), so path parameters do not explode the
+    number of series.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = 10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+
+    def record(self, method: str, route: str, status_code: int, seconds: float, metrics: RequestMetrics):
+        """
+        Add a finished request to its route's statistics.
+
+        Logs a warning when one statement ran at least n_plus_one_threshold
+        times in the request, which almost always means a query in a loop.
+        """
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+
+        stats.requests += 1
+        if status_code >= 500:
+            stats.errors += 1
+        stats.latency.observe(seconds)
+        stats.db_time.observe(metrics.db_seconds)
+        stats.db_statements.observe(metrics.db_statements)
+        stats.ai_calls += metrics.ai_calls
+        stats.ai_seconds += metrics.ai_seconds
+        stats.bytes_in += metrics.bytes_in
+        stats.bytes_out += metrics.bytes_out
+
+        statement, count = metrics.repeated_statement()
+        if self.n_plus_one_threshold and count >= self.n_plus_one_threshold:
+            stats.n_plus_one += 1
+            summary = " ".join(statement.split())[:200]
+            print(f"Possible N+1 in {method} {route}: statement ran {count} times: {summary}")
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current statistics of every route, keyed by "METHOD /path" """
+        return {f"{method} {route}": stats.to_dict() for (method, route), stats in sorted(self.routes.items())}
+
+    def reset(self):
+        self.routes.clear()
+
+
+def server_timing(seconds: float, metrics: RequestMetrics) -> str:
+    """Build a Server-Timing header value (durations in milliseconds)"""
+    parts = [
+        f"app;dur={seconds * 1000:.1f}",
+        f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.db_statements} queries"',
+    ]
+    if metrics.ai_calls:
+        parts.append(f'ai;dur={metrics.ai_seconds * 1000:.1f};desc="{metrics.ai_calls} calls"')
+    return ", ".join(parts)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Path template of the matched route, including its router prefix.
+
+    scope["route"] is the route as declared on its APIRouter, so the
+    include_router prefix ("/api") is taken from the leading segments of the
+    request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if not template:
+        return UNMATCHED_ROUTE
+
+    segments = scope["path"].rstrip("/").split("/")
+    prefix_length = len(segments) - len(template.rstrip("/").split("/"))
+    if prefix_length <= 0:
+        return template
+    return "/".join(segments[:prefix_length + 1]) + template
+
+
+class AICallMetrics:
+    """Gemini call latency and error counts by call type"""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = {}
+        self.errors: Counter = Counter()
+
+    def record(self, call_type: str, seconds: float, failed: bool):
+        histogram = self.latency.get(call_type)
+        if histogram is None:
+            histogram = self.latency[call_type] = Histogram(AI_LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        if failed:
+            self.errors[call_type] += 1
+
+
+@asynccontextmanager
+async def track_ai_call(call_type: str):
+    """
+    Time a Gemini call against the current request and its call type.
+
+    Args:
+        call_type: Short label such as "question_generation" or "ocr"
+    """
+    metrics = _current.get()
+    start = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        elapsed = time.perf_counter() - start
+        ai_call_metrics.record(call_type, elapsed, failed)
+        if metrics is not None:
+            metrics.ai_calls += 1
+            metrics.ai_seconds += elapsed
+
+
+class EventLoopLagMonitor:
+    """
+    Measure how late the event loop wakes a sleeping task.
+
+    A task sleeps for a fixed interval and records the overshoot; sustained
+    lag means something is blocking the loop (CPU work, sync I/O).
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag = Histogram(LOOP_LAG_BUCKETS)
+        self.last = 0.0
+        self.max = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.lag.observe(lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    started = getattr(context, "_metrics_start", None)
+    if started is not None:
+        metrics.db_seconds += time.perf_counter() - started
+    metrics.db_statements += 1
+    metrics.statements[statement] += 1
+
+
+def instrument_engine(engine: Engine):
+    """Count statements and time spent in the database for the current request"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, SQL statements, DB time, AI time and bytes in/out.
+
+    Totals are added to per-route histograms once the response finishes and
+    reported to the client in a Server-Timing header. Register it outermost
+    so the timings cover the other middleware as well.
+    """
+
+    def __init__(self, app: ASGIApp, route_metrics: RouteMetrics, server_timing_header: bool = True):
+        self.app = app
+        self.route_metrics = route_metrics
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def receive_counted() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                metrics.bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_timed(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(time.perf_counter() - start, metrics))
+            elif message["type"] == "http.response.body":
+                metrics.bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_counted, send_timed)
+        finally:
+            _current.reset(token)
+            self.route_metrics.record(
+                scope["method"],
+                _route_template(scope),
+                status_code,
+                time.perf_counter() - start,
+                metrics,
+            )
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class PrometheusWriter:
+    """Build a Prometheus text exposition (format 0.0.4)"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, namespace: str = "kongtze"):
+        self.namespace = namespace
+        self._lines = []
+        self._declared = set()
+
+    def _declare(self, name: str, kind: str, help_text: str) -> str:
+        full_name = f"{self.namespace}_{name}"
+        if full_name not in self._declared:
+            self._declared.add(full_name)
+            self._lines.append(f"# HELP {full_name} {help_text}")
+            self._lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+    def _sample(self, name: str, labels: Dict[str, object], value: float):
+        if labels:
+            rendered = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            self._lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+        else:
+            self._lines.append(f"{name} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, value: float, **labels):
+        self._sample(self._declare(name, "gauge", help_text), labels, value)
+
+    def counter(self, name: str, help_text: str, value: float, **labels):
+        """Counter sample; name should end in _total"""
+        self._sample(self._declare(name, "counter", help_text), labels, value)
+
+    def histogram(self, name: str, help_text: str, histogram: Histogram, **labels):
+        full_name = self._declare(name, "histogram", help_text)
+        for bound, count in histogram.cumulative():
+            self._sample(f"{full_name}_bucket", {**labels, "le": _format_value(bound)}, count)
+        self._sample(f"{full_name}_sum", labels, histogram.sum)
+        self._sample(f"{full_name}_count", labels, histogram.count)
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+# Singleton instances
+route_metrics = RouteMetrics(n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD)
+ai_call_metrics = AICallMetrics()
+loop_lag_monitor = EventLoopLagMonitor(interval=settings.EVENT_LOOP_LAG_INTERVAL)
@@ -0,0 +1,199 @@
+"""Live-worker diagnostics: statistical sampling profiler and asyncio task dump"""
+
+import asyncio
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, Iterable, List, Optional, Set
+
+# Path fragment -> what a task awaiting inside it is waiting for
+AWAIT_CATEGORIES = (
+    ("sqlalchemy", "db"),
+    ("asyncpg", "db"),
+    ("aiosqlite", "db"),
+    ("ai_service.py", "gemini"),
+    ("ocr_service.py", "gemini"),
+    ("httpx", "http"),
+    ("httpcore", "http"),
+    ("anyio/to_thread", "thread"),
+    ("aiofiles", "file_io"),
+    ("file_storage.py", "file_io"),
+    ("image_upload.py", "file_io"),
+)
+GENERIC_CATEGORIES = {"http", "thread"}
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB = sysconfig.get_paths()["stdlib"]
+
+
+def short_path(filename: str) -> str:
+    """Shorten a source path to its package-relative form"""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    for root in (_APP_ROOT, _STDLIB):
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1:]
+    return filename
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_code.co_name} ({short_path(frame.f_code.co_filename)})"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """Render a frame and its callers as a root-first, ';'-joined stack"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a running process.
+
+    A background thread snapshots the stacks of the target threads at a
+    fixed interval. Nothing is traced between samples, so the overhead is
+    one sys._current_frames() call per interval. Output is the collapsed
+    stack format read by flamegraph.pl and speedscope.
+
+    The sampler needs the GIL to take a sample, so it tends to land when
+    the target releases it (select, I/O); CPU-bound frames are somewhat
+    under-represented and counts are best read as relative.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(
+        self,
+        seconds: float,
+        interval: float,
+        thread_ids: Optional[Set[int]] = None,
+    ) -> Counter:
+        """
+        Sample stacks for a duration (blocking; run it off the event loop).
+
+        Args:
+            seconds: How long to sample
+            interval: Seconds between samples
+            thread_ids: Threads to sample, or None for every other thread
+
+        Returns:
+            Counter of collapsed stacks ("thread;frame;frame") to sample counts
+
+        Raises:
+            ProfilerBusyError: If a profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            own_id = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks: Counter = Counter()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id or (thread_ids is not None and thread_id not in thread_ids):
+                        continue
+                    thread_name = names.get(thread_id, str(thread_id))
+                    stacks[f"{thread_name};{collapse_stack(frame)}"] += 1
+                # Jitter the interval so samples do not phase-lock with
+                # periodic work on the sampled threads
+                time.sleep(interval * random.uniform(0.5, 1.5))
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def render(stacks: Counter) -> str:
+        """Format sampled stacks as collapsed-stack lines, hottest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def await_chain(coro) -> List[str]:
+    """
+    Follow a suspended coroutine's await chain down to what it is blocked on.
+
+    Task.get_stack() only returns the outermost frame of a suspended
+    coroutine; walking cr_await shows every nested await.
+    """
+    chain = []
+    while coro is not None:
+        frame = (
+            getattr(coro, "cr_frame", None)
+            or getattr(coro, "gi_frame", None)
+            or getattr(coro, "ag_frame", None)
+        )
+        if frame is None:
+            # A future or other awaitable at the bottom of the chain
+            chain.append(f"<{type(coro).__name__}>")
+            break
+        chain.append(f"{frame.f_code.co_name} ({short_path(frame.f_code.co_filename)}:{frame.f_lineno})")
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+    return chain
+
+
+def classify_await(chain: Iterable[str]) -> str:
+    """
+    Name what a task is waiting on from its innermost recognised frame.
+
+    Transport-level matches (http, thread) give way to a more specific
+    caller further out, so a Gemini request is reported as "gemini".
+    """
+    fallback = "other"
+    for entry in reversed(list(chain)):
+        for fragment, category in AWAIT_CATEGORIES:
+            if fragment in entry:
+                if category not in GENERIC_CATEGORIES:
+                    return category
+                if fallback == "other":
+                    fallback = category
+                break
+    return fallback
+
+
+def dump_tasks(loop: Optional[asyncio.AbstractEventLoop] = None) -> Dict[str, object]:
+    """
+    Describe every pending asyncio task on the loop.
+
+    Returns:
+        Dict with per-category counts and, for each task, its name, await
+        chain and what it is waiting for (db, gemini, http, file_io, ...)
+    """
+    current = asyncio.current_task(loop)
+    tasks = []
+    for task in asyncio.all_tasks(loop):
+        if task is current:
+            continue
+        chain = await_chain(task.get_coro())
+        tasks.append({
+            "name": task.get_name(),
+            "waiting_on": classify_await(chain),
+            "await_chain": chain,
+        })
+    tasks.sort(key=lambda t: (t["waiting_on"], t["name"]))
+    return {
+        "total": len(tasks),
+        "by_waiting_on": dict(Counter(task["waiting_on"] for task in tasks)),
+        "tasks": tasks,
+    }
+
+
+# Singleton instance
+sampling_profiler = SamplingProfiler()
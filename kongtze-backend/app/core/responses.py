@@ -0,0 +1,39 @@
+"""Fast JSON responses for hot read endpoints"""
+
+from typing import Any
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for values orjson cannot serialize natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+def _is_model_content(content: Any) -> bool:
+    """Whether content is a model or a list of models"""
+    if isinstance(content, BaseModel):
+        return True
+    return isinstance(content, list) and bool(content) and isinstance(content[0], BaseModel)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response that serializes without FastAPI's response_model pass.
+
+    Routes return this directly with already-validated schema instances, so
+    the body is not validated a second time against response_model (which is
+    still used for the OpenAPI schema). Pydantic models are dumped straight
+    to bytes by pydantic-core; plain dicts and lists (e.g. projected rows)
+    go through orjson instead of jsonable_encoder + json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if _is_model_content(content):
+            return to_json(content)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,5 +1,8 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -19,6 +22,110 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when too many password hashes are already queued"""
+
+
+def _timed_call(func: Callable[..., Any], *args) -> Tuple[float, Any]:
+    """Run func in a worker, returning when it started and its result"""
+    started = time.perf_counter()
+    return started, func(*args)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a bounded thread pool.
+
+    bcrypt releases the GIL, so worker threads hash in parallel while the
+    event loop keeps serving other requests. At most PASSWORD_HASH_WORKERS
+    hashes run at once; up to PASSWORD_HASH_MAX_QUEUE more may wait, and
+    beyond that requests are rejected instead of queueing without bound.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args) -> Any:
+        workers = settings.PASSWORD_HASH_WORKERS
+        if self.pending >= workers + settings.PASSWORD_HASH_MAX_QUEUE:
+            self.rejected += 1
+            raise PasswordHasherBusyError("Password hashing queue is full")
+
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+            finished = time.perf_counter()
+            self.total_wait_seconds += started - submitted
+            self.total_run_seconds += finished - started
+            self.completed += 1
+            return result
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password off the event loop.
+
+        Raises:
+            PasswordHasherBusyError: If the hashing queue is full
+        """
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password off the event loop.
+
+        Raises:
+            PasswordHasherBusyError: If the hashing queue is full
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth and timing counters"""
+        workers = settings.PASSWORD_HASH_WORKERS
+        completed = self.completed or 1
+        return {
+            "workers": workers,
+            "in_flight": min(self.pending, workers),
+            "queue_depth": max(self.pending - workers, 0),
+            "peak_queue_depth": max(self.peak_pending - workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait_seconds / completed * 1000,
+            "avg_hash_ms": self.total_run_seconds / completed * 1000,
+        }
+
+    def shutdown(self):
+        """Stop the worker pool (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+password_hasher = PasswordHasher()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -0,0 +1,296 @@
+"""Slow-query log with sampled EXPLAIN capture"""
+
+import asyncio
+import contextvars
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import current_metrics
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - installed with SQLAlchemy's asyncio extra
+    greenlet = None
+
+# Dialect -> EXPLAIN prefix. Only read-only statements are explained, since
+# ANALYZE executes the statement again
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PROJECT_ROOT = os.path.dirname(_APP_DIR)
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_APP_DIR, "core", "database.py")}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\([^)]+\)s|%s|(?<!:):\w+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+\s*\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a statement to its shape so executions can be grouped.
+
+    Literals and placeholders (of any paramstyle) become "?", IN lists
+    collapse to "(?...)" and whitespace is squeezed.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    return " ".join(normalized.split())
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Describe bound parameters by type without exposing their values.
+
+    Returns:
+        {name: type} for named parameters, [type, ...] for positional ones,
+        and "N x <shape>" for executemany batches
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameter_shape(rows[0]) if rows else None}"
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+def _is_explainable(statement: str) -> bool:
+    head = statement.lstrip().upper()
+    return (head.startswith("SELECT") or head.startswith("WITH")) and "FOR UPDATE" not in head
+
+
+def calling_location() -> Optional[str]:
+    """
+    First frame in application code that led to the current statement.
+
+    With the asyncio extension, statements run in a greenlet whose stack
+    starts inside SQLAlchemy; the awaiting coroutine frames live in the
+    parent greenlet, so the search continues there.
+    """
+    frames = [sys._getframe(1)]
+    if greenlet is not None:
+        parent = greenlet.getcurrent().parent
+        if parent is not None and parent.gr_frame is not None:
+            frames.append(parent.gr_frame)
+
+    for frame in frames:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_DIR) and filename not in _SKIP_FILES:
+                return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+    return None
+
+
+class SlowStatement:
+    """Aggregate of every slow execution of one normalized statement"""
+
+    def __init__(self, normalized: str):
+        self.normalized = normalized
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen: Optional[datetime] = None
+        self.parameter_shape: Any = None
+        self.routes: Counter = Counter()
+        self.locations: Counter = Counter()
+        self.explain: Optional[str] = None
+        self.explained_at: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "statement": self.normalized,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_seen": self.last_seen,
+            "parameter_shape": self.parameter_shape,
+            "routes": dict(self.routes.most_common(5)),
+            "locations": dict(self.locations.most_common(5)),
+            "explain": self.explain,
+            "explained_at": self.explained_at,
+        }
+
+
+class SlowQueryLog:
+    """
+    Record statements slower than a threshold, grouped by normalized text.
+
+    Each slow execution is attributed to the request route and the
+    application code that issued it. A sample of slow read-only statements
+    is re-run under EXPLAIN on a separate connection after the fact, so the
+    plan is captured without adding to the request's latency.
+    """
+
+    ORDER_KEYS = {
+        "total": lambda entry: entry.total_ms,
+        "max": lambda entry: entry.max_ms,
+        "count": lambda entry: entry.count,
+    }
+
+    def __init__(
+        self,
+        threshold_ms: float = 200.0,
+        explain_sample_rate: float = 0.1,
+        explain_interval: float = 300.0,
+        max_statements: int = 200,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval = explain_interval
+        self.max_statements = max_statements
+        self.entries: Dict[str, SlowStatement] = {}
+        self._engine: Optional[AsyncEngine] = None
+        self._explain_tasks: set = set()
+
+    def install(self, engine: AsyncEngine):
+        """Attach the timing hooks to an engine"""
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        if not event.contains(sync_engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_start", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        metrics = current_metrics()
+        entry = self.record(
+            statement,
+            elapsed_ms,
+            parameter_shape(parameters, executemany),
+            route=metrics.route if metrics is not None else None,
+            location=calling_location(),
+        )
+        if not executemany and self._should_explain(entry, statement, conn.dialect.name):
+            self._schedule_explain(entry, statement, parameters, conn.dialect.name)
+
+    def record(
+        self,
+        statement: str,
+        elapsed_ms: float,
+        shape: Any = None,
+        route: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> SlowStatement:
+        """
+        Add one slow execution to the log.
+
+        Args:
+            statement: SQL as sent to the driver
+            elapsed_ms: Execution time in milliseconds
+            shape: Parameter types (see parameter_shape)
+            route: "METHOD /path" of the request, if any
+            location: Application source line that issued the statement
+
+        Returns:
+            The aggregate entry for the normalized statement
+        """
+        normalized = normalize_statement(statement)
+        entry = self.entries.get(normalized)
+        if entry is None:
+            if len(self.entries) >= self.max_statements:
+                # Make room by forgetting the entry that matters least
+                fastest = min(self.entries.values(), key=lambda e: e.max_ms)
+                del self.entries[fastest.normalized]
+            entry = self.entries[normalized] = SlowStatement(normalized)
+
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+        entry.last_seen = datetime.now(timezone.utc)
+        entry.parameter_shape = shape
+        if route:
+            entry.routes[route] += 1
+        if location:
+            entry.locations[location] += 1
+
+        print(f"Slow query ({elapsed_ms:.0f} ms) in {route or 'background'} at {location or 'unknown'}: {normalized[:200]}")
+        return entry
+
+    def _should_explain(self, entry: SlowStatement, statement: str, dialect: str) -> bool:
+        if self._engine is None or dialect not in EXPLAIN_PREFIXES or not _is_explainable(statement):
+            return False
+        if entry.explained_at is not None:
+            age = (datetime.now(timezone.utc) - entry.explained_at).total_seconds()
+            if age < self.explain_interval:
+                return False
+        return random.random() < self.explain_sample_rate
+
+    def _schedule_explain(self, entry: SlowStatement, statement: str, parameters: Any, dialect: str):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # A fresh context keeps the EXPLAIN out of the current request's metrics
+        task = loop.create_task(
+            self._explain(entry, EXPLAIN_PREFIXES[dialect] + statement, parameters),
+            context=contextvars.Context(),
+        )
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, entry: SlowStatement, statement: str, parameters: Any):
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(statement, parameters)
+                entry.explain = "\n".join(" ".join(str(column) for column in row) for row in result)
+                entry.explained_at = datetime.now(timezone.utc)
+                # Leaving the block rolls back anything ANALYZE executed
+        except Exception as e:
+            print(f"Slow query EXPLAIN failed: {type(e).__name__} - {e}")
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[Dict[str, Any]]:
+        """
+        Slowest normalized statements.
+
+        Args:
+            limit: Maximum entries to return
+            order_by: "total", "max" or "count"
+        """
+        key = self.ORDER_KEYS[order_by]
+        return [entry.to_dict() for entry in sorted(self.entries.values(), key=key, reverse=True)[:limit]]
+
+    def reset(self):
+        self.entries.clear()
+
+
+# Singleton instance
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    max_statements=settings.SLOW_QUERY_MAX_STATEMENTS,
+)
@@ -1,12 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import auth, subjects, study_sessions, tests, homework, class_notes, rewards, prompt_templates
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import RequestMetricsMiddleware, loop_lag_monitor, route_metrics
+from app.core.security import password_hasher
+from app.api import auth, subjects, study_sessions, tests, homework, class_notes, rewards, prompt_templates, files, admin, metrics
+from app.services.image_processing import image_processing_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_lag_monitor.start()
+    yield
+    await loop_lag_monitor.stop()
+    # Stop background worker pools
+    image_processing_service.shutdown()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="Kongtze API",
     description="AI-Powered Education Platform for Students",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -16,6 +33,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
+)
+
+# Response compression (gzip, or brotli when installed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+# Per-route latency/DB/AI metrics; added last so it wraps everything else
+app.add_middleware(
+    RequestMetricsMiddleware,
+    route_metrics=route_metrics,
+    server_timing_header=settings.SERVER_TIMING_HEADER,
 )
 
 # Include routers
@@ -27,6 +61,10 @@ app.include_router(homework.router, prefix=settings.API_PREFIX)
 app.include_router(class_notes.router, prefix=settings.API_PREFIX)
 app.include_router(rewards.router, prefix=settings.API_PREFIX)
 app.include_router(prompt_templates.router, prefix=settings.API_PREFIX)
+app.include_router(files.router, prefix=settings.API_PREFIX)
+app.include_router(admin.router, prefix=settings.API_PREFIX)
+# Outside the API prefix for scrapers; needs the METRICS_TOKEN bearer token
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
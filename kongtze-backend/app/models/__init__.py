@@ -15,6 +15,7 @@ from app.models.cached_explanation import CachedExplanation
 from app.models.student_profile import StudentProfile
 from app.models.student_performance_analytics import StudentPerformanceAnalytics
 from app.models.ai_prompt_template import AIPromptTemplate
+from app.models.stored_file import StoredFile
 
 __all__ = [
     "User",
@@ -32,4 +33,5 @@ __all__ = [
     "StudentProfile",
     "StudentPerformanceAnalytics",
     "AIPromptTemplate",
+    "StoredFile",
 ]
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy import Index, String, Text, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -8,6 +8,10 @@ from app.core.database import Base
 class ClassNote(Base):
     """Class notes upload and OCR results"""
     __tablename__ = "class_notes"
+    __table_args__ = (
+        # Keyset pagination: newest first per user
+        Index("ix_class_notes_user_uploaded_at", "user_id", "uploaded_at", "note_id"),
+    )
 
     note_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, func
+from sqlalchemy import Index, String, Text, DateTime, ForeignKey, Boolean, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -8,6 +8,10 @@ from app.core.database import Base
 class Homework(Base):
     """Homework upload and OCR results"""
     __tablename__ = "homework"
+    __table_args__ = (
+        # Keyset pagination: newest first per user
+        Index("ix_homework_user_uploaded_at", "user_id", "uploaded_at", "homework_id"),
+    )
 
     homework_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False)
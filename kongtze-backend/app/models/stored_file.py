@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Text, Integer, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class StoredFile(Base):
+    """Content-addressed upload blobs shared by every record that references them"""
+    __tablename__ = "stored_files"
+
+    # SHA256 hash of the uploaded bytes as primary key
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # Path relative to STORAGE_PATH, e.g. "blobs/ab/ab12...ef.jpg"
+    storage_path: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # dHash of the processed image (16 hex chars) for near-duplicate lookup
+    perceptual_hash: Mapped[Optional[str]] = mapped_column(String(16), nullable=True, index=True)
+
+    # Number of homework/note/gift rows pointing at this blob
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
+    # OCR result cached per content so duplicate uploads skip the vision call
+    ocr_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<StoredFile(hash='{self.content_hash[:16]}...', refs={self.ref_count})>"
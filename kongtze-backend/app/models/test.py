@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy import Index, String, Integer, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -8,6 +8,10 @@ from app.core.database import Base
 class Test(Base):
     """Test model for generated tests"""
     __tablename__ = "tests"
+    __table_args__ = (
+        # Keyset pagination: newest first per user
+        Index("ix_tests_user_created_at", "user_id", "created_at", "test_id"),
+    )
 
     test_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id"), nullable=False)
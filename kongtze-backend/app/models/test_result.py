@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Integer, DateTime, ForeignKey, JSON, func
+from typing import Optional
+from sqlalchemy import Index, Integer, DateTime, ForeignKey, JSON, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -7,6 +8,10 @@ from app.core.database import Base
 class TestResult(Base):
     """Test result model for submitted tests"""
     __tablename__ = "test_results"
+    __table_args__ = (
+        # Keyset pagination: newest first per user
+        Index("ix_test_results_user_submitted_at", "user_id", "submitted_at", "result_id"),
+    )
 
     result_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     test_id: Mapped[int] = mapped_column(ForeignKey("tests.test_id"), nullable=False)
@@ -20,6 +25,14 @@ class TestResult(Base):
     total_points: Mapped[int] = mapped_column(Integer, nullable=False)
     time_taken_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    # Questions in the test when it was submitted (NULL only for rows written
+    # outside submit_test; analytics fall back to Test.total_questions)
+    question_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Per-question outcome as parallel arrays in question order:
+    # {"question_ids": [...], "correct": [1, 0, ...], "seconds": [12, 40, ...]}
+    # "seconds" is null when the client did not report per-question times
+    question_timings: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
     # Reward points earned
     reward_points: Mapped[int] = mapped_column(Integer, default=0)
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy import String, Text, Float, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -17,6 +17,9 @@ class Topic(Base):
     topic_name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
+    # AI confidence that the note covers this topic (0.0-1.0)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
+
     # IB curriculum context
     curriculum_context: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
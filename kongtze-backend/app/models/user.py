@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Boolean, DateTime, func
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
@@ -8,13 +8,29 @@ from app.core.database import Base
 class User(Base):
     """User model for both parent and student"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Student PIN login: one probe for (pin, family); PINs are unique per family
+        Index("uq_users_pin_parent_id", "pin", "parent_id", unique=True),
+        # Students from before families have no parent_id and log in by PIN
+        # alone, so their PINs stay globally unique
+        Index(
+            "uq_users_pin_legacy",
+            "pin",
+            unique=True,
+            postgresql_where=text("parent_id IS NULL AND pin IS NOT NULL"),
+            sqlite_where=text("parent_id IS NULL AND pin IS NOT NULL"),
+        ),
+    )
 
     user_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     email: Mapped[Optional[str]] = mapped_column(String(255), unique=True, nullable=True)  # Parent only
     password_hash: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # Parent only
     pin: Mapped[Optional[str]] = mapped_column(String(4), nullable=True)  # Student only (4-digit)
+    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.user_id"), nullable=True)  # Student only (family)
     is_parent: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Embedded in issued JWTs as "ver"; incrementing it revokes existing tokens
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
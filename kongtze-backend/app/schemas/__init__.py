@@ -13,6 +13,7 @@ from app.schemas.subject import SubjectBase, SubjectCreate, SubjectResponse
 from app.schemas.study_session import (
     StudySessionBase,
     StudySessionCreate,
+    StudySessionWeekReplace,
     StudySessionUpdate,
     StudySessionResponse,
 )
@@ -27,6 +28,7 @@ from app.schemas.test import (
     TestWithQuestions,
     TestSubmission,
     TestResultResponse,
+    TestResultWithTimings,
     TestResultWithReview,
 )
 from app.schemas.homework import (
@@ -70,6 +72,7 @@ __all__ = [
     # Study Session
     "StudySessionBase",
     "StudySessionCreate",
+    "StudySessionWeekReplace",
     "StudySessionUpdate",
     "StudySessionResponse",
     # Test
@@ -83,6 +86,7 @@ __all__ = [
     "TestWithQuestions",
     "TestSubmission",
     "TestResultResponse",
+    "TestResultWithTimings",
     "TestResultWithReview",
     # Homework
     "HomeworkBase",
@@ -1,7 +1,7 @@
 """Study session schemas for API validation"""
 
 from datetime import datetime, time
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -20,6 +20,11 @@ class StudySessionCreate(StudySessionBase):
     pass
 
 
+class StudySessionWeekReplace(BaseModel):
+    """Schema for replacing the whole weekly schedule at once"""
+    sessions: List[StudySessionCreate] = Field(..., max_length=50)
+
+
 class StudySessionUpdate(BaseModel):
     """Schema for updating a study session"""
     subject_id: Optional[int] = None
@@ -1,8 +1,8 @@
 """Test, Question, and TestResult schemas for API validation"""
 
 from datetime import datetime
-from typing import List, Dict, Optional
-from pydantic import BaseModel, Field
+from typing import Any, List, Dict, Optional
+from pydantic import BaseModel, Field, NonNegativeInt
 
 
 # Question schemas
@@ -74,6 +74,9 @@ class TestSubmission(BaseModel):
     test_id: int
     answers: Dict[str, str] = Field(..., description="Map of question_id to answer (A/B/C/D)")
     time_taken_seconds: int
+    question_times: Optional[Dict[str, NonNegativeInt]] = Field(
+        default=None, description="Optional map of question_id to seconds spent on it"
+    )
 
 
 class TestResultResponse(BaseModel):
@@ -85,6 +88,7 @@ class TestResultResponse(BaseModel):
     total_points: int
     time_taken_seconds: int
     answers: Dict[str, str]
+    question_count: Optional[int] = None
     reward_points: int
     submitted_at: datetime
 
@@ -92,7 +96,12 @@ class TestResultResponse(BaseModel):
         from_attributes = True
 
 
-class TestResultWithReview(TestResultResponse):
+class TestResultWithTimings(TestResultResponse):
+    """Schema for a single test result with per-question outcomes (not in lists)"""
+    question_timings: Optional[Dict[str, Any]] = None
+
+
+class TestResultWithReview(TestResultWithTimings):
     """Schema for test result with detailed review"""
     questions: List[QuestionWithAnswer]
     percentage: float = Field(..., description="Score percentage (0-100)")
@@ -25,6 +25,7 @@ class UserLogin(BaseModel):
     """Schema for user login"""
     email: Optional[EmailStr] = None  # For parent login
     pin: Optional[str] = Field(None, pattern=r"^\d{4}$")  # For student login
+    family_id: Optional[int] = None  # For student login: the parent's user_id
     password: Optional[str] = None  # For parent login
 
 
@@ -33,6 +34,7 @@ class UserResponse(UserBase):
     user_id: int
     email: Optional[str] = None
     is_parent: bool
+    parent_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -50,3 +52,4 @@ class TokenData(BaseModel):
     """Schema for token payload data"""
     user_id: int
     is_parent: bool
+    token_version: int = 0
@@ -3,13 +3,23 @@
 from app.services.ai_service import ai_service
 from app.services.ocr_service import ocr_service
 from app.services.file_storage import file_storage
+from app.services.image_processing import image_processing_service
+from app.services.perceptual_hash import perceptual_hash_index
+from app.services.image_upload import image_upload_service
+from app.services.image_derivatives import image_derivative_service
 from app.services.test_context_builder import test_context_builder
 from app.services.adaptive_difficulty_service import adaptive_difficulty_service
+from app.services.user_cache import user_cache
 
 __all__ = [
     "ai_service",
     "ocr_service",
     "file_storage",
+    "image_processing_service",
+    "perceptual_hash_index",
+    "image_upload_service",
+    "image_derivative_service",
     "test_context_builder",
-    "adaptive_difficulty_service"
+    "adaptive_difficulty_service",
+    "user_cache",
 ]
@@ -9,7 +9,15 @@ from decimal import Decimal
 from app.models.test_result import TestResult
 from app.models.test import Test
 from app.models.student_performance_analytics import StudentPerformanceAnalytics
-from app.core.cache import cached, invalidate_cache
+from app.core.cache import cache, invalidate_cache
+from app.services.analytics_kernels import (
+    answer_seconds,
+    columns_from_pairs,
+    difficulty_breakdown,
+    difficulty_trend,
+    result_columns,
+    score_columns_from_pairs,
+)
 
 
 class AdaptiveDifficultyService:
@@ -24,7 +32,11 @@ class AdaptiveDifficultyService:
     FAST_TIME_MULTIPLIER = 0.8   # If time < 80% of expected, student is fast
     SLOW_TIME_MULTIPLIER = 1.2   # If time > 120% of expected, student is slow
 
-    @cached(ttl=300, key_prefix="adaptive_difficulty")
+    CACHE_TTL = 300  # Seconds to cache a recommended difficulty
+
+    def _cache_key(self, user_id: int, subject_id: int, lookback_tests: int) -> str:
+        return f"adaptive_difficulty:{user_id}:{subject_id}:{lookback_tests}"
+
     async def calculate_recommended_difficulty(
         self,
         user_id: int,
@@ -44,22 +56,112 @@ class AdaptiveDifficultyService:
         Returns:
             Recommended difficulty level (1-4)
         """
-        # Get recent test results
-        result = await db.execute(
-            select(TestResult, Test)
+        difficulties = await self.calculate_recommended_difficulties(
+            user_id, [subject_id], db, lookback_tests
+        )
+        return difficulties[subject_id]
+
+    async def calculate_recommended_difficulties(
+        self,
+        user_id: int,
+        subject_ids: List[int],
+        db: AsyncSession,
+        lookback_tests: int = 5
+    ) -> Dict[int, int]:
+        """
+        Calculate recommended difficulty levels for several subjects at once
+
+        Cached subjects are served from cache; the rest are computed from a
+        single query that ranks each subject's results with row_number() and
+        keeps the last lookback_tests per subject.
+
+        Args:
+            user_id: User ID
+            subject_ids: Subject IDs
+            db: Database session
+            lookback_tests: Number of recent tests to analyze per subject
+
+        Returns:
+            Dictionary mapping subject ID to recommended difficulty level (1-4)
+        """
+        difficulties: Dict[int, int] = {}
+        missing = []
+        for subject_id in dict.fromkeys(subject_ids):
+            cached_value = cache.get(self._cache_key(user_id, subject_id, lookback_tests))
+            if cached_value is not None:
+                difficulties[subject_id] = cached_value
+            else:
+                missing.append(subject_id)
+
+        if not missing:
+            return difficulties
+
+        ranked = (
+            select(
+                Test.subject_id,
+                TestResult.score,
+                TestResult.total_points,
+                TestResult.time_taken_seconds,
+                Test.difficulty_level,
+                func.coalesce(TestResult.question_count, Test.total_questions).label("question_count"),
+                TestResult.question_timings,
+                func.row_number().over(
+                    partition_by=Test.subject_id,
+                    order_by=desc(TestResult.submitted_at),
+                ).label("recency"),
+            )
             .join(Test, TestResult.test_id == Test.test_id)
             .where(
                 and_(
                     TestResult.user_id == user_id,
-                    Test.subject_id == subject_id
+                    Test.subject_id.in_(missing)
                 )
             )
-            .order_by(desc(TestResult.submitted_at))
-            .limit(lookback_tests)
+            .subquery()
+        )
+        result = await db.execute(
+            select(
+                ranked.c.subject_id,
+                ranked.c.score,
+                ranked.c.total_points,
+                ranked.c.time_taken_seconds,
+                ranked.c.difficulty_level,
+                ranked.c.question_count,
+                ranked.c.question_timings,
+            )
+            .where(ranked.c.recency <= lookback_tests)
+            .order_by(ranked.c.subject_id, ranked.c.recency)
         )
 
-        recent_tests = result.all()
+        # Rows per subject, most recent first
+        rows_by_subject: Dict[int, List[tuple]] = {subject_id: [] for subject_id in missing}
+        for subject_id, score, points, time_taken, difficulty, question_count, timings in result.all():
+            rows_by_subject[subject_id].append(
+                (score, points, answer_seconds(time_taken, timings), difficulty, question_count)
+            )
+
+        for subject_id, rows in rows_by_subject.items():
+            recommended = self._recommend_difficulty(rows)
+            cache.set(
+                self._cache_key(user_id, subject_id, lookback_tests),
+                recommended,
+                self.CACHE_TTL,
+            )
+            difficulties[subject_id] = recommended
+
+        return difficulties
+
+    def _recommend_difficulty(self, recent_tests: List[tuple]) -> int:
+        """
+        Score recent results into a recommended difficulty level
 
+        Args:
+            recent_tests: (score, total_points, answer_seconds,
+                difficulty_level, question_count) tuples, most recent first
+
+        Returns:
+            Recommended difficulty level (1-4)
+        """
         if len(recent_tests) < self.MIN_TESTS_FOR_ADJUSTMENT:
             # Not enough data, return default difficulty
             return 2
@@ -71,13 +173,12 @@ class AdaptiveDifficultyService:
         total_questions = 0
         current_difficulty = 2
 
-        for test_result, test in recent_tests:
-            total_score += test_result.score
-            total_points += test_result.total_points
-            total_time += test_result.time_taken_seconds
-            # Estimate questions from test (you may need to adjust this)
-            total_questions += 10  # Default assumption
-            current_difficulty = test.difficulty_level
+        for score, points, seconds, difficulty_level, question_count in recent_tests:
+            total_score += score
+            total_points += points
+            total_time += seconds
+            total_questions += question_count
+            current_difficulty = difficulty_level
 
         # Calculate average score percentage
         avg_score_pct = (total_score / total_points * 100) if total_points > 0 else 0
@@ -133,9 +234,16 @@ class AdaptiveDifficultyService:
         period_end = date.today()
         period_start = period_end - timedelta(days=analysis_period_days)
 
-        # Get all test results in the period
+        # Get all test results in the period, as columns
         result = await db.execute(
-            select(TestResult, Test)
+            select(
+                TestResult.score,
+                TestResult.total_points,
+                TestResult.time_taken_seconds,
+                Test.difficulty_level,
+                func.coalesce(TestResult.question_count, Test.total_questions),
+                TestResult.question_timings,
+            )
             .join(Test, TestResult.test_id == Test.test_id)
             .where(
                 and_(
@@ -147,35 +255,41 @@ class AdaptiveDifficultyService:
             .order_by(TestResult.submitted_at)
         )
 
-        test_results = result.all()
+        rows = [
+            (score, points, answer_seconds(time_taken, timings), difficulty, question_count)
+            for score, points, time_taken, difficulty, question_count, timings in result.all()
+        ]
 
-        if not test_results:
+        if not rows:
             # No tests in period, return empty analytics
             return None
 
+        scores, points, times, difficulties, question_counts = result_columns(rows)
+
         # Calculate overall metrics
-        total_tests = len(test_results)
-        total_score = sum(tr.score for tr, _ in test_results)
-        total_points = sum(tr.total_points for tr, _ in test_results)
-        total_time = sum(tr.time_taken_seconds for tr, _ in test_results)
-        total_questions = total_tests * 10  # Estimate
+        total_tests = len(rows)
+        total_score = int(scores.sum())
+        total_points = int(points.sum())
+        total_time = int(times.sum())
+        total_questions = int(question_counts.sum())
 
         avg_score = Decimal(total_score / total_points * 100) if total_points > 0 else Decimal(0)
         avg_time_per_question = int(total_time / total_questions) if total_questions > 0 else 0
 
         # Get current difficulty from most recent test
-        current_difficulty = test_results[-1][1].difficulty_level
+        current_difficulty = int(difficulties[-1])
 
-        # Calculate recommended difficulty
+        # Calculate recommended difficulty from fresh results
+        invalidate_cache(f"adaptive_difficulty:{user_id}:{subject_id}:")
         recommended_difficulty = await self.calculate_recommended_difficulty(
             user_id, subject_id, db
         )
 
         # Calculate difficulty breakdown
-        difficulty_breakdown = await self._calculate_difficulty_breakdown(test_results)
+        breakdown = difficulty_breakdown(scores, points, times, difficulties, question_counts)
 
         # Determine trend
-        difficulty_trend = self._calculate_difficulty_trend(test_results)
+        trend = difficulty_trend(scores, points)
 
         # Get or create analytics record
         analytics_result = await db.execute(
@@ -196,10 +310,10 @@ class AdaptiveDifficultyService:
             analytics.average_time_per_question = avg_time_per_question
             analytics.current_difficulty_level = current_difficulty
             analytics.recommended_difficulty_level = recommended_difficulty
-            analytics.difficulty_trend = difficulty_trend
+            analytics.difficulty_trend = trend
             analytics.period_start = period_start
             analytics.period_end = period_end
-            analytics.difficulty_breakdown = difficulty_breakdown
+            analytics.difficulty_breakdown = breakdown
         else:
             # Create new
             analytics = StudentPerformanceAnalytics(
@@ -210,19 +324,16 @@ class AdaptiveDifficultyService:
                 average_time_per_question=avg_time_per_question,
                 current_difficulty_level=current_difficulty,
                 recommended_difficulty_level=recommended_difficulty,
-                difficulty_trend=difficulty_trend,
+                difficulty_trend=trend,
                 period_start=period_start,
                 period_end=period_end,
-                difficulty_breakdown=difficulty_breakdown
+                difficulty_breakdown=breakdown
             )
             db.add(analytics)
 
         await db.commit()
         await db.refresh(analytics)
 
-        # Invalidate cache for this user/subject
-        invalidate_cache(f"adaptive_difficulty:{user_id}:{subject_id}")
-
         return analytics
 
     async def _calculate_difficulty_breakdown(
@@ -238,40 +349,7 @@ class AdaptiveDifficultyService:
         Returns:
             Dictionary with breakdown by difficulty
         """
-        breakdown = {}
-
-        for test_result, test in test_results:
-            difficulty = str(test.difficulty_level)
-
-            if difficulty not in breakdown:
-                breakdown[difficulty] = {
-                    "tests": 0,
-                    "avg_score": 0,
-                    "avg_time": 0,
-                    "total_score": 0,
-                    "total_points": 0,
-                    "total_time": 0
-                }
-
-            breakdown[difficulty]["tests"] += 1
-            breakdown[difficulty]["total_score"] += test_result.score
-            breakdown[difficulty]["total_points"] += test_result.total_points
-            breakdown[difficulty]["total_time"] += test_result.time_taken_seconds
-
-        # Calculate averages
-        for difficulty in breakdown:
-            data = breakdown[difficulty]
-            if data["total_points"] > 0:
-                data["avg_score"] = round(data["total_score"] / data["total_points"] * 100, 2)
-            if data["tests"] > 0:
-                data["avg_time"] = round(data["total_time"] / data["tests"] / 10, 2)  # Per question estimate
-
-            # Remove temporary totals
-            del data["total_score"]
-            del data["total_points"]
-            del data["total_time"]
-
-        return breakdown
+        return difficulty_breakdown(*columns_from_pairs(test_results))
 
     def _calculate_difficulty_trend(
         self,
@@ -286,28 +364,8 @@ class AdaptiveDifficultyService:
         Returns:
             Trend string: 'improving', 'stable', or 'declining'
         """
-        if len(test_results) < 3:
-            return "stable"
-
-        # Split into first half and second half
-        mid_point = len(test_results) // 2
-        first_half = test_results[:mid_point]
-        second_half = test_results[mid_point:]
-
-        # Calculate average scores for each half
-        first_half_score = sum(tr.score / tr.total_points for tr, _ in first_half if tr.total_points > 0) / len(first_half)
-        second_half_score = sum(tr.score / tr.total_points for tr, _ in second_half if tr.total_points > 0) / len(second_half)
-
-        # Compare
-        diff = second_half_score - first_half_score
-
-        if diff > 0.05:  # 5% improvement
-            return "improving"
-        elif diff < -0.05:  # 5% decline
-            return "declining"
-        else:
-            return "stable"
-
+        scores, points = score_columns_from_pairs(test_results)
+        return difficulty_trend(scores, points)
 
     async def calculate_dynamic_question_count(
         self,
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.config import settings
+from app.core.metrics import track_ai_call
 from app.models.cached_explanation import CachedExplanation
 
 
@@ -16,13 +17,16 @@ class AIService:
 
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
-        # Use gemini-2.5-flash which is available and supports generateContent
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+        base_url = settings.GEMINI_API_BASE_URL.rstrip("/")
+        self.api_url = f"{base_url}/v1beta/models/{settings.GEMINI_MODEL}:generateContent"
+        # CachedExplanation lookups since startup
+        self.explanation_cache_hits = 0
+        self.explanation_cache_misses = 0
     
-    async def _call_gemini_api(self, prompt: str) -> str:
-        """Call Gemini API directly using REST"""
+    async def _call_gemini_api(self, prompt: str, call_type: str) -> str:
+        """Call Gemini API directly using REST, timed under call_type"""
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with httpx.AsyncClient(timeout=60.0) as client, track_ai_call(call_type):
                 response = await client.post(
                     f"{self.api_url}?key={self.api_key}",
                     json={
@@ -108,7 +112,7 @@ Format your response as a JSON array with this exact structure:
 Important: Return ONLY the JSON array, no additional text or markdown formatting."""
 
         try:
-            response_text = await self._call_gemini_api(prompt)
+            response_text = await self._call_gemini_api(prompt, "question_generation")
 
             # Remove markdown code blocks if present
             if response_text.startswith("```json"):
@@ -194,12 +198,14 @@ Important: Return ONLY the JSON array, no additional text or markdown formatting
         cached = result.scalar_one_or_none()
 
         if cached:
+            self.explanation_cache_hits += 1
             # Update hit count and last accessed
             cached.hit_count += 1
             await db.flush()
             return cached.ai_explanation
 
         # Generate new explanation
+        self.explanation_cache_misses += 1
         is_correct = user_answer == correct_answer
 
         prompt = f"""Explain this question to a primary school student:
@@ -217,7 +223,8 @@ Provide:
 Keep the explanation simple, encouraging, and educational (2-3 sentences)."""
 
         try:
-            response = self.model.generate_content(prompt)
+            async with track_ai_call("explanation"):
+                response = self.model.generate_content(prompt)
             explanation = response.text.strip()
 
             # Cache the explanation
@@ -237,18 +244,19 @@ Keep the explanation simple, encouraging, and educational (2-3 sentences)."""
                 "Keep practicing to improve your understanding!"
             )
 
-    async def generate_text(self, prompt: str) -> str:
+    async def generate_text(self, prompt: str, call_type: str = "text") -> str:
         """
         Generate text using Gemini AI for general purposes.
         
         Args:
             prompt: The prompt to send to the AI
+            call_type: Label the call is counted under in metrics
             
         Returns:
             Generated text response
         """
         try:
-            return await self._call_gemini_api(prompt)
+            return await self._call_gemini_api(prompt, call_type)
         except Exception as e:
             # Re-raise with the original error message
             error_msg = str(e) if str(e) else f"{type(e).__name__} occurred"
@@ -287,7 +295,7 @@ Format your response as a JSON array:
 Return ONLY the JSON array, no additional text."""
 
         try:
-            response_text = await self._call_gemini_api(prompt)
+            response_text = await self._call_gemini_api(prompt, "topic_extraction")
 
             # Remove markdown code blocks if present
             if response_text.startswith("```json"):
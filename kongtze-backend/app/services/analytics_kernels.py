@@ -0,0 +1,178 @@
+"""Array-backed kernels for performance analytics
+
+The analytics work on columns (score, total points, time spent answering,
+difficulty and question count per result, oldest first) rather than on
+(TestResult, Test) objects, so a year of history is aggregated without
+touching each ORM row in Python. Sums are done in integers and averages
+in Python floats, so results match a row-by-row loop exactly.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+ResultColumns = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+# A half must improve or decline by more than this share of points to count
+TREND_THRESHOLD = 0.05
+
+
+def question_timings(
+    question_ids: Sequence[int],
+    correct: Sequence[bool],
+    question_times: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Per-question outcome of a submission, as parallel arrays.
+
+    Args:
+        question_ids: Question IDs in question order
+        correct: Whether each question was answered correctly
+        question_times: Optional map of question_id to seconds, as submitted
+
+    Returns:
+        {"question_ids": [...], "correct": [1, 0, ...], "seconds": [...] or None};
+        a question missing from question_times has None seconds
+    """
+    seconds = None
+    if question_times:
+        seconds = [question_times.get(str(question_id)) for question_id in question_ids]
+    return {
+        "question_ids": list(question_ids),
+        "correct": [int(is_correct) for is_correct in correct],
+        "seconds": seconds,
+    }
+
+
+def answer_seconds(time_taken_seconds: int, timings: Optional[Dict[str, Any]]) -> int:
+    """
+    Seconds spent answering questions in one result.
+
+    The sum of per-question times when every question has one, which leaves
+    out time spent reviewing; otherwise the whole test's time.
+    """
+    seconds = (timings or {}).get("seconds")
+    if seconds and all(value is not None for value in seconds):
+        return sum(seconds)
+    return time_taken_seconds
+
+
+def result_columns(rows: Sequence[Iterable[int]]) -> ResultColumns:
+    """
+    Split result rows into int64 columns.
+
+    Args:
+        rows: (score, total_points, time_taken_seconds, difficulty_level,
+            question_count) tuples, e.g. from a column select
+
+    Returns:
+        scores, points, times, difficulties and question counts arrays of
+        equal length
+    """
+    if not len(rows):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty
+    scores, points, times, difficulties, question_counts = np.array(rows, dtype=np.int64).T
+    return scores, points, times, difficulties, question_counts
+
+
+def columns_from_pairs(test_results: Sequence[tuple]) -> ResultColumns:
+    """Columns from (TestResult, Test) pairs, for callers that already loaded objects"""
+    return result_columns([
+        (
+            test_result.score,
+            test_result.total_points,
+            answer_seconds(test_result.time_taken_seconds, test_result.question_timings),
+            test.difficulty_level,
+            test_result.question_count or test.total_questions,
+        )
+        for test_result, test in test_results
+    ])
+
+
+def score_columns_from_pairs(test_results: Sequence[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """Scores and available points from (TestResult, Test) pairs, all the trend needs"""
+    count = len(test_results)
+    scores = np.fromiter((test_result.score for test_result, _ in test_results), dtype=np.int64, count=count)
+    points = np.fromiter((test_result.total_points for test_result, _ in test_results), dtype=np.int64, count=count)
+    return scores, points
+
+
+def difficulty_breakdown(
+    scores: np.ndarray,
+    points: np.ndarray,
+    times: np.ndarray,
+    difficulties: np.ndarray,
+    question_counts: np.ndarray,
+) -> Dict[str, Dict]:
+    """
+    Tests, average score and average time per question for each difficulty.
+
+    Args:
+        scores: Points scored per result
+        points: Points available per result
+        times: Seconds spent answering per result
+        difficulties: Test difficulty level per result
+        question_counts: Questions per result
+
+    Returns:
+        {"<level>": {"tests", "avg_score", "avg_time"}}, levels in order of
+        first appearance
+    """
+    if len(difficulties) == 0:
+        return {}
+
+    # A stable sort keeps each level's first result first, so order[starts]
+    # is where the level first appears
+    order = np.argsort(difficulties, kind="stable")
+    sorted_levels = difficulties[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_levels[1:] != sorted_levels[:-1])))
+    counts = np.diff(np.append(starts, len(order)))
+    score_sums = np.add.reduceat(scores[order], starts)
+    point_sums = np.add.reduceat(points[order], starts)
+    time_sums = np.add.reduceat(times[order], starts)
+    question_sums = np.add.reduceat(question_counts[order], starts)
+
+    breakdown = {}
+    for i in np.argsort(order[starts], kind="stable"):
+        total_score, total_points, total_time, total_questions = (
+            int(score_sums[i]), int(point_sums[i]), int(time_sums[i]), int(question_sums[i])
+        )
+        breakdown[str(int(sorted_levels[starts[i]]))] = {
+            "tests": int(counts[i]),
+            "avg_score": round(total_score / total_points * 100, 2) if total_points > 0 else 0,
+            "avg_time": round(total_time / total_questions, 2) if total_questions > 0 else 0,  # Per question
+        }
+    return breakdown
+
+
+def difficulty_trend(scores: np.ndarray, points: np.ndarray) -> str:
+    """
+    Compare the average score share of the older and newer half of results.
+
+    Args:
+        scores: Points scored per result, oldest first
+        points: Points available per result
+
+    Returns:
+        Trend string: 'improving', 'stable', or 'declining'
+    """
+    count = len(scores)
+    if count < 3:
+        return "stable"
+
+    mid_point = count // 2
+    answered = points > 0
+    ratios = np.divide(scores, points, out=np.zeros(count), where=answered)
+
+    # Results without points count towards the half's size but not its sum.
+    # The sum is Python's, so floating-point rounding matches the old loop
+    first_half = sum(ratios[:mid_point][answered[:mid_point]].tolist()) / mid_point
+    second_half = sum(ratios[mid_point:][answered[mid_point:]].tolist()) / (count - mid_point)
+
+    diff = second_half - first_half
+    if diff > TREND_THRESHOLD:
+        return "improving"
+    elif diff < -TREND_THRESHOLD:
+        return "declining"
+    return "stable"
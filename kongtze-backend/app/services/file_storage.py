@@ -1,17 +1,78 @@
 """File storage utilities for handling uploads"""
 
+import hashlib
 import os
 import uuid
-from datetime import datetime
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple
+from typing import Optional
+import anyio
 from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, update, delete
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.dialects.postgresql import insert
 
 from app.core.config import settings
+from app.models.stored_file import StoredFile
+
+
+# Leading bytes of the image formats accepted for upload
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",          # JPEG
+    b"\x89PNG\r\n\x1a\n",     # PNG
+    b"GIF87a",
+    b"GIF89a",
+    b"BM",                     # BMP
+    b"II*\x00",                # TIFF (little-endian)
+    b"MM\x00*",                # TIFF (big-endian)
+)
+
+
+# Session.info key for blobs moved aside by delete_file, as (path, tombstone)
+PENDING_DELETES_KEY = "file_storage.pending_deletes"
+
+# Session.info key for blobs placed by store() for a new StoredFile row,
+# as (path, (st_dev, st_ino))
+PENDING_BLOBS_KEY = "file_storage.pending_blobs"
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES"""
+
+
+def is_image_header(header: bytes) -> bool:
+    """Check the leading bytes of a file against known image signatures"""
+    if header.startswith(IMAGE_SIGNATURES):
+        return True
+    # WebP: RIFF....WEBP
+    return header[:4] == b"RIFF" and header[8:12] == b"WEBP"
+
+
+@dataclass
+class StagedUpload:
+    """An upload streamed to a temporary file under STORAGE_PATH"""
+    path: Path
+    content_hash: str
+    size: int
+
+    async def discard(self):
+        """Remove the temporary file if it was not moved into place"""
+        await anyio.Path(self.path).unlink(missing_ok=True)
 
 
 class FileStorageService:
-    """Service for handling file uploads and storage"""
+    """
+    Service for handling file uploads and storage.
+
+    Uploads are content-addressed: each distinct file is written once under
+    blobs/<hash[:2]>/<hash><ext> and reference counted in stored_files, so
+    re-uploading the same worksheet reuses the existing blob.
+    """
+
+    BLOB_DIR = "blobs"
+    TMP_DIR = "tmp"
+    DERIVATIVE_DIR = "derivatives"
 
     def __init__(self):
         self.storage_path = Path(settings.STORAGE_PATH)
@@ -19,72 +80,318 @@ class FileStorageService:
 
     def _ensure_directories(self):
         """Ensure storage directories exist"""
-        (self.storage_path / "homework").mkdir(parents=True, exist_ok=True)
-        (self.storage_path / "class_notes").mkdir(parents=True, exist_ok=True)
-        (self.storage_path / "gifts").mkdir(parents=True, exist_ok=True)
+        (self.storage_path / self.BLOB_DIR).mkdir(parents=True, exist_ok=True)
+        # Temp files live on the same filesystem so os.replace is atomic
+        (self.storage_path / self.TMP_DIR).mkdir(parents=True, exist_ok=True)
 
-    async def save_upload(
-        self,
-        file: UploadFile,
-        category: str,
-        user_id: int,
-    ) -> Tuple[str, str]:
+    def temp_path(self, suffix: str = ".tmp") -> Path:
+        """Get a unique path in the storage temp directory"""
+        return self.storage_path / self.TMP_DIR / f"{uuid.uuid4().hex}{suffix}"
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        """Get the SHA256 content key for file bytes"""
+        return hashlib.sha256(content).hexdigest()
+
+    async def stage_upload(self, file: UploadFile) -> StagedUpload:
         """
-        Save uploaded file to storage.
+        Stream an upload to a temporary file, hashing it on the way.
+
+        Chunks are written with async file I/O so memory per request stays at
+        one chunk regardless of upload size.
 
         Args:
             file: FastAPI UploadFile object
-            category: Storage category (homework, class_notes, gifts)
-            user_id: User ID for organizing files
 
         Returns:
-            Tuple of (relative_path, absolute_path)
+            StagedUpload with the temp path, SHA256 and size
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds MAX_UPLOAD_BYTES
+            ValueError: If the file does not start with an image signature
         """
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_ext = Path(file.filename).suffix
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"{timestamp}_{unique_id}{file_ext}"
+        max_bytes = settings.MAX_UPLOAD_BYTES
+        if file.size is not None and file.size > max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
 
-        # Create user directory
-        user_dir = self.storage_path / category / str(user_id)
-        user_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.temp_path()
+        digest = hashlib.sha256()
+        size = 0
 
-        # Save file
-        file_path = user_dir / filename
-        content = await file.read()
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as out:
+                while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                    if size == 0 and not is_image_header(chunk[:16]):
+                        raise ValueError("File is not a supported image type")
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    await out.write(chunk)
+            if size == 0:
+                raise ValueError("Empty upload")
+        except BaseException:
+            await anyio.Path(tmp_path).unlink(missing_ok=True)
+            raise
 
-        with open(file_path, "wb") as f:
-            f.write(content)
+        return StagedUpload(path=tmp_path, content_hash=digest.hexdigest(), size=size)
 
-        # Return relative path for database storage
-        relative_path = f"{category}/{user_id}/{filename}"
+    def _blob_path(self, content_hash: str, extension: str) -> str:
+        """Relative storage path for a content hash"""
+        return f"{self.BLOB_DIR}/{content_hash[:2]}/{content_hash}{extension}"
 
-        return relative_path, str(file_path)
+    async def acquire(
+        self,
+        content_hash: str,
+        db: AsyncSession,
+    ) -> Optional[StoredFile]:
+        """
+        Take a new reference to already-stored content.
+
+        Args:
+            content_hash: SHA256 of the uploaded bytes
+            db: Database session
+
+        Returns:
+            The StoredFile with its reference count incremented, or None if
+            the content has not been stored yet
+        """
+        result = await db.scalars(
+            update(StoredFile)
+            .where(StoredFile.content_hash == content_hash)
+            .values(ref_count=StoredFile.ref_count + 1)
+            .returning(StoredFile)
+        )
+        return result.one_or_none()
+
+    async def store(
+        self,
+        content_hash: str,
+        source_path: Path,
+        extension: str,
+        db: AsyncSession,
+        perceptual_hash: Optional[str] = None,
+    ) -> StoredFile:
+        """
+        Move a staged file to its blob path and record a reference to it.
+
+        Args:
+            content_hash: Content key (SHA256 of the original upload)
+            source_path: Temp file under the storage temp directory (may be a
+                processed version of the upload); it is renamed into place
+            extension: File extension including the dot (e.g. ".jpg")
+            db: Database session
+            perceptual_hash: Optional dHash of the image for near-duplicate lookup
+
+        Returns:
+            StoredFile record for the content
+        """
+        relative_path = self._blob_path(content_hash, extension)
+        file_path = anyio.Path(self.storage_path / relative_path)
+
+        await file_path.parent.mkdir(parents=True, exist_ok=True)
+        size_bytes = (await anyio.Path(source_path).stat()).st_size
+        # Atomic rename so readers never see partial files
+        await anyio.to_thread.run_sync(os.replace, source_path, file_path)
+        placed = await file_path.stat()
+
+        # Upsert so concurrent uploads of the same content share one row
+        stmt = (
+            insert(StoredFile)
+            .values(
+                content_hash=content_hash,
+                storage_path=relative_path,
+                size_bytes=size_bytes,
+                perceptual_hash=perceptual_hash,
+                ref_count=1,
+            )
+            .on_conflict_do_update(
+                index_elements=[StoredFile.content_hash],
+                set_={"ref_count": StoredFile.ref_count + 1},
+            )
+            .returning(StoredFile)
+        )
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        stored_file = result.one()
+
+        if stored_file.ref_count == 1:
+            # This transaction created the row; without a commit nothing
+            # refers to the blob
+            session = db.sync_session
+            session.info.setdefault(PENDING_BLOBS_KEY, []).append(
+                (str(file_path), (placed.st_dev, placed.st_ino))
+            )
+            if not event.contains(session, "after_commit", _keep_placed):
+                event.listen(session, "after_commit", _keep_placed)
+                event.listen(session, "after_transaction_end", _remove_placed)
+        return stored_file
+
+    async def save_upload(
+        self,
+        file: UploadFile,
+        db: AsyncSession,
+    ) -> StoredFile:
+        """
+        Save uploaded file to storage as-is, reusing identical content.
+
+        Args:
+            file: FastAPI UploadFile object
+            db: Database session
+
+        Returns:
+            StoredFile record for the upload
+        """
+        staged = await self.stage_upload(file)
+        try:
+            stored_file = await self.acquire(staged.content_hash, db)
+            if stored_file is None:
+                stored_file = await self.store(
+                    staged.content_hash, staged.path, Path(file.filename).suffix, db
+                )
+        finally:
+            await staged.discard()
+        return stored_file
 
     def get_absolute_path(self, relative_path: str) -> str:
         """Get absolute path from relative path"""
         return str(self.storage_path / relative_path)
 
-    def delete_file(self, relative_path: str) -> bool:
+    def resolve_path(self, relative_path: str) -> Optional[Path]:
+        """
+        Resolve a stored relative path, refusing paths outside storage.
+
+        Args:
+            relative_path: Relative path as recorded in the database
+
+        Returns:
+            Absolute path, or None if it escapes STORAGE_PATH
+        """
+        root = self.storage_path.resolve()
+        path = (root / relative_path).resolve()
+        if not path.is_relative_to(root):
+            return None
+        return path
+
+    def is_immutable(self, relative_path: str) -> bool:
+        """Content-addressed blobs never change once written"""
+        return relative_path.startswith(f"{self.BLOB_DIR}/")
+
+    def derivative_path(self, relative_path: str, size_name: str, extension: str) -> Path:
+        """
+        Get the cache path of a resized derivative of a stored file.
+
+        Derivatives mirror the source layout under derivatives/<size>/.
+
+        Args:
+            relative_path: Relative path of the source file
+            size_name: Derivative size name (e.g. "sm")
+            extension: Derivative file extension including the dot
+
+        Returns:
+            Absolute path of the derivative
+        """
+        source = Path(relative_path)
+        return (
+            self.storage_path / self.DERIVATIVE_DIR / size_name
+            / source.parent / f"{source.stem}{extension}"
+        )
+
+    async def delete_file(self, relative_path: str, db: AsyncSession) -> bool:
         """
-        Delete a file from storage.
+        Release a reference to a stored file, deleting it once unreferenced.
+
+        The blob is moved aside at once and deleted when the transaction
+        commits; if it rolls back instead, the blob is put back, since the
+        records that reference it survive.
 
         Args:
             relative_path: Relative path to the file
+            db: Database session
 
         Returns:
-            True if deleted, False if file not found
+            True if the file will be removed from disk on commit, False otherwise
         """
+        result = await db.execute(
+            update(StoredFile)
+            .where(StoredFile.storage_path == relative_path)
+            .values(ref_count=StoredFile.ref_count - 1)
+            .returning(StoredFile.content_hash, StoredFile.ref_count)
+        )
+        row = result.one_or_none()
+
+        if row is not None:
+            if row.ref_count > 0:
+                # Still referenced by other records
+                return False
+            await db.execute(
+                delete(StoredFile).where(StoredFile.content_hash == row.content_hash)
+            )
+
+        # The row lock is held until commit, so a concurrent upload of the
+        # same content writes a fresh blob only after this one is moved aside
+        return self._set_aside(relative_path, db.sync_session)
+
+    def _set_aside(self, relative_path: str, session: Session) -> bool:
+        """Move a file to a tombstone until the session's transaction ends"""
         try:
+            # Derivatives are caches and are regenerated if the blob comes back
+            source = Path(relative_path)
+            for derivative in (self.storage_path / self.DERIVATIVE_DIR).glob(
+                f"*/{source.parent}/{source.stem}.*"
+            ):
+                derivative.unlink(missing_ok=True)
+
             file_path = self.storage_path / relative_path
-            if file_path.exists():
-                file_path.unlink()
-                return True
-            return False
-        except Exception:
+            tombstone = self.temp_path(".deleted")
+            os.replace(file_path, tombstone)
+        except OSError:
             return False
 
+        session.info.setdefault(PENDING_DELETES_KEY, []).append((file_path, tombstone))
+        if not event.contains(session, "after_commit", _purge_set_aside):
+            event.listen(session, "after_commit", _purge_set_aside)
+            event.listen(session, "after_transaction_end", _restore_set_aside)
+        return True
+
+
+def _purge_set_aside(session: Session):
+    """Delete blobs moved aside once the deletions are committed"""
+    for _, tombstone in session.info.pop(PENDING_DELETES_KEY, []):
+        tombstone.unlink(missing_ok=True)
+
+
+def _keep_placed(session: Session):
+    """Blobs placed by store() are referenced once their rows are committed"""
+    session.info.pop(PENDING_BLOBS_KEY, None)
+
+
+def _remove_placed(session: Session, transaction: SessionTransaction):
+    """Unlink blobs placed by store() when the transaction ended without a commit"""
+    if transaction.parent is not None:
+        return  # Savepoints; the outer transaction decides
+    for file_path, (device, inode) in session.info.pop(PENDING_BLOBS_KEY, []):
+        try:
+            current = os.stat(file_path)
+        except OSError:
+            continue
+        # Leave the file alone if a concurrent upload has replaced it since
+        if (current.st_dev, current.st_ino) == (device, inode):
+            try:
+                os.unlink(file_path)
+            except OSError:
+                pass
+
+
+def _restore_set_aside(session: Session, transaction: SessionTransaction):
+    """Put back blobs moved aside when the transaction ended without a commit"""
+    if transaction.parent is not None:
+        return  # Savepoints; the outer transaction decides
+    for file_path, tombstone in session.info.pop(PENDING_DELETES_KEY, []):
+        try:
+            os.replace(tombstone, file_path)
+        except OSError:
+            pass
+
 
 # Singleton instance
 file_storage = FileStorageService()
@@ -0,0 +1,145 @@
+"""Resized WebP derivatives of stored images for display"""
+
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.services.file_storage import file_storage
+from app.services.image_processing import image_processing_service
+
+# Longest edge in pixels for each derivative size
+DERIVATIVE_SIZES: Dict[str, int] = {
+    "sm": 160,
+    "md": 480,
+    "lg": 1024,
+}
+
+
+def render_derivative(
+    source_path: str,
+    dest_path: str,
+    max_edge: int,
+    quality: int,
+) -> int:
+    """
+    Write a downscaled WebP copy of an image.
+
+    Runs in a worker process, so it must stay a module-level function.
+
+    Args:
+        source_path: Original image file
+        dest_path: Derivative file to write (replaced atomically)
+        max_edge: Maximum width/height in pixels
+        quality: WebP quality (0-100)
+
+    Returns:
+        Size of the written file in bytes
+
+    Raises:
+        ValueError: If the source is not a decodable image
+    """
+    dest = Path(dest_path)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f".{uuid.uuid4().hex}.tmp")
+
+    try:
+        with Image.open(source_path) as source:
+            source.draft("RGB", (max_edge, max_edge))
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ("RGB", "RGBA", "L"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            image.save(tmp_path, format="WEBP", quality=quality, method=4)
+        os.replace(tmp_path, dest)
+    except (OSError, Image.DecompressionBombError) as e:
+        tmp_path.unlink(missing_ok=True)
+        raise ValueError(f"Invalid image: {e}") from e
+
+    return dest.stat().st_size
+
+
+class ImageDerivativeService:
+    """Service that generates and caches thumbnails of stored images"""
+
+    EXTENSION = ".webp"
+    MEDIA_TYPE = "image/webp"
+
+    def __init__(self):
+        # Concurrent requests for the same missing derivative share one render
+        self._inflight: Dict[Path, asyncio.Future] = {}
+
+    def _is_fresh(self, source: Path, derivative: Path) -> bool:
+        """Check that a cached derivative exists and is newer than its source"""
+        try:
+            return derivative.stat().st_mtime >= source.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+    async def get_path(self, relative_path: str, size_name: str) -> Path:
+        """
+        Get the path of a derivative, generating it on first use.
+
+        Args:
+            relative_path: Relative path of the stored source image
+            size_name: One of DERIVATIVE_SIZES
+
+        Returns:
+            Absolute path of the WebP derivative
+
+        Raises:
+            KeyError: If size_name is unknown
+            FileNotFoundError: If the source image is missing
+            ValueError: If the source is not a decodable image
+        """
+        max_edge = DERIVATIVE_SIZES[size_name]
+        source = file_storage.resolve_path(relative_path)
+        if source is None or not source.is_file():
+            raise FileNotFoundError(relative_path)
+
+        derivative = file_storage.derivative_path(relative_path, size_name, self.EXTENSION)
+        if self._is_fresh(source, derivative):
+            return derivative
+
+        future = self._inflight.get(derivative)
+        if future is None:
+            future = asyncio.ensure_future(
+                image_processing_service.run(
+                    render_derivative,
+                    str(source),
+                    str(derivative),
+                    max_edge,
+                    settings.IMAGE_DERIVATIVE_QUALITY,
+                )
+            )
+            self._inflight[derivative] = future
+            future.add_done_callback(lambda _: self._inflight.pop(derivative, None))
+
+        await asyncio.shield(future)
+        return derivative
+
+    async def generate_all(self, relative_path: str):
+        """
+        Pre-generate every derivative size for a stored image.
+
+        Used as a background task after upload when
+        IMAGE_DERIVATIVES_ON_UPLOAD is enabled; failures are ignored since
+        derivatives are regenerated on demand.
+
+        Args:
+            relative_path: Relative path of the stored source image
+        """
+        for size_name in DERIVATIVE_SIZES:
+            try:
+                await self.get_path(relative_path, size_name)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"Derivative generation error for {relative_path}: {e}")
+                return
+
+
+# Singleton instance
+image_derivative_service = ImageDerivativeService()
@@ -0,0 +1,260 @@
+"""Image pre-processing for uploaded photos before OCR and storage"""
+
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, TypeVar, Union
+
+from PIL import Image, ImageOps, ImageStat, UnidentifiedImageError
+
+from app.core.config import settings
+from app.services.perceptual_hash import dhash, format_hash
+
+T = TypeVar("T")
+
+# Mean HSV saturation (0-255) below which a photo is treated as a monochrome page
+GRAYSCALE_SATURATION_THRESHOLD = 32.0
+
+
+@dataclass
+class ProcessedImage:
+    """Result of pre-processing a single uploaded image"""
+    width: int
+    height: int
+    original_size: int
+    size: int
+    grayscale: bool
+    perceptual_hash: str  # 64-bit dHash as hex, for near-duplicate lookup
+    content: Optional[bytes] = None  # Only set when output is kept in memory
+
+
+def _is_low_saturation(image: Image.Image) -> bool:
+    """Check whether an image is effectively monochrome (e.g. a worksheet photo)"""
+    if image.mode == "L":
+        return True
+    sample = image.copy()
+    sample.thumbnail((64, 64))
+    saturation = ImageStat.Stat(sample.convert("HSV")).mean[1]
+    return saturation < GRAYSCALE_SATURATION_THRESHOLD
+
+
+def _preprocess(
+    source_file: Union[BinaryIO, Path],
+    original_size: int,
+    output: Union[BinaryIO, Path],
+    max_edge: int,
+    quality: int,
+    allow_grayscale: bool,
+) -> ProcessedImage:
+    """Decode, normalize and re-encode an image from a file or stream"""
+    try:
+        with Image.open(source_file) as source:
+            # Let the JPEG decoder scale down by DCT while decoding
+            source.draft("RGB", (max_edge, max_edge))
+            image = ImageOps.exif_transpose(source)
+
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+            grayscale = allow_grayscale and _is_low_saturation(image)
+            if grayscale and image.mode != "L":
+                image = image.convert("L")
+
+            perceptual_hash = format_hash(dhash(image))
+
+            # Saving without exif= drops all metadata (GPS, camera, etc.)
+            image.save(output, format="JPEG", quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Invalid image: {e}") from e
+
+    if isinstance(output, Path):
+        size = output.stat().st_size
+    else:
+        size = output.tell()
+
+    return ProcessedImage(
+        width=image.width,
+        height=image.height,
+        original_size=original_size,
+        size=size,
+        grayscale=grayscale,
+        perceptual_hash=perceptual_hash,
+    )
+
+
+def preprocess_image_bytes(
+    data: bytes,
+    max_edge: int,
+    quality: int,
+    allow_grayscale: bool = True,
+) -> ProcessedImage:
+    """
+    Normalize an uploaded photo for storage and OCR.
+
+    Applies EXIF orientation, downscales so the longest edge is at most
+    max_edge, optionally converts document photos to grayscale, computes a
+    perceptual hash and re-encodes as JPEG without metadata. Runs in a worker
+    process, so it must stay a module-level function.
+
+    Args:
+        data: Original image bytes
+        max_edge: Maximum width/height in pixels
+        quality: JPEG quality (1-95)
+        allow_grayscale: Convert low-saturation images to grayscale
+
+    Returns:
+        ProcessedImage with the re-encoded JPEG bytes in content
+
+    Raises:
+        ValueError: If the bytes are not a decodable image
+    """
+    output = io.BytesIO()
+    processed = _preprocess(
+        io.BytesIO(data), len(data), output, max_edge, quality, allow_grayscale
+    )
+    processed.content = output.getvalue()
+    return processed
+
+
+def preprocess_image_file(
+    input_path: str,
+    output_path: str,
+    max_edge: int,
+    quality: int,
+    allow_grayscale: bool = True,
+) -> ProcessedImage:
+    """
+    Normalize an uploaded photo file, writing the JPEG to output_path.
+
+    Same pipeline as preprocess_image_bytes, but reads and writes files so
+    neither the upload nor the result passes through the event loop process.
+
+    Args:
+        input_path: Staged upload file
+        output_path: Where to write the processed JPEG
+        max_edge: Maximum width/height in pixels
+        quality: JPEG quality (1-95)
+        allow_grayscale: Convert low-saturation images to grayscale
+
+    Returns:
+        ProcessedImage describing the written file
+
+    Raises:
+        ValueError: If the file is not a decodable image
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    try:
+        return _preprocess(
+            input_path,
+            input_path.stat().st_size,
+            output_path,
+            max_edge,
+            quality,
+            allow_grayscale,
+        )
+    except ValueError:
+        output_path.unlink(missing_ok=True)
+        raise
+
+
+class ImageProcessingService:
+    """Service that runs image pre-processing in a process pool"""
+
+    OUTPUT_EXTENSION = ".jpg"
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESS_WORKERS
+            )
+        return self._executor
+
+    async def preprocess(self, data: bytes) -> ProcessedImage:
+        """
+        Pre-process an uploaded image off the event loop.
+
+        Args:
+            data: Original image bytes
+
+        Returns:
+            ProcessedImage ready to be stored and sent to OCR
+
+        Raises:
+            ValueError: If the bytes are not a decodable image
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            partial(
+                preprocess_image_bytes,
+                data,
+                settings.IMAGE_MAX_EDGE,
+                settings.IMAGE_JPEG_QUALITY,
+                settings.IMAGE_GRAYSCALE_DOCUMENTS,
+            ),
+        )
+
+    async def preprocess_file(self, input_path: Path, output_path: Path) -> ProcessedImage:
+        """
+        Pre-process a staged upload file off the event loop.
+
+        Args:
+            input_path: Staged upload file
+            output_path: Where to write the processed JPEG
+
+        Returns:
+            ProcessedImage describing the written file
+
+        Raises:
+            ValueError: If the file is not a decodable image
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            partial(
+                preprocess_image_file,
+                str(input_path),
+                str(output_path),
+                settings.IMAGE_MAX_EDGE,
+                settings.IMAGE_JPEG_QUALITY,
+                settings.IMAGE_GRAYSCALE_DOCUMENTS,
+            ),
+        )
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run a picklable module-level function in the worker pool.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments for func
+
+        Returns:
+            The function's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args))
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+image_processing_service = ImageProcessingService()
@@ -0,0 +1,115 @@
+"""Shared ingest pipeline for homework and class note photo uploads"""
+
+from dataclasses import dataclass
+from typing import Optional
+import anyio
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.stored_file import StoredFile
+from app.services.file_storage import file_storage
+from app.services.image_processing import image_processing_service
+from app.services.ocr_service import ocr_service
+from app.services.perceptual_hash import perceptual_hash_index, PhotoMatch
+
+
+@dataclass
+class IngestedImage:
+    """A stored upload with its OCR text and any near-duplicate match"""
+    stored_file: StoredFile
+    relative_path: str
+    absolute_path: str
+    ocr_text: str
+    match: Optional[PhotoMatch] = None
+
+
+class ImageUploadService:
+    """Service that stores an uploaded photo and extracts its text"""
+
+    async def ingest(
+        self,
+        file: UploadFile,
+        user_id: int,
+        db: AsyncSession,
+        prefer_notes: bool = False,
+    ) -> IngestedImage:
+        """
+        Store an uploaded photo, reusing earlier work where possible.
+
+        The upload is streamed to a temp file and processed from disk, so it
+        is never held in memory. Identical bytes reuse the stored blob and
+        its cached OCR text. A re-photographed page (matching an earlier
+        upload by the same user within PHASH_MAX_DISTANCE) reuses that
+        upload's OCR text instead of calling OCR again.
+
+        Args:
+            file: Uploaded image
+            user_id: Uploading user's ID
+            db: Database session
+            prefer_notes: Prefer matching class notes (whose topics can be reused)
+
+        Returns:
+            IngestedImage for the upload
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds MAX_UPLOAD_BYTES
+            ValueError: If the file is not a decodable image
+        """
+        staged = await file_storage.stage_upload(file)
+        output_path = file_storage.temp_path(image_processing_service.OUTPUT_EXTENSION)
+
+        try:
+            stored_file = await file_storage.acquire(staged.content_hash, db)
+
+            if stored_file is None:
+                # Orient, downscale and re-encode before storage and OCR
+                processed = await image_processing_service.preprocess_file(
+                    staged.path, output_path
+                )
+                stored_file = await file_storage.store(
+                    content_hash=staged.content_hash,
+                    source_path=output_path,
+                    extension=image_processing_service.OUTPUT_EXTENSION,
+                    db=db,
+                    perceptual_hash=processed.perceptual_hash,
+                )
+        finally:
+            await staged.discard()
+            await anyio.Path(output_path).unlink(missing_ok=True)
+
+        relative_path = stored_file.storage_path
+        absolute_path = file_storage.get_absolute_path(relative_path)
+
+        match = await perceptual_hash_index.find_match(
+            user_id, stored_file.perceptual_hash, db, prefer_notes=prefer_notes
+        )
+
+        ocr_text = stored_file.ocr_text
+        if ocr_text is None and match is not None:
+            ocr_text = await self._get_matched_ocr_text(match, db)
+        if ocr_text is None:
+            ocr_text = await ocr_service.extract_text_cached(stored_file, absolute_path)
+
+        return IngestedImage(
+            stored_file=stored_file,
+            relative_path=relative_path,
+            absolute_path=absolute_path,
+            ocr_text=ocr_text,
+            match=match,
+        )
+
+    async def _get_matched_ocr_text(
+        self,
+        match: PhotoMatch,
+        db: AsyncSession,
+    ) -> Optional[str]:
+        """Get cached OCR text of a matched upload, if it is still stored"""
+        result = await db.execute(
+            select(StoredFile.ocr_text).where(StoredFile.storage_path == match.storage_path)
+        )
+        return result.scalar_one_or_none()
+
+
+# Singleton instance
+image_upload_service = ImageUploadService()
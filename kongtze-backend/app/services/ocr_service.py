@@ -7,10 +7,17 @@ from PIL import Image
 import io
 
 from app.core.config import settings
+from app.core.metrics import track_ai_call
+from app.models.stored_file import StoredFile
 
-# Configure Gemini API
+# Configure Gemini API; the REST transport honours a custom endpoint such
+# as the local stand-in server
 if settings.GEMINI_API_KEY:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+    genai.configure(
+        api_key=settings.GEMINI_API_KEY,
+        transport="rest",
+        client_options={"api_endpoint": settings.GEMINI_API_BASE_URL},
+    )
 
 
 class OCRService:
@@ -19,7 +26,7 @@ class OCRService:
     def __init__(self):
         self.model = None
         if settings.GEMINI_API_KEY:
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = genai.GenerativeModel(settings.GEMINI_VISION_MODEL)
 
     async def extract_text_from_image(self, image_path: str) -> Optional[str]:
         """
@@ -35,6 +42,47 @@ class OCRService:
             # Return placeholder text if Gemini is not configured
             return self._get_placeholder_text(image_path)
 
+        text = await self._run_ocr(image_path)
+        if text is None:
+            # Fallback to placeholder if OCR fails
+            return self._get_placeholder_text(image_path)
+
+        return text
+
+    async def extract_text_cached(
+        self,
+        stored_file: StoredFile,
+        image_path: str,
+    ) -> Optional[str]:
+        """
+        Extract text once per stored content.
+
+        Duplicate uploads share a StoredFile, so its cached OCR result is
+        returned without another vision call.
+
+        Args:
+            stored_file: Content-addressed record for the image
+            image_path: Path to the image file
+
+        Returns:
+            Extracted text or placeholder text if extraction fails
+        """
+        if stored_file.ocr_text is not None:
+            return stored_file.ocr_text
+
+        if not self.model:
+            return self._get_placeholder_text(image_path)
+
+        text = await self._run_ocr(image_path)
+        if text is None:
+            return self._get_placeholder_text(image_path)
+
+        # Only real OCR results are cached, never placeholders
+        stored_file.ocr_text = text
+        return text
+
+    async def _run_ocr(self, image_path: str) -> Optional[str]:
+        """Call Gemini Vision on an image, returning None on failure"""
         try:
             # Open and prepare image
             image = Image.open(image_path)
@@ -49,16 +97,16 @@ If the image contains handwriting, do your best to transcribe it accurately.
 Return ONLY the extracted text, no additional commentary or formatting."""
 
             # Use Gemini vision to extract text
-            response = self.model.generate_content([prompt, image])
+            async with track_ai_call("ocr"):
+                response = self.model.generate_content([prompt, image])
 
             if response.text:
                 return response.text.strip()
 
             return None
 
-        except Exception as e:
-            # Fallback to placeholder if OCR fails
-            return self._get_placeholder_text(image_path)
+        except Exception:
+            return None
 
     def _get_placeholder_text(self, image_path: str) -> str:
         """Generate placeholder text when OCR is not available"""
@@ -0,0 +1,268 @@
+"""Perceptual hashing and near-duplicate lookup for uploaded photos"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, select, and_
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.class_note import ClassNote
+from app.models.homework import Homework
+from app.models.stored_file import StoredFile
+
+# session.info key for index additions waiting on the transaction
+PENDING_ADDS_KEY = "perceptual_hash.pending_adds"
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    Compute a difference hash (dHash) of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and
+    each bit records whether a pixel is brighter than its right neighbour, so
+    small changes in framing, scale or compression flip only a few bits.
+
+    Args:
+        image: PIL image
+        hash_size: Bits per row (8 gives a 64-bit hash)
+
+    Returns:
+        Hash as an unsigned integer
+    """
+    width = hash_size + 1
+    pixels = image.convert("L").resize(
+        (width, hash_size), Image.Resampling.LANCZOS
+    ).tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def format_hash(value: int) -> str:
+    """Format a 64-bit hash as 16 hex characters for storage"""
+    return f"{value:016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+class _BKNode:
+    __slots__ = ("key", "values", "children")
+
+    def __init__(self, key: int, value: Any):
+        self.key = key
+        self.values = [value]
+        self.children: Dict[int, "_BKNode"] = {}
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance for radius searches"""
+
+    def __init__(self):
+        self._root: Optional[_BKNode] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: Any):
+        """Insert a hash with an associated value"""
+        self._size += 1
+        if self._root is None:
+            self._root = _BKNode(key, value)
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(key, node.key)
+            if distance == 0:
+                node.values.append(value)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(key, value)
+                return
+            node = child
+
+    def search(self, key: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """
+        Find all values whose hash is within max_distance of key.
+
+        Returns:
+            List of (distance, value) sorted by distance
+        """
+        results = []
+        stack = [self._root] if self._root else []
+
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(key, node.key)
+            if distance <= max_distance:
+                results.extend((distance, value) for value in node.values)
+            # Triangle inequality: only subtrees in [d - r, d + r] can match
+            for child_distance, child in node.children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+
+        results.sort(key=lambda r: r[0])
+        return results
+
+
+class PhotoMatch(NamedTuple):
+    """Earlier upload that a new photo nearly duplicates"""
+    storage_path: str
+    note_id: Optional[int]
+    distance: int = 0
+
+
+class PerceptualHashIndex:
+    """Per-user near-duplicate index over uploaded homework and note photos"""
+
+    INDEX_TTL = 600  # Rebuild from the database every 10 minutes
+
+    def _cache_key(self, user_id: int) -> str:
+        return f"phash_index:{user_id}"
+
+    async def _get_tree(self, user_id: int, db: AsyncSession) -> BKTree:
+        """Get the user's tree from cache or build it from their uploads"""
+        key = self._cache_key(user_id)
+        tree = cache.get(key)
+        if tree is not None:
+            return tree
+
+        tree = BKTree()
+
+        notes = await db.execute(
+            select(StoredFile.perceptual_hash, StoredFile.storage_path, ClassNote.note_id)
+            .join(ClassNote, ClassNote.photo_path == StoredFile.storage_path)
+            .where(
+                and_(
+                    ClassNote.user_id == user_id,
+                    StoredFile.perceptual_hash.is_not(None),
+                )
+            )
+        )
+        for phash, storage_path, note_id in notes.all():
+            tree.add(int(phash, 16), PhotoMatch(storage_path, note_id))
+
+        homework = await db.execute(
+            select(StoredFile.perceptual_hash, StoredFile.storage_path)
+            .join(Homework, Homework.photo_path == StoredFile.storage_path)
+            .where(
+                and_(
+                    Homework.user_id == user_id,
+                    StoredFile.perceptual_hash.is_not(None),
+                )
+            )
+        )
+        for phash, storage_path in homework.all():
+            tree.add(int(phash, 16), PhotoMatch(storage_path, None))
+
+        cache.set(key, tree, self.INDEX_TTL)
+        return tree
+
+    async def find_match(
+        self,
+        user_id: int,
+        perceptual_hash: Optional[str],
+        db: AsyncSession,
+        prefer_notes: bool = False,
+    ) -> Optional[PhotoMatch]:
+        """
+        Find the closest earlier upload by the same user.
+
+        Args:
+            user_id: User ID
+            perceptual_hash: Hex dHash of the new photo
+            db: Database session
+            prefer_notes: Prefer class-note matches (which carry topics)
+
+        Returns:
+            Closest PhotoMatch within PHASH_MAX_DISTANCE, or None
+        """
+        if not perceptual_hash:
+            return None
+
+        tree = await self._get_tree(user_id, db)
+        matches = tree.search(int(perceptual_hash, 16), settings.PHASH_MAX_DISTANCE)
+        if not matches:
+            return None
+
+        if prefer_notes:
+            note_matches = [m for m in matches if m[1].note_id is not None]
+            if note_matches:
+                matches = note_matches
+
+        distance, match = matches[0]
+        return match._replace(distance=distance)
+
+    def add(
+        self,
+        user_id: int,
+        perceptual_hash: Optional[str],
+        storage_path: str,
+        note_id: Optional[int] = None,
+    ):
+        """Add a new upload to the user's index if it is currently loaded"""
+        if not perceptual_hash:
+            return
+        tree = cache.get(self._cache_key(user_id))
+        if tree is not None:
+            tree.add(int(perceptual_hash, 16), PhotoMatch(storage_path, note_id))
+
+    def add_after_commit(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        perceptual_hash: Optional[str],
+        storage_path: str,
+        note_id: Optional[int] = None,
+    ):
+        """
+        Add a new upload to the index once db's transaction commits.
+
+        The row is only flushed when this is called; adding it right away
+        would let a rolled-back upload match later photos until the index
+        expires.
+
+        Args:
+            db: Session the upload's row was flushed in
+            user_id: User ID
+            perceptual_hash: Hex dHash of the photo
+            storage_path: Stored photo path
+            note_id: Class note ID, for note photos
+        """
+        if not perceptual_hash:
+            return
+        session = db.sync_session
+        session.info.setdefault(PENDING_ADDS_KEY, []).append(
+            (self, user_id, perceptual_hash, storage_path, note_id)
+        )
+        if not event.contains(session, "after_commit", _apply_pending_adds):
+            event.listen(session, "after_commit", _apply_pending_adds)
+            event.listen(session, "after_transaction_end", _discard_pending_adds)
+
+
+def _apply_pending_adds(session: Session):
+    """Index uploads whose rows were just committed"""
+    for index, *entry in session.info.pop(PENDING_ADDS_KEY, []):
+        index.add(*entry)
+
+
+def _discard_pending_adds(session: Session, transaction: SessionTransaction):
+    """Drop queued additions when the transaction ended without a commit"""
+    if transaction.parent is not None:
+        return  # Savepoints; the outer transaction decides
+    session.info.pop(PENDING_ADDS_KEY, None)
+
+
+# Singleton instance
+perceptual_hash_index = PerceptualHashIndex()
@@ -0,0 +1,310 @@
+"""Deterministic weekly study schedule solver and validator"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Dinner break: 19:00-19:40, in minutes since midnight
+DINNER_START = 19 * 60
+DINNER_END = 19 * 60 + 40
+
+# Weekend sessions must start between 11:00 and 16:00
+WEEKEND_START = 11 * 60
+WEEKEND_END = 16 * 60
+
+MAX_SESSIONS_PER_DAY = 3
+WEEKDAY_SESSIONS_BEFORE_DINNER = 1
+WEEKDAY_SESSIONS_AFTER_DINNER = 2
+WEEKEND_SESSIONS = 2
+ALLOWED_DURATIONS = (30, 45)
+
+# Fixed slot starts; each leaves room for a 45-minute session plus a break
+AFTER_DINNER_SLOTS = (DINNER_END, 20 * 60 + 30)
+WEEKEND_SLOTS = (11 * 60, 14 * 60)
+
+# Subjects at or above this difficulty get 45-minute sessions
+LONG_SESSION_DIFFICULTY = 3
+
+DIFFICULTY_LABELS = {1: "beginner", 2: "intermediate", 3: "advanced", 4: "expert"}
+
+# Progressive difficulty curve: review early in the week, challenge late
+PHASE_LABELS = {
+    0: "Review",
+    1: "Review",
+    2: "New Concepts",
+    3: "New Concepts",
+    4: "Challenge",
+    5: "Challenge",
+    6: "Challenge",
+}
+
+
+@dataclass
+class SubjectPlan:
+    """A subject to schedule with its recommended difficulty"""
+    subject_id: int
+    name: str
+    difficulty: int = 2
+
+
+@dataclass
+class PlannedSession:
+    """A single session in a generated weekly schedule"""
+    day_of_week: int
+    subject_id: int
+    subject_name: str
+    start_minutes: int
+    duration_minutes: int
+    difficulty: int
+    title: str
+
+    @property
+    def start_time(self) -> str:
+        return f"{format_minutes(self.start_minutes)}:00"
+
+    def to_dict(self) -> dict:
+        return {
+            "day_of_week": self.day_of_week,
+            "subject_id": self.subject_id,
+            "subject_name": self.subject_name,
+            "start_time": self.start_time,
+            "duration_minutes": self.duration_minutes,
+            "recommended_difficulty": self.difficulty,
+            "title": self.title,
+        }
+
+
+def parse_minutes(value: str) -> int:
+    """
+    Parse an HH:MM[:SS] string into minutes since midnight.
+
+    Raises:
+        ValueError: If the string is not a valid time of day
+    """
+    parts = value.split(":")
+    if len(parts) < 2:
+        raise ValueError(f"Invalid time format: {value}")
+    hour, minute = int(parts[0]), int(parts[1])
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time values: {value}")
+    return hour * 60 + minute
+
+
+def format_minutes(minutes: int) -> str:
+    """Format minutes since midnight as HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def sessions_per_day(day_of_week: int, subject_count: int) -> int:
+    """Number of sessions a day should have, given the distinct subjects available"""
+    if day_of_week < 5:
+        target = WEEKDAY_SESSIONS_BEFORE_DINNER + WEEKDAY_SESSIONS_AFTER_DINNER
+    else:
+        target = WEEKEND_SESSIONS
+    # A subject may appear only once per day
+    return min(target, subject_count)
+
+
+def validate_schedule(
+    sessions: List[dict],
+    subject_count: Optional[int] = None,
+) -> List[str]:
+    """
+    Check a schedule against the weekly study rules.
+
+    Rules: at most 3 sessions per day, no subject twice on a day, 30 or
+    45-minute sessions, no overlap with dinner (19:00-19:40), weekdays have
+    1 session before dinner and 2 after, weekends have 2 sessions starting
+    between 11:00 and 16:00. When fewer subjects than slots are available,
+    the per-day counts are capped at the number of subjects.
+
+    Args:
+        sessions: Session dicts with day_of_week, subject_name, start_time
+            and duration_minutes
+        subject_count: Number of distinct subjects available (default: no cap)
+
+    Returns:
+        List of rule violations (empty if the schedule is valid)
+    """
+    errors = []
+    cap = subject_count if subject_count is not None else MAX_SESSIONS_PER_DAY
+
+    sessions_by_day: Dict[int, List[dict]] = defaultdict(list)
+    for session in sessions:
+        sessions_by_day[session.get("day_of_week")].append(session)
+
+    for day, day_sessions in sessions_by_day.items():
+        if len(day_sessions) > MAX_SESSIONS_PER_DAY:
+            errors.append(f"Day {day} has {len(day_sessions)} sessions (max {MAX_SESSIONS_PER_DAY} allowed)")
+
+        subjects_seen = set()
+        before_dinner = 0
+        after_dinner = 0
+
+        for session in day_sessions:
+            subject = session.get("subject_name")
+            if subject in subjects_seen:
+                errors.append(f"Day {day} has duplicate subject: {subject}")
+            subjects_seen.add(subject)
+
+            duration = session.get("duration_minutes")
+            if duration not in ALLOWED_DURATIONS:
+                errors.append(f"Invalid duration {duration} minutes (must be 30 or 45)")
+                duration = 0
+
+            start_time = session.get("start_time", "")
+            if not start_time:
+                continue
+            try:
+                start = parse_minutes(start_time)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            end = start + duration
+
+            if not (end <= DINNER_START or start >= DINNER_END):
+                errors.append(f"Session at {start_time} conflicts with dinner time (19:00-19:40)")
+
+            if start < DINNER_START:
+                before_dinner += 1
+            elif start >= DINNER_END:
+                after_dinner += 1
+
+            if day in (5, 6) and not (WEEKEND_START <= start < WEEKEND_END):
+                errors.append(f"Weekend session at {start_time} must be between 11:00 and 16:00")
+
+        if day in (0, 1, 2, 3, 4):
+            expected_before = min(WEEKDAY_SESSIONS_BEFORE_DINNER, cap)
+            expected_after = min(WEEKDAY_SESSIONS_AFTER_DINNER, cap - expected_before)
+            if before_dinner != expected_before:
+                errors.append(f"Weekday {day} must have exactly {expected_before} session before dinner (has {before_dinner})")
+            if after_dinner != expected_after:
+                errors.append(f"Weekday {day} must have exactly {expected_after} sessions after dinner (has {after_dinner})")
+        elif day in (5, 6):
+            expected = sessions_per_day(day, cap)
+            if len(day_sessions) != expected:
+                errors.append(f"Weekend day {day} must have exactly {expected} sessions (has {len(day_sessions)})")
+
+    return errors
+
+
+def _assign_durations(subjects: List[SubjectPlan], target_minutes: float) -> List[int]:
+    """Pick 30/45-minute durations for one day's subjects"""
+    durations = [
+        45 if s.difficulty >= LONG_SESSION_DIFFICULTY else 30 for s in subjects
+    ]
+    # Lengthen the hardest short sessions until the daily target is met
+    total = sum(durations)
+    by_difficulty = sorted(range(len(subjects)), key=lambda i: -subjects[i].difficulty)
+    for i in by_difficulty:
+        if total >= target_minutes:
+            break
+        if durations[i] == 30:
+            durations[i] = 45
+            total += 15
+    return durations
+
+
+def _fit_before_end(start: int, duration: int, window_end: int, day: int) -> int:
+    """
+    Duration of a fixed-slot session so it ends by window_end.
+
+    Raises:
+        ValueError: If even a 30-minute session would end too late
+    """
+    if start + duration <= window_end:
+        return duration
+    shortest = min(ALLOWED_DURATIONS)
+    if start + shortest <= window_end:
+        return shortest
+    raise ValueError(
+        f"End time {format_minutes(window_end)} is too early: day {day} needs a session "
+        f"at {format_minutes(start)} until at least {format_minutes(start + shortest)}"
+    )
+
+
+def solve_weekly_schedule(
+    subjects: List[SubjectPlan],
+    hours_per_day: float = 2,
+    start_time: str = "14:00",
+    end_time: Optional[str] = None,
+) -> List[PlannedSession]:
+    """
+    Build a weekly schedule that satisfies validate_schedule.
+
+    Subjects are assigned greedily, day by day, to those with the fewest
+    sessions so far; ties go to harder subjects (which therefore get more
+    sessions), then rotate by day so slots vary across the week. Durations
+    are 45 minutes for advanced subjects and 30 otherwise, lengthened towards
+    hours_per_day. Weekday pre-dinner sessions start at start_time (moved
+    earlier if they would run into dinner or past end_time); after-dinner
+    and weekend sessions use fixed slots, shortened to 30 minutes where
+    that makes them end by end_time.
+
+    Args:
+        subjects: Subjects with their recommended difficulty
+        hours_per_day: Target study hours per day
+        start_time: Preferred weekday start time (HH:MM)
+        end_time: Time every session must end by (HH:MM, default: no limit)
+
+    Returns:
+        Sessions ordered by day and start time
+
+    Raises:
+        ValueError: If no subjects are given, a time is invalid, or end_time
+            is too early for the sessions the weekly rules require
+    """
+    if not subjects:
+        raise ValueError("At least one subject must be selected")
+
+    window_start = parse_minutes(start_time)
+    window_end = parse_minutes(end_time) if end_time else None
+    target_minutes = hours_per_day * 60
+    subject_count = len(subjects)
+    index = {s.subject_id: i for i, s in enumerate(subjects)}
+    counts = {s.subject_id: 0 for s in subjects}
+
+    schedule: List[PlannedSession] = []
+    for day in range(7):
+        k = sessions_per_day(day, subject_count)
+
+        def rotation(s: SubjectPlan) -> int:
+            return (index[s.subject_id] - day) % subject_count
+
+        chosen = sorted(
+            subjects,
+            key=lambda s: (counts[s.subject_id], -s.difficulty, rotation(s)),
+        )[:k]
+        chosen.sort(key=rotation)
+        durations = _assign_durations(chosen, target_minutes)
+
+        if day < 5:
+            pre_dinner_end = DINNER_START if window_end is None else min(DINNER_START, window_end)
+            pre_dinner = min(window_start, pre_dinner_end - durations[0])
+            if pre_dinner < 0:
+                raise ValueError(f"End time {end_time} is too early for a {durations[0]}-minute session")
+            starts = [pre_dinner, *AFTER_DINNER_SLOTS][:k]
+        else:
+            starts = list(WEEKEND_SLOTS[:k])
+
+        if window_end is not None:
+            durations = [
+                _fit_before_end(start, duration, window_end, day)
+                for start, duration in zip(starts, durations)
+            ]
+
+        for subject, start, duration in zip(chosen, starts, durations):
+            counts[subject.subject_id] += 1
+            schedule.append(
+                PlannedSession(
+                    day_of_week=day,
+                    subject_id=subject.subject_id,
+                    subject_name=subject.name,
+                    start_minutes=start,
+                    duration_minutes=duration,
+                    difficulty=subject.difficulty,
+                    title=f"{subject.name}: {PHASE_LABELS[day]}",
+                )
+            )
+
+    return schedule
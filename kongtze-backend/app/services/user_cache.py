@@ -0,0 +1,72 @@
+"""In-process cache of authenticated users"""
+
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """
+    Short-lived cache of User rows for request authentication.
+
+    Entries are keyed by user ID and token version, so a token issued
+    before the user's token_version was incremented never matches a cached
+    row. Any ORM update or delete of a user drops that user's entries.
+    """
+
+    KEY_PREFIX = "auth_user"
+
+    def _key(self, user_id: int, token_version: int) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}:{token_version}"
+
+    async def get(
+        self,
+        user_id: int,
+        token_version: int,
+        db: AsyncSession,
+    ) -> Optional[User]:
+        """
+        Get the user a token was issued to.
+
+        Args:
+            user_id: User ID claim
+            token_version: Token version claim ("ver")
+            db: Database session (only used on a cache miss)
+
+        Returns:
+            Detached User, or None if the user no longer exists or the token
+            has been revoked
+        """
+        key = self._key(user_id, token_version)
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None or user.token_version != token_version:
+            return None
+
+        # Detach so the instance can be shared by later requests' sessions;
+        # routes only read from the current user
+        db.expunge(user)
+        cache.set(key, user, ttl=settings.USER_CACHE_TTL)
+        return user
+
+    def invalidate(self, user_id: int):
+        """Drop all cached entries for a user"""
+        cache.delete_pattern(f"{self.KEY_PREFIX}:{user_id}:")
+
+
+# Singleton instance
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User):
+    user_cache.invalidate(target.user_id)
@@ -0,0 +1,366 @@
+"""Micro-benchmarks for the adaptive difficulty and time-allocation algorithms
+
+Times the functions test creation depends on over synthetic histories of
+10 to 100k results:
+
+- calculate_recommended_difficulty: windowed query plus scoring, against an
+  in-memory SQLite database (needs aiosqlite), cache cleared every call
+- _calculate_difficulty_breakdown and _calculate_difficulty_trend: over
+  (TestResult, Test) tuples, including conversion to columns
+- difficulty_breakdown_kernel and difficulty_trend_kernel: the array
+  kernels alone, on columns as update_performance_analytics loads them
+- calculate_dynamic_question_count: analytics lookup plus arithmetic
+- calculate_individual_time_limits: by question count, uniform and typed
+
+Each benchmark runs calibrated rounds, pytest-benchmark style, and reports
+min/median/mean/stddev per call. Two regression gates exit non-zero:
+
+- --compare: a median slower than the saved baseline by more than
+  --max-slowdown (save one with --save on the same machine)
+- scaling: per-result cost at the largest history more than --max-growth
+  times the cost at 1k results, which catches accidental quadratic work
+  on any machine
+
+Usage:
+    python benchmarks/bench_adaptive_difficulty.py
+    python benchmarks/bench_adaptive_difficulty.py --sizes 10,1000 --min-time 0.1
+    python benchmarks/bench_adaptive_difficulty.py --save baseline.json
+    python benchmarks/bench_adaptive_difficulty.py --compare baseline.json --max-slowdown 1.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import cache
+from app.core.database import Base
+from app.models import StudentPerformanceAnalytics, Subject, Test, TestResult, User
+from app.services.adaptive_difficulty_service import AdaptiveDifficultyService
+from app.services.analytics_kernels import columns_from_pairs, difficulty_breakdown, difficulty_trend
+
+SUBJECT_ID = 1
+QUESTION_TYPES = ["multiple_choice", "true_false", "short_answer", "essay", "problem_solving", "fill_blank"]
+
+service = AdaptiveDifficultyService()
+
+
+def run_coroutine(coro):
+    """Drive a coroutine that never suspends, without an event loop's overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("Coroutine suspended; use measure_async")
+
+
+def _calibrate(elapsed: float, target: float = 0.001) -> int:
+    """Calls per round so that a round lasts about `target` seconds"""
+    return max(1, int(target / max(elapsed, 1e-9)))
+
+
+def _stats(per_call: List[float], iterations: int) -> Dict[str, float]:
+    return {
+        "rounds": len(per_call),
+        "iterations": iterations,
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "mean": statistics.fmean(per_call),
+        "stddev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+    }
+
+
+def measure(func: Callable[[], Any], min_time: float, min_rounds: int = 5) -> Dict[str, float]:
+    """
+    Time a synchronous call over calibrated rounds.
+
+    Returns:
+        Per-call seconds: min, median, mean and stddev over the rounds
+    """
+    started = time.perf_counter()
+    func()  # Warm-up, also used for calibration
+    iterations = _calibrate(time.perf_counter() - started)
+
+    per_call: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(per_call) < min_rounds or (time.perf_counter() < deadline and len(per_call) < 10_000):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_call.append((time.perf_counter() - started) / iterations)
+    return _stats(per_call, iterations)
+
+
+async def measure_async(func: Callable[[], Awaitable[Any]], min_time: float, min_rounds: int = 5) -> Dict[str, float]:
+    """Same as measure() for calls that need the event loop (database access)"""
+    started = time.perf_counter()
+    await func()
+    iterations = _calibrate(time.perf_counter() - started)
+
+    per_call: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(per_call) < min_rounds or (time.perf_counter() < deadline and len(per_call) < 10_000):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await func()
+        per_call.append((time.perf_counter() - started) / iterations)
+    return _stats(per_call, iterations)
+
+
+def make_history(size: int, rng: random.Random) -> List[Tuple[TestResult, Test]]:
+    """
+    Synthetic (TestResult, Test) pairs, oldest first.
+
+    Scores drift upwards over time with noise, difficulties and question
+    timings vary, so no branch of the algorithms is skipped.
+    """
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    history = []
+    for i in range(size):
+        difficulty = rng.randint(1, 4)
+        skill = 0.55 + 0.35 * i / max(size - 1, 1)
+        correct = sum(1 for _ in range(10) if rng.random() < skill)
+        test = Test(
+            test_id=i + 1,
+            user_id=1,
+            subject_id=SUBJECT_ID,
+            difficulty_level=difficulty,
+            time_limit_minutes=30,
+            total_questions=10,
+            generation_mode="pure_ai",
+        )
+        result = TestResult(
+            result_id=i + 1,
+            test_id=i + 1,
+            user_id=1,
+            answers={},
+            score=correct * 10,
+            total_points=100,
+            time_taken_seconds=int(rng.uniform(20, 100) * 10),
+            question_count=10,
+            submitted_at=start + timedelta(minutes=i * 5),
+        )
+        history.append((result, test))
+    return history
+
+
+async def seed_database(sizes: List[int], rng: random.Random) -> async_sessionmaker:
+    """One student per history size, with that many results in one subject"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Subject), [{"subject_id": SUBJECT_ID, "name": "math", "display_name": "Math"}])
+        next_test_id = 1
+        for user_id, size in enumerate(sizes, start=1):
+            await conn.execute(insert(User), [{"user_id": user_id, "name": f"Bench {size}", "is_parent": False}])
+            history = make_history(size, rng)
+            await conn.execute(insert(Test), [
+                {
+                    "test_id": next_test_id + i,
+                    "user_id": user_id,
+                    "subject_id": SUBJECT_ID,
+                    "difficulty_level": test.difficulty_level,
+                    "time_limit_minutes": 30,
+                    "total_questions": 10,
+                    "generation_mode": "pure_ai",
+                }
+                for i, (_, test) in enumerate(history)
+            ])
+            await conn.execute(insert(TestResult), [
+                {
+                    "test_id": next_test_id + i,
+                    "user_id": user_id,
+                    "answers": {},
+                    "score": result.score,
+                    "total_points": result.total_points,
+                    "time_taken_seconds": result.time_taken_seconds,
+                    "question_count": result.question_count,
+                    "submitted_at": result.submitted_at,
+                }
+                for i, (result, _) in enumerate(history)
+            ])
+            await conn.execute(insert(StudentPerformanceAnalytics), [{
+                "user_id": user_id,
+                "subject_id": SUBJECT_ID,
+                "total_tests_taken": size,
+                "average_time_per_question": 52,
+            }])
+            next_test_id += size
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def run_benchmarks(sizes: List[int], min_time: float, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    results: Dict[str, Dict[str, float]] = {}
+
+    def report(name: str, stats: Dict[str, float], size: int = None):
+        stats = dict(stats, size=size)
+        results[name] = stats
+        print_row(name, stats)
+
+    print(f"{'benchmark':<48} {'rounds':>7} {'min':>10} {'median':>10} {'mean':>10} {'stddev':>10} {'ops/s':>11}")
+
+    for size in sizes:
+        history = make_history(size, rng)
+        report(
+            f"_calculate_difficulty_breakdown[{size}]",
+            measure(lambda: run_coroutine(service._calculate_difficulty_breakdown(history)), min_time),
+            size,
+        )
+        report(
+            f"_calculate_difficulty_trend[{size}]",
+            measure(lambda: service._calculate_difficulty_trend(history), min_time),
+            size,
+        )
+        columns = columns_from_pairs(history)
+        report(
+            f"difficulty_breakdown_kernel[{size}]",
+            measure(lambda: difficulty_breakdown(*columns), min_time),
+            size,
+        )
+        report(
+            f"difficulty_trend_kernel[{size}]",
+            measure(lambda: difficulty_trend(columns[0], columns[1]), min_time),
+            size,
+        )
+
+    session_factory = await seed_database(sizes, rng)
+    async with session_factory() as db:
+        for user_id, size in enumerate(sizes, start=1):
+            async def recommend():
+                cache.delete_pattern("adaptive_difficulty:")
+                return await service.calculate_recommended_difficulty(user_id, SUBJECT_ID, db)
+
+            report(f"calculate_recommended_difficulty[{size}]", await measure_async(recommend, min_time), size)
+
+        report(
+            "calculate_dynamic_question_count",
+            await measure_async(
+                lambda: service.calculate_dynamic_question_count(1, SUBJECT_ID, 30, 2, db), min_time
+            ),
+        )
+
+    for count in (10, 30, 50):
+        types = [QUESTION_TYPES[i % len(QUESTION_TYPES)] for i in range(count)]
+        report(
+            f"calculate_individual_time_limits[{count}-uniform]",
+            measure(lambda: service.calculate_individual_time_limits(count, 30, 2), min_time),
+        )
+        report(
+            f"calculate_individual_time_limits[{count}-typed]",
+            measure(lambda: service.calculate_individual_time_limits(count, 30, 2, types), min_time),
+        )
+    return results
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def print_row(name: str, stats: Dict[str, float]):
+    print(
+        f"{name:<48} {stats['rounds']:>7} "
+        + " ".join(f"{_format_seconds(stats[key]):>10}" for key in ("min", "median", "mean", "stddev"))
+        + f" {1 / stats['median']:>11,.0f}"
+    )
+
+
+def check_against_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], max_slowdown: float) -> List[str]:
+    """Benchmarks whose median is more than max_slowdown times the baseline's"""
+    failures = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = stats["median"] / old["median"]
+        if ratio > max_slowdown:
+            failures.append(f"{name}: median {ratio:.2f}x baseline (limit {max_slowdown:.2f}x)")
+    return failures
+
+
+def check_scaling(results: Dict[str, Dict], max_growth: float, reference_size: int = 1000) -> List[str]:
+    """
+    History-scaled benchmarks whose cost per result grows faster than allowed.
+
+    Costs are compared per result between reference_size and the largest
+    size, so fixed overheads at tiny sizes do not count and linear work
+    passes on any machine.
+    """
+    by_function: Dict[str, Dict[int, float]] = {}
+    for name, stats in results.items():
+        if stats.get("size"):
+            by_function.setdefault(name.split("[")[0], {})[stats["size"]] = stats["median"]
+
+    failures = []
+    for function, medians in by_function.items():
+        largest = max(medians)
+        if reference_size not in medians or largest <= reference_size:
+            continue
+        growth = (medians[largest] / largest) / (medians[reference_size] / reference_size)
+        if growth > max_growth:
+            failures.append(
+                f"{function}: per-result cost at {largest} is {growth:.2f}x that at {reference_size} "
+                f"(limit {max_growth:.2f}x)"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000", help="Comma-separated history sizes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds spent measuring each benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON written by --save")
+    parser.add_argument("--max-slowdown", type=float, default=1.25, help="Allowed median ratio against the baseline")
+    parser.add_argument("--max-growth", type=float, default=3.0, help="Allowed growth in per-result cost from 1k results")
+    args = parser.parse_args()
+
+    sizes = sorted({int(size) for size in args.sizes.split(",")})
+    results = asyncio.run(run_benchmarks(sizes, args.min_time, args.seed))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": sys.version.split()[0],
+                "benchmarks": results,
+            }, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+    failures = check_scaling(results, args.max_growth)
+    if args.compare:
+        with open(args.compare) as f:
+            failures += check_against_baseline(results, json.load(f)["benchmarks"], args.max_slowdown)
+
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark upload image pre-processing on sample photos
+
+Reports upload bytes, vision payload size (base64, as sent to Gemini) and
+processing time before and after pre-processing. With --ocr and a configured
+GEMINI_API_KEY it also measures OCR latency on the original and processed
+images.
+
+Usage:
+    python benchmarks/bench_image_preprocessing.py photo1.jpg photo2.jpg
+    python benchmarks/bench_image_preprocessing.py --synthetic 5
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageDraw
+
+from app.core.config import settings
+from app.services.image_processing import preprocess_image_bytes
+
+
+def make_synthetic_photo(seed: int) -> bytes:
+    """Create a phone-sized worksheet photo with text lines and sensor noise"""
+    rng = random.Random(seed)
+    width, height = 4032, 3024
+    image = Image.new("RGB", (width, height), (236, 230, 218))
+    draw = ImageDraw.Draw(image)
+    for y in range(200, height - 200, 90):
+        x = 250
+        while x < width - 400:
+            word = rng.randint(60, 260)
+            draw.rectangle([x, y, x + word, y + 30], fill=(40, 40, 60))
+            x += word + rng.randint(30, 60)
+
+    noise = Image.effect_noise((width, height), 18).convert("RGB")
+    image = Image.blend(image, noise, 0.08)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def vision_payload_size(data: bytes) -> int:
+    """Size of the inline image part sent to Gemini"""
+    return len(base64.b64encode(data))
+
+
+async def measure_ocr(data: bytes) -> float:
+    """Run OCR on image bytes and return latency in milliseconds"""
+    from app.services.ocr_service import ocr_service
+
+    with tempfile.NamedTemporaryFile(suffix=".jpg") as f:
+        f.write(data)
+        f.flush()
+        start = time.perf_counter()
+        await ocr_service.extract_text_from_image(f.name)
+        return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*", help="Sample image files")
+    parser.add_argument("--synthetic", type=int, default=0, help="Number of generated phone photos")
+    parser.add_argument("--max-edge", type=int, default=settings.IMAGE_MAX_EDGE)
+    parser.add_argument("--quality", type=int, default=settings.IMAGE_JPEG_QUALITY)
+    parser.add_argument("--ocr", action="store_true", help="Also measure OCR latency (needs GEMINI_API_KEY)")
+    args = parser.parse_args()
+
+    samples = [(Path(p).name, Path(p).read_bytes()) for p in args.images]
+    samples += [(f"synthetic-{i}", make_synthetic_photo(i)) for i in range(args.synthetic)]
+    if not samples:
+        parser.error("Provide image files or --synthetic N")
+
+    print(f"{'image':<24} {'orig KB':>9} {'new KB':>9} {'payload':>9} {'ms':>8} {'gray':>5}")
+    ratios, timings = [], []
+    for name, data in samples:
+        start = time.perf_counter()
+        processed = preprocess_image_bytes(
+            data, args.max_edge, args.quality, settings.IMAGE_GRAYSCALE_DOCUMENTS
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        ratio = processed.size / len(data)
+        ratios.append(ratio)
+        timings.append(elapsed)
+        payload_ratio = vision_payload_size(processed.content) / vision_payload_size(data)
+        print(
+            f"{name[:24]:<24} {len(data) / 1024:>9.0f} {processed.size / 1024:>9.0f} "
+            f"{payload_ratio:>8.0%} {elapsed:>8.1f} {str(processed.grayscale):>5}"
+        )
+
+        if args.ocr:
+            before = asyncio.run(measure_ocr(data))
+            after = asyncio.run(measure_ocr(processed.content))
+            print(f"{'':<24} OCR latency: {before:.0f} ms -> {after:.0f} ms")
+
+    print()
+    print(f"Median size ratio: {statistics.median(ratios):.1%}")
+    print(f"Median processing time: {statistics.median(timings):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
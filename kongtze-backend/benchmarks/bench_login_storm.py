@@ -0,0 +1,152 @@
+"""Benchmark a login storm against latency of unrelated endpoints
+
+Runs the app in-process against an in-memory SQLite database (needs
+aiosqlite), fires concurrent parent logins for a fixed duration and probes
+GET /health meanwhile. Reports login throughput, probe latency percentiles
+and the password hasher's queue statistics.
+
+--inline runs bcrypt on the event loop, as before the password hasher pool,
+for comparison.
+
+Usage:
+    python benchmarks/bench_login_storm.py
+    python benchmarks/bench_login_storm.py --inline
+    python benchmarks/bench_login_storm.py --concurrency 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base, get_db
+from app.core.security import hash_password, password_hasher
+from app.main import app
+from app.models.user import User
+
+EMAIL = "storm@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+async def setup_database() -> async_sessionmaker:
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(User(name="Storm", email=EMAIL, password_hash=hash_password(PASSWORD), is_parent=True))
+        await db.commit()
+    return session_factory
+
+
+def use_inline_hashing():
+    """Restore the old behaviour: bcrypt runs directly on the event loop"""
+
+    async def run_inline(func, *args):
+        return func(*args)
+
+    password_hasher._run = run_inline
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_worker(client: httpx.AsyncClient, deadline: float, results: dict):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code == 200:
+            results["ok"].append(elapsed)
+        elif response.status_code == 503:
+            results["shed"] += 1
+            await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+        else:
+            raise RuntimeError(f"Login failed: {response.status_code} {response.text}")
+
+
+async def probe_worker(client: httpx.AsyncClient, deadline: float, interval: float, latencies: list):
+    # Latency is measured from when each probe was due, so time spent
+    # waiting for a blocked event loop is included
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await client.get("/health")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += interval
+
+
+async def run(args):
+    session_factory = await setup_database()
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    if args.inline:
+        use_inline_hashing()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Baseline probe latency with no logins running
+        idle = []
+        await probe_worker(client, time.perf_counter() + 1, args.probe_interval / 1000, idle)
+
+        results = {"ok": [], "shed": 0}
+        probes = []
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            probe_worker(client, deadline, args.probe_interval / 1000, probes),
+            *[login_worker(client, deadline, results) for _ in range(args.concurrency)],
+        )
+        elapsed = time.perf_counter() - started
+
+    mode = "inline (event loop)" if args.inline else f"pool ({settings.PASSWORD_HASH_WORKERS} workers)"
+    print(f"Mode: {mode}, {args.concurrency} concurrent logins for {args.duration:.0f}s")
+    print(f"Logins: {len(results['ok'])} ok ({len(results['ok']) / elapsed:.1f}/s), {results['shed']} shed (503)")
+    if results["ok"]:
+        print(
+            f"Login latency ms: p50 {statistics.median(results['ok']):.0f}  "
+            f"p95 {percentile(results['ok'], 95):.0f}"
+        )
+    print(f"/health idle ms:  p50 {statistics.median(idle):.1f}  p99 {percentile(idle, 99):.1f}")
+    print(
+        f"/health storm ms: p50 {statistics.median(probes):.1f}  p95 {percentile(probes, 95):.1f}  "
+        f"p99 {percentile(probes, 99):.1f}  max {max(probes):.1f}  ({len(probes)} probes)"
+    )
+    if not args.inline:
+        print("Hasher:", {k: round(v, 1) for k, v in password_hasher.stats().items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent login loops")
+    parser.add_argument("--duration", type=float, default=5.0, help="Storm duration in seconds")
+    parser.add_argument("--probe-interval", type=float, default=10.0, help="Milliseconds between probes")
+    parser.add_argument("--inline", action="store_true", help="Hash on the event loop (old behaviour)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
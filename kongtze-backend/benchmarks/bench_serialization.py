@@ -0,0 +1,150 @@
+"""Benchmark JSON serialization of test and test-result payloads
+
+Compares serialization throughput for TestWithQuestions and
+TestResultWithReview payloads:
+
+- legacy:    jsonable_encoder + json.dumps (FastAPI without a TypeAdapter)
+- fastapi:   response_model validation + pydantic dump_json (current FastAPI)
+- fast_json: FastJSONResponse.render (returned directly by the routes)
+
+It also measures a page of projected rows (?fields=...), which are plain
+dicts and have no response_model fast path.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --questions 50 --rows 500
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.schemas.test import (
+    QuestionResponse,
+    QuestionWithAnswer,
+    TestResponse,
+    TestResultWithTimings,
+    TestResultWithReview,
+    TestWithQuestions,
+)
+
+
+def make_questions(count: int) -> list:
+    """ORM-like question rows"""
+    return [
+        SimpleNamespace(
+            question_id=i,
+            test_id=1,
+            question_text=f"Question {i}: which of the following fractions is equal to 3/4?",
+            options={"A": "6/8", "B": "9/16", "C": "3/8", "D": "12/20"},
+            correct_answer="A",
+            time_limit_seconds=60,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def make_test_payload(count: int) -> TestWithQuestions:
+    test = SimpleNamespace(
+        test_id=1,
+        user_id=1,
+        subject_id=1,
+        title="Fractions practice",
+        difficulty_level=2,
+        time_limit_minutes=30,
+        total_questions=count,
+        created_at=datetime.now(timezone.utc),
+        source_note_ids=None,
+        source_homework_ids=None,
+        generation_mode="pure_ai",
+    )
+    test_response = TestResponse.model_validate(test)
+    return TestWithQuestions(
+        **test_response.model_dump(),
+        questions=[QuestionResponse.model_validate(q) for q in make_questions(count)],
+    )
+
+
+def make_result_payload(count: int) -> TestResultWithReview:
+    result = SimpleNamespace(
+        result_id=1,
+        test_id=1,
+        user_id=1,
+        score=count - 2,
+        total_points=count,
+        time_taken_seconds=900,
+        answers={str(i): "A" for i in range(1, count + 1)},
+        reward_points=5,
+        submitted_at=datetime.now(timezone.utc),
+    )
+    result_response = TestResultWithTimings.model_validate(result)
+    return TestResultWithReview(
+        **result_response.model_dump(),
+        questions=[QuestionWithAnswer.model_validate(q) for q in make_questions(count)],
+        percentage=(count - 2) / count * 100,
+    )
+
+
+def make_projected_rows(count: int) -> list:
+    """A page of test results projected to ?fields=score,submitted_at"""
+    now = datetime.now(timezone.utc)
+    return [
+        {"result_id": i, "score": i % 20, "submitted_at": now}
+        for i in range(count, 0, -1)
+    ]
+
+
+def per_second(func, number: int) -> float:
+    """Best-of-3 calls per second"""
+    return number / min(timeit.repeat(func, number=number, repeat=3))
+
+
+def bench_serializers(name: str, payload, number: int):
+    response = FastJSONResponse(None)
+
+    candidates = {"legacy": lambda: json.dumps(jsonable_encoder(payload)).encode()}
+    if not isinstance(payload, list):
+        adapter = TypeAdapter(type(payload))
+        candidates["fastapi"] = lambda: adapter.dump_json(adapter.validate_python(payload))
+    candidates["fast_json"] = lambda: response.render(payload)
+
+    # Every path must produce the same document
+    documents = {key: json.loads(func()) for key, func in candidates.items()}
+    assert all(doc == documents["legacy"] for doc in documents.values())
+
+    baseline = None
+    for key, func in candidates.items():
+        rate = per_second(func, number)
+        baseline = baseline or rate
+        print(f"{name:<22} {key:<10} {rate:>12,.0f}/s {rate / baseline:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=20, help="Questions per payload")
+    parser.add_argument("--rows", type=int, default=200, help="Rows in the projected page")
+    parser.add_argument("--number", type=int, default=2000, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    test_payload = make_test_payload(args.questions)
+    result_payload = make_result_payload(args.questions)
+
+    print(f"{'payload':<22} {'path':<10} {'throughput':>14} {'speedup':>8}")
+    bench_serializers("TestWithQuestions", test_payload, args.number)
+    bench_serializers("TestResultWithReview", result_payload, args.number)
+    bench_serializers("projected rows", make_projected_rows(args.rows), args.number // 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Local stand-in for the Gemini generateContent API
+
+Serves POST /{version}/models/{model}:generateContent and
+:streamGenerateContent with plausible responses for every prompt the
+backend sends: test questions, note topics, schedule titles, OCR (requests
+with an inline image) and free-form explanations. Latency, error rate and
+responses are configurable, so AI-heavy paths can be load-tested offline.
+
+Point the backend at it with:
+    GEMINI_API_KEY=fake GEMINI_API_BASE_URL=http://127.0.0.1:8090 uvicorn app.main:app
+
+Latency specs (milliseconds):
+    fixed:800            always 800 ms
+    uniform:200,1500     uniformly between 200 and 1500 ms
+    normal:900,250       normal with mean 900 and standard deviation 250
+    lognormal:800,0.5    log-normal with median 800 and sigma 0.5 (default)
+
+Usage:
+    python benchmarks/fake_gemini.py
+    python benchmarks/fake_gemini.py --latency fixed:0 --error-rate 0
+    python benchmarks/fake_gemini.py --latency-for questions=lognormal:4000,0.4 --error-rate 0.02
+    python benchmarks/fake_gemini.py --canned responses.json   # {"ocr": "...", "explanation": "..."}
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+KINDS = ("questions", "topics", "schedule", "ocr", "explanation")
+
+ERROR_STATUSES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+_QUESTIONS = re.compile(r"Generate (\d+) multiple-choice questions for (\w+)")
+_SCHEDULE = re.compile(r"JSON array of (\d+) strings")
+_TOPICS_SUBJECT = re.compile(r"text from (\w+) class notes")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency spec into a sampler returning seconds.
+
+    Raises:
+        ValueError: If the spec is not one of the documented forms
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+@dataclass
+class FakeGeminiConfig:
+    latency: str = "lognormal:800,0.5"
+    latency_by_kind: Dict[str, str] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [429, 503])
+    canned: Dict[str, str] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+
+def classify_request(body: dict) -> str:
+    """Work out which backend feature sent a generateContent request"""
+    parts = [part for content in body.get("contents", []) for part in content.get("parts", [])]
+    if any("inline_data" in part or "inlineData" in part for part in parts):
+        return "ocr"
+    prompt = " ".join(part.get("text", "") for part in parts)
+    if _QUESTIONS.search(prompt):
+        return "questions"
+    if "curriculum topics" in prompt:
+        return "topics"
+    if _SCHEDULE.search(prompt):
+        return "schedule"
+    return "explanation"
+
+
+def _prompt_text(body: dict) -> str:
+    return " ".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def templated_response(kind: str, prompt: str, rng: random.Random) -> str:
+    """Build a response in the format the backend parses for this kind"""
+    if kind == "questions":
+        match = _QUESTIONS.search(prompt)
+        count, subject = int(match.group(1)), match.group(2)
+        questions = []
+        for i in range(count):
+            a, b = rng.randint(2, 50), rng.randint(2, 50)
+            answer = rng.choice("ABCD")
+            options = {letter: str(a + b + offset) for letter, offset in zip("ABCD", rng.sample([-3, -2, -1, 1, 2, 3], 4))}
+            options[answer] = str(a + b)
+            questions.append({
+                "question_text": f"{subject} practice {i + 1}: what is {a} + {b}?",
+                "options": options,
+                "correct_answer": answer,
+                "time_limit_seconds": rng.choice([30, 45, 60, 90]),
+            })
+        return json.dumps(questions)
+
+    if kind == "topics":
+        match = _TOPICS_SUBJECT.search(prompt)
+        subject = match.group(1) if match else "General"
+        names = ["Fractions", "Word Problems", "Vocabulary", "Plant Life Cycles", "Sentence Structure", "Measurement"]
+        return json.dumps([
+            {"topic": f"{subject} {name}", "confidence": round(rng.uniform(0.6, 0.98), 2)}
+            for name in rng.sample(names, 3)
+        ])
+
+    if kind == "schedule":
+        count = int(_SCHEDULE.search(prompt).group(1))
+        verbs = ["Master", "Explore", "Review", "Practise", "Challenge yourself with"]
+        return json.dumps([f"{rng.choice(verbs)} session {i + 1}" for i in range(count)])
+
+    if kind == "ocr":
+        return "Class Notes\n\n1. Fractions: a fraction has a numerator and a denominator.\n2. 3/4 + 1/4 = 1"
+
+    return (
+        "The correct answer works because it follows the rule from the lesson. "
+        "Check each step carefully, and remember to re-read the question before answering."
+    )
+
+
+def _candidate(text: str) -> dict:
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": 0,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": len(text) // 4,
+        },
+    }
+
+
+def _error(status_code: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {
+            "code": status_code,
+            "message": "Injected error from fake Gemini server",
+            "status": ERROR_STATUSES.get(status_code, "UNKNOWN"),
+        }},
+    )
+
+
+def create_app(config: FakeGeminiConfig) -> FastAPI:
+    """Build the fake server application"""
+    app = FastAPI(title="Fake Gemini")
+    rng = random.Random(config.seed)
+    default_latency = parse_latency(config.latency)
+    latency_by_kind = {kind: parse_latency(spec) for kind, spec in config.latency_by_kind.items()}
+    stats = {"requests": Counter(), "errors": Counter(), "started": time.time()}
+
+    def respond_text(kind: str, prompt: str) -> str:
+        if kind in config.canned:
+            return config.canned[kind]
+        return templated_response(kind, prompt, rng)
+
+    @app.post("/{version}/models/{target}")
+    async def generate(version: str, target: str, request: Request) -> Response:
+        model, _, method = target.rpartition(":")
+        if method not in ("generateContent", "streamGenerateContent") or not model:
+            raise HTTPException(status_code=404, detail=f"Unknown method: {target}")
+
+        body = await request.json()
+        kind = classify_request(body)
+        stats["requests"][kind] += 1
+        delay = latency_by_kind.get(kind, default_latency)(rng)
+
+        if rng.random() < config.error_rate:
+            stats["errors"][kind] += 1
+            # Failures usually come back sooner than full generations
+            await asyncio.sleep(delay / 4)
+            return _error(rng.choice(config.error_statuses))
+
+        text = respond_text(kind, _prompt_text(body))
+        if method == "generateContent":
+            await asyncio.sleep(delay)
+            return JSONResponse(_candidate(text))
+
+        # Streaming: three chunks spread over the latency, as a JSON array
+        # or, with ?alt=sse, as server-sent events
+        step = max(1, len(text) // 3)
+        chunks = [text[i:i + step] for i in range(0, len(text), step)]
+        sse = request.query_params.get("alt") == "sse"
+
+        async def stream():
+            if not sse:
+                yield "["
+            for i, chunk in enumerate(chunks):
+                await asyncio.sleep(delay / len(chunks))
+                payload = json.dumps(_candidate(chunk))
+                if sse:
+                    yield f"data: {payload}\r\n\r\n"
+                else:
+                    yield ("," if i else "") + payload
+            if not sse:
+                yield "]"
+
+        media_type = "text/event-stream" if sse else "application/json"
+        return StreamingResponse(stream(), media_type=media_type)
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        """Requests and injected errors per kind since startup"""
+        return {
+            "uptime_seconds": time.time() - stats["started"],
+            "requests": dict(stats["requests"]),
+            "errors": dict(stats["errors"]),
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:800,0.5", help="Default latency spec")
+    parser.add_argument(
+        "--latency-for", action="append", default=[], metavar="KIND=SPEC",
+        help=f"Latency for one kind ({', '.join(KINDS)}); repeatable",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", default="429,503", help="Comma-separated statuses for injected errors")
+    parser.add_argument("--canned", help="JSON file mapping kind to a fixed response text")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latencies and responses")
+    args = parser.parse_args()
+
+    latency_by_kind = {}
+    for item in args.latency_for:
+        kind, _, spec = item.partition("=")
+        if kind not in KINDS:
+            parser.error(f"Unknown kind {kind!r}; expected one of {', '.join(KINDS)}")
+        parse_latency(spec)
+        latency_by_kind[kind] = spec
+    parse_latency(args.latency)
+
+    canned = {}
+    if args.canned:
+        with open(args.canned) as f:
+            canned = json.load(f)
+
+    config = FakeGeminiConfig(
+        latency=args.latency,
+        latency_by_kind=latency_by_kind,
+        error_rate=args.error_rate,
+        error_statuses=[int(code) for code in args.error_status.split(",")],
+        canned=canned,
+        seed=args.seed,
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
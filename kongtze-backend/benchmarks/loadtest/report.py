@@ -0,0 +1,165 @@
+"""Latency recording, the JSON artifact and run-to-run comparison"""
+
+import os
+import platform
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """
+    Collect one sample per HTTP request, keyed by route template.
+
+    Samples taken before `measure_from` (the warm-up) are counted apart
+    and left out of the report.
+    """
+
+    def __init__(self):
+        self.measure_from = float("inf")
+        self.measure_until = float("inf")
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.scenarios: Counter = Counter()
+        self.scenario_failures: Counter = Counter()
+        self.failure_reasons: Dict[str, Counter] = defaultdict(Counter)
+        self.warmup_requests = 0
+
+    def start(self, warmup: float, duration: float):
+        now = time.perf_counter()
+        self.measure_from = now + warmup
+        self.measure_until = self.measure_from + duration
+
+    def measuring(self) -> bool:
+        return self.measure_from <= time.perf_counter() < self.measure_until
+
+    def record(self, route: str, started: float, status: Any):
+        """
+        Args:
+            route: "METHOD /template" of the request
+            started: perf_counter() when the request was sent
+            status: HTTP status code, or an exception name for transport errors
+        """
+        if started < self.measure_from:
+            self.warmup_requests += 1
+            return
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        self.statuses[route][str(status)] += 1
+
+    def record_scenario(self, name: str, error: Optional[str] = None):
+        if not self.measuring():
+            return
+        self.scenarios[name] += 1
+        if error:
+            self.scenario_failures[name] += 1
+            self.failure_reasons[name][error] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        routes = {}
+        for route in sorted(self.latencies):
+            latencies = self.latencies[route]
+            statuses = self.statuses[route]
+            errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+            routes[route] = {
+                "count": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "errors": errors,
+                "error_rate": round(errors / len(latencies), 4),
+                "statuses": dict(statuses),
+                "mean_ms": round(sum(latencies) / len(latencies), 1),
+                **{f"p{pct}_ms": round(percentile(latencies, pct), 1) for pct in PERCENTILES},
+                "max_ms": round(max(latencies), 1),
+            }
+
+        total = sum(route["count"] for route in routes.values())
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            "totals": {
+                "requests": total,
+                "throughput_rps": round(total / elapsed, 2),
+                "errors": sum(route["errors"] for route in routes.values()),
+                **({f"p{pct}_ms": round(percentile(every, pct), 1) for pct in PERCENTILES} if every else {}),
+                "warmup_requests": self.warmup_requests,
+            },
+            "routes": routes,
+            "scenarios": {
+                name: {
+                    "count": count,
+                    "failed": self.scenario_failures[name],
+                    "failure_reasons": dict(self.failure_reasons[name].most_common(3)),
+                }
+                for name, count in sorted(self.scenarios.items())
+            },
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Where the run happened, so artifacts from different machines are not confused"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def print_summary(summary: Dict[str, Any]):
+    totals = summary["totals"]
+    print(
+        f"\n{totals['requests']} requests, {totals['throughput_rps']:.1f}/s, {totals['errors']} errors "
+        f"({totals['warmup_requests']} warm-up requests excluded)\n"
+    )
+    print(f"{'route':44} {'count':>6} {'rps':>7} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, stats in summary["routes"].items():
+        print(
+            f"{route:44} {stats['count']:>6} {stats['throughput_rps']:>7.1f} {stats['errors']:>5} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+        )
+    for name, stats in summary["scenarios"].items():
+        if stats["failed"]:
+            print(f"\n{name}: {stats['failed']}/{stats['count']} failed")
+            for reason, count in stats["failure_reasons"].items():
+                print(f"  {count} x {reason}")
+
+
+def print_comparison(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Per-route p50/p95/p99 and throughput change against a previous artifact"""
+    print(f"\nAgainst baseline {baseline['environment'].get('git_commit')} "
+          f"({baseline['environment'].get('timestamp')}):")
+    print(f"{'route':44} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+    for route, stats in current["routes"].items():
+        old = baseline["routes"].get(route)
+        if old is None:
+            print(f"{route:44} {'new':>9}")
+            continue
+        print(
+            f"{route:44} {change(old['throughput_rps'], stats['throughput_rps']):>9} "
+            + " ".join(f"{change(old[f'p{pct}_ms'], stats[f'p{pct}_ms']):>9}" for pct in PERCENTILES)
+        )
+    for route in baseline["routes"].keys() - current["routes"].keys():
+        print(f"{route:44} {'missing':>9}")
@@ -0,0 +1,240 @@
+"""End-to-end load test with a realistic student and parent traffic mix
+
+Seeds a database with families that already have a test history, starts
+the API server (uvicorn) and the Gemini stand-in (benchmarks/fake_gemini.py),
+then drives the server with concurrent virtual users. Each user repeatedly
+picks a scenario by weight: login, create test, fetch test, submit,
+view results, upload homework, lucky draw or generate schedule.
+
+Writes a JSON artifact with throughput, error counts and p50/p95/p99 per
+route, plus the run's configuration and environment. Pass an earlier
+artifact with --compare to print the change per route.
+
+Usage:
+    python benchmarks/loadtest/run.py
+    python benchmarks/loadtest/run.py --users 50 --duration 120 --gemini-latency lognormal:1500,0.5
+    python benchmarks/loadtest/run.py --mix upload_homework=0,lucky_draw=20 --output after.json --compare before.json
+
+    # Against a server that is already running (seed its database first):
+    python benchmarks/loadtest/seed.py --database-url postgresql+asyncpg://... --manifest accounts.json
+    python benchmarks/loadtest/run.py --base-url http://127.0.0.1:8000 --manifest accounts.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from report import Recorder, environment, print_comparison, print_summary
+from scenarios import VirtualUser, homework_photo, parse_mix
+from seed import seed_families
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process for {url} exited with status {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _start(stack: ExitStack, args: List[str], log_path: Path, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    log = stack.enter_context(open(log_path, "w"))
+    process = subprocess.Popen(args, cwd=BACKEND_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    def stop():
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    stack.callback(stop)
+    return process
+
+
+def start_services(stack: ExitStack, args, workdir: Path) -> str:
+    """Start the Gemini stand-in and the API server; returns the server's base URL"""
+    log_dir = Path(args.log_dir) if args.log_dir else workdir
+    log_dir.mkdir(parents=True, exist_ok=True)
+    gemini_port = _free_port()
+    gemini = _start(stack, [
+        sys.executable, "benchmarks/fake_gemini.py",
+        "--port", str(gemini_port),
+        "--latency", args.gemini_latency,
+        "--error-rate", str(args.gemini_error_rate),
+        "--seed", str(args.seed),
+    ], log_dir / "fake-gemini.log")
+    args.gemini_url = f"http://127.0.0.1:{gemini_port}"
+    _wait_until_up(f"{args.gemini_url}/stats", gemini)
+
+    server_port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "GEMINI_API_KEY": "fake",
+        "GEMINI_API_BASE_URL": args.gemini_url,
+        "STORAGE_PATH": str(workdir / "storage"),
+    }
+    server = _start(stack, [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--port", str(server_port),
+        "--workers", str(args.workers),
+        "--no-access-log",
+    ], log_dir / "server.log", env=env)
+    base_url = f"http://127.0.0.1:{server_port}"
+    _wait_until_up(f"{base_url}/health", server)
+    return base_url
+
+
+async def drive(args, base_url: str, manifest: Dict[str, Any], mix: Dict[str, float]) -> Dict[str, Any]:
+    """Run the virtual users for warm-up plus duration and summarise the measured part"""
+    rng = random.Random(args.seed)
+    photo = homework_photo(args.seed)
+    students = [(family, student) for family in manifest["families"] for student in family["students"]]
+    rng.shuffle(students)
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        users = [
+            VirtualUser(
+                client, recorder, family, student, manifest["password"], manifest["subject_ids"],
+                photo, random.Random(rng.random()), args.parent_login_share,
+            )
+            for family, student in (students[i % len(students)] for i in range(args.users))
+        ]
+        recorder.start(args.warmup, args.duration)
+        print(f"Running {args.users} users for {args.warmup:.0f}s warm-up + {args.duration:.0f}s against {base_url}")
+        await asyncio.gather(*[
+            user.run(mix, args.think_ms / 1000, recorder.measure_until) for user in users
+        ])
+
+        summary = recorder.summary(args.duration)
+        if args.gemini_url:
+            try:
+                summary["gemini"] = (await client.get(f"{args.gemini_url}/stats")).json()
+            except httpx.HTTPError:
+                pass
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_argument_group("target")
+    target.add_argument("--base-url", help="Use an already running server instead of starting one")
+    target.add_argument(
+        "--database-url",
+        help="Database to seed (and the started server's DATABASE_URL); defaults to a scratch SQLite file",
+    )
+    target.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started server")
+    target.add_argument("--gemini-url", help="Gemini stand-in to read /stats from when --base-url is used")
+    target.add_argument("--gemini-latency", default="lognormal:800,0.5", help="Latency spec for the stand-in")
+    target.add_argument("--gemini-error-rate", type=float, default=0.0)
+
+    data = parser.add_argument_group("data")
+    data.add_argument("--manifest", help="Accounts written by seed.py; skips seeding")
+    data.add_argument("--families", type=int, default=20)
+    data.add_argument("--students-per-family", type=int, default=2)
+    data.add_argument("--history", type=int, default=30, help="Submitted tests per seeded student")
+    data.add_argument("--reset", action="store_true", help="Drop and recreate tables before seeding")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    load.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    load.add_argument("--warmup", type=float, default=5.0, help="Seconds run before measuring")
+    load.add_argument("--think-ms", type=float, default=500.0, help="Mean pause between scenarios")
+    load.add_argument("--mix", default="", help="Scenario weights, e.g. login=10,lucky_draw=0")
+    load.add_argument("--parent-share", dest="parent_login_share", type=float, default=0.3,
+                      help="Fraction of logins made with the parent's email and password")
+    load.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    load.add_argument("--seed", type=int, default=42)
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="Artifact path (default loadtest-<timestamp>.json)")
+    output.add_argument("--compare", help="Earlier artifact to compare against")
+    output.add_argument("--log-dir", help="Keep the started server's and stand-in's logs here")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with ExitStack() as stack:
+        workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="kongtze-loadtest-")))
+        if args.database_url is None:
+            if args.base_url and not args.manifest:
+                parser.error("--base-url needs --manifest or the server's --database-url")
+            args.database_url = f"sqlite+aiosqlite:///{workdir / 'loadtest.db'}"
+
+        if args.manifest:
+            with open(args.manifest) as f:
+                manifest = json.load(f)
+        else:
+            started = time.perf_counter()
+            manifest = asyncio.run(seed_families(
+                args.database_url,
+                families=args.families,
+                students_per_family=args.students_per_family,
+                history=args.history,
+                seed=args.seed,
+                reset=args.reset,
+            ))
+            print(f"Seeded {len(manifest['families'])} families in {time.perf_counter() - started:.1f}s")
+
+        base_url = args.base_url or start_services(stack, args, workdir)
+        summary = asyncio.run(drive(args, base_url, manifest, mix))
+
+    config = {
+        key: value for key, value in vars(args).items()
+        if key not in ("output", "compare", "manifest")
+    }
+    # Artifacts get shared; keep the database but not its credentials
+    config["database_url"] = make_url(args.database_url).render_as_string(hide_password=True)
+    artifact = {
+        "environment": environment(),
+        "config": config,
+        "mix": mix,
+        **summary,
+    }
+    output = args.output or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(artifact, f, indent=2)
+
+    print_summary(summary)
+    print(f"\nArtifact: {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), artifact)
+
+
+if __name__ == "__main__":
+    main()
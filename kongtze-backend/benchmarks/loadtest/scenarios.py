@@ -0,0 +1,251 @@
+"""Traffic scenarios for the load test
+
+Each virtual user is a seeded student. On every iteration it picks one
+scenario by weight and runs its requests in order; a scenario that ends
+early because a request failed is counted as failed. Parent traffic comes
+through the login scenario, which signs in with the family's parent
+account part of the time (the bcrypt path) instead of the student's PIN.
+"""
+
+import asyncio
+import io
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from report import Recorder
+
+DEFAULT_MIX = {
+    "login": 10,
+    "create_test": 8,
+    "fetch_test": 20,
+    "submit_test": 12,
+    "view_results": 25,
+    "upload_homework": 8,
+    "lucky_draw": 7,
+    "generate_schedule": 10,
+}
+
+
+class ScenarioFailed(Exception):
+    """A request in the scenario returned an error status"""
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse "login=10,fetch_test=20" into scenario weights.
+
+    Scenarios not named keep their default weight; a weight of 0 disables one.
+
+    Raises:
+        ValueError: For unknown scenarios or negative weights
+    """
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, spec.split(",")):
+        name, _, weight = item.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight)
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name}")
+    return mix
+
+
+def homework_photo(seed: int = 0) -> bytes:
+    """A phone-sized JPEG of a ruled page, so uploads go through real pre-processing"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (3024, 4032), (246, 244, 238))
+    draw = ImageDraw.Draw(image)
+    for y in range(300, 3900, 120):
+        draw.line([(150, y), (2874, y)], fill=(170, 190, 220), width=4)
+        x = 200
+        while x < 2700:
+            width = rng.randint(80, 400)
+            draw.line([(x, y - 40), (x + width, y - 40)], fill=(40, 40, 60), width=14)
+            x += width + rng.randint(40, 90)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=88)
+    return buffer.getvalue()
+
+
+class VirtualUser:
+    """One student session: credentials, auth token and what it has seen so far"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        family: Dict[str, Any],
+        student: Dict[str, Any],
+        password: str,
+        subject_ids: List[int],
+        photo: bytes,
+        rng: random.Random,
+        parent_login_share: float = 0.3,
+    ):
+        self.client = client
+        self.recorder = recorder
+        self.family = family
+        self.student = student
+        self.password = password
+        self.subject_ids = subject_ids
+        self.photo = photo
+        self.rng = rng
+        self.parent_login_share = parent_login_share
+        self.token: Optional[str] = None
+        self.test_ids: List[int] = list(student["test_ids"])
+        self.unsubmitted: List[int] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send one request and record its latency under `route`.
+
+        Raises:
+            ScenarioFailed: On transport errors and 4xx/5xx responses
+        """
+        if self.token:
+            kwargs.setdefault("headers", {})["Authorization"] = f"Bearer {self.token}"
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(route, started, type(e).__name__)
+            raise ScenarioFailed(f"{route}: {type(e).__name__}") from e
+        self.recorder.record(route, started, response.status_code)
+        if response.status_code >= 400:
+            raise ScenarioFailed(f"{route}: {response.status_code} {response.text[:200]}")
+        return response
+
+    async def login_student(self):
+        self.token = None
+        response = await self.request("POST /api/auth/login (student)", "POST", "/api/auth/login", json={
+            "pin": self.student["pin"],
+            "family_id": self.family["parent_id"],
+        })
+        self.token = response.json()["access_token"]
+
+    async def login_parent(self):
+        # The parent token is discarded: the session stays the student's
+        token, self.token = self.token, None
+        try:
+            await self.request("POST /api/auth/login (parent)", "POST", "/api/auth/login", json={
+                "email": self.family["email"],
+                "password": self.password,
+            })
+        finally:
+            self.token = token
+
+    async def run(self, mix: Dict[str, float], think_time: float, deadline: float):
+        """Run weighted scenarios until the deadline, pausing between them"""
+        names = [name for name, weight in mix.items() if weight > 0]
+        weights = [mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            name = self.rng.choices(names, weights=weights, k=1)[0]
+            error = None
+            try:
+                if self.token is None:
+                    await self.login_student()
+                await SCENARIOS[name](self)
+            except ScenarioFailed as e:
+                error = str(e)
+            self.recorder.record_scenario(name, error)
+            if think_time:
+                # Exponential think time spreads arrivals instead of marching in step
+                await asyncio.sleep(min(self.rng.expovariate(1 / think_time), think_time * 5))
+
+
+async def login(vu: VirtualUser):
+    if vu.rng.random() < vu.parent_login_share:
+        await vu.login_parent()
+    else:
+        await vu.login_student()
+
+
+async def create_test(vu: VirtualUser):
+    response = await vu.request("POST /api/tests", "POST", "/api/tests", json={
+        "subject_id": vu.rng.choice(vu.subject_ids),
+        "title": "Load test practice",
+        "difficulty_level": vu.rng.randint(1, 4),
+        "time_limit_minutes": 20,
+        "total_questions": 10,
+        "generation_mode": "pure_ai",
+    })
+    test_id = response.json()["test_id"]
+    vu.test_ids.append(test_id)
+    vu.unsubmitted.append(test_id)
+
+
+async def fetch_test(vu: VirtualUser):
+    await vu.request("GET /api/tests", "GET", "/api/tests", params={"limit": 20})
+    test_id = vu.rng.choice(vu.test_ids)
+    await vu.request("GET /api/tests/{test_id}", "GET", f"/api/tests/{test_id}")
+
+
+async def submit_test(vu: VirtualUser):
+    # Prefer tests created in this run; otherwise resubmit a seeded one
+    test_id = vu.unsubmitted.pop() if vu.unsubmitted else vu.rng.choice(vu.test_ids)
+    response = await vu.request("GET /api/tests/{test_id}", "GET", f"/api/tests/{test_id}")
+    questions = response.json()["questions"]
+    answers = {
+        str(question["question_id"]): vu.rng.choice(sorted(question.get("options") or {"A": ""}))
+        for question in questions
+    }
+    question_times = {question_id: vu.rng.randint(5, 90) for question_id in answers}
+    await vu.request("POST /api/tests/submit", "POST", "/api/tests/submit", json={
+        "test_id": test_id,
+        "answers": answers,
+        "time_taken_seconds": sum(question_times.values()) + vu.rng.randint(10, 120),
+        "question_times": question_times,
+    })
+
+
+async def view_results(vu: VirtualUser):
+    response = await vu.request("GET /api/tests/results", "GET", "/api/tests/results", params={"limit": 20})
+    results = response.json()
+    if results:
+        result_id = vu.rng.choice(results)["result_id"]
+        await vu.request("GET /api/tests/results/{result_id}", "GET", f"/api/tests/results/{result_id}")
+
+
+async def upload_homework(vu: VirtualUser):
+    await vu.request(
+        "POST /api/homework", "POST", "/api/homework",
+        data={"subject_id": str(vu.rng.choice(vu.subject_ids)), "title": "Load test worksheet"},
+        files={"photo": ("worksheet.jpg", vu.photo, "image/jpeg")},
+    )
+
+
+async def lucky_draw(vu: VirtualUser):
+    await vu.request("GET /api/rewards/balance", "GET", "/api/rewards/balance")
+    await vu.request("POST /api/rewards/lucky-draw", "POST", "/api/rewards/lucky-draw")
+
+
+async def generate_schedule(vu: VirtualUser):
+    subjects = vu.rng.sample(vu.subject_ids, k=min(len(vu.subject_ids), vu.rng.randint(2, 4)))
+    await vu.request(
+        "POST /api/study-sessions/generate-schedule", "POST", "/api/study-sessions/generate-schedule",
+        json={
+            "subjects": subjects,
+            "hoursPerDay": vu.rng.choice([1, 1.5, 2]),
+            "startTime": "15:00",
+            "endTime": "21:30",
+            "goals": "Prepare for end of term exams",
+            "aiTitles": True,
+        },
+    )
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "login": login,
+    "create_test": create_test,
+    "fetch_test": fetch_test,
+    "submit_test": submit_test,
+    "view_results": view_results,
+    "upload_homework": upload_homework,
+    "lucky_draw": lucky_draw,
+    "generate_schedule": generate_schedule,
+}
@@ -0,0 +1,248 @@
+"""Seed a database with load-test families
+
+Creates N parent accounts, each with students who already have a test
+history (tests, questions, results and reward points), plus the subject
+and gift catalogues the scenarios need. Writes a manifest of the
+accounts and their seeded IDs for run.py.
+
+Seeding is deterministic for a given --seed, so runs against the same
+parameters are comparable.
+
+Usage:
+    python benchmarks/loadtest/seed.py --database-url sqlite+aiosqlite:///./loadtest.db --reset
+    python benchmarks/loadtest/seed.py --families 200 --history 50 --manifest accounts.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the backend root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, bulk_insert_returning
+from app.core.security import hash_password
+from app.models import Gift, Question, Reward, Subject, Test, TestResult, User
+
+PARENT_PASSWORD = "loadtest-password"
+QUESTIONS_PER_TEST = 10
+STARTING_POINTS = 100_000  # Enough for a lucky draw on every iteration
+
+SUBJECTS = [
+    ("math", "Math"),
+    ("english", "English"),
+    ("chinese", "Chinese"),
+    ("science", "Science"),
+]
+
+GIFTS = [
+    ("Sticker pack", "bronze"),
+    ("Extra screen time", "silver"),
+    ("Weekend outing", "gold"),
+]
+
+
+async def _ensure_catalogues(db: AsyncSession) -> List[int]:
+    """Create subjects and gifts if the database has none"""
+    result = await db.execute(select(Subject.subject_id).order_by(Subject.subject_id))
+    subject_ids = list(result.scalars().all())
+    if not subject_ids:
+        subjects = await bulk_insert_returning(db, Subject, [
+            {"name": name, "display_name": display_name} for name, display_name in SUBJECTS
+        ])
+        subject_ids = [subject.subject_id for subject in subjects]
+
+    result = await db.execute(select(Gift.gift_id).limit(1))
+    if result.scalar_one_or_none() is None:
+        await bulk_insert_returning(db, Gift, [
+            {"name": name, "tier": tier, "is_active": True} for name, tier in GIFTS
+        ])
+    return subject_ids
+
+
+def _question_rows(test_id: int, rng: random.Random) -> List[Dict[str, Any]]:
+    rows = []
+    for order in range(1, QUESTIONS_PER_TEST + 1):
+        a, b = rng.randint(2, 50), rng.randint(2, 50)
+        rows.append({
+            "test_id": test_id,
+            "question_text": f"What is {a} + {b}?",
+            "question_order": order,
+            "options": {"A": str(a + b), "B": str(a + b + 1), "C": str(a + b - 1), "D": str(a + b + 2)},
+            "correct_answer": "A",
+            "time_limit_seconds": rng.choice([30, 45, 60, 90]),
+            "points": 10,
+        })
+    return rows
+
+
+async def _seed_history(
+    db: AsyncSession,
+    student_id: int,
+    subject_ids: List[int],
+    history: int,
+    rng: random.Random,
+) -> List[int]:
+    """Give one student `history` submitted tests over the last 90 days"""
+    now = datetime.now(timezone.utc)
+    taken_at = sorted(now - timedelta(minutes=rng.randint(60, 90 * 24 * 60)) for _ in range(history))
+
+    tests = await bulk_insert_returning(db, Test, [
+        {
+            "user_id": student_id,
+            "subject_id": rng.choice(subject_ids),
+            "difficulty_level": rng.randint(1, 4),
+            "time_limit_minutes": 30,
+            "total_questions": QUESTIONS_PER_TEST,
+            "title": f"Practice test {i + 1}",
+            "generation_mode": "pure_ai",
+            "created_at": created_at,
+        }
+        for i, created_at in enumerate(taken_at)
+    ])
+
+    question_rows = [row for test in tests for row in _question_rows(test.test_id, rng)]
+    questions = await bulk_insert_returning(db, Question, question_rows)
+
+    answers_by_test: Dict[int, Dict[str, str]] = {}
+    for question in questions:
+        answer = "A" if rng.random() < 0.7 else rng.choice("BCD")
+        answers_by_test.setdefault(question.test_id, {})[str(question.question_id)] = answer
+
+    result_rows = []
+    for test, created_at in zip(tests, taken_at):
+        answers = answers_by_test[test.test_id]
+        correct = sum(1 for answer in answers.values() if answer == "A")
+        result_rows.append({
+            "test_id": test.test_id,
+            "user_id": student_id,
+            "answers": answers,
+            "score": correct * 10,
+            "total_points": QUESTIONS_PER_TEST * 10,
+            "time_taken_seconds": rng.randint(300, 1700),
+            "question_count": QUESTIONS_PER_TEST,
+            "reward_points": correct * 10,
+            "submitted_at": created_at + timedelta(minutes=rng.randint(5, 29)),
+        })
+    await bulk_insert_returning(db, TestResult, result_rows)
+
+    await bulk_insert_returning(db, Reward, [{
+        "user_id": student_id,
+        "points": STARTING_POINTS,
+        "balance": STARTING_POINTS,
+        "source_type": "load_test",
+        "description": "Load-test starting balance",
+        "created_at": now - timedelta(days=91),
+    }])
+    return [test.test_id for test in tests]
+
+
+async def seed_families(
+    database_url: str,
+    families: int = 20,
+    students_per_family: int = 2,
+    history: int = 30,
+    seed: int = 42,
+    reset: bool = False,
+) -> Dict[str, Any]:
+    """
+    Create load-test families in the target database.
+
+    Args:
+        database_url: SQLAlchemy async URL of the database the server uses
+        families: Number of parent accounts
+        students_per_family: Students created under each parent
+        history: Submitted tests per student
+        seed: Random seed for reproducible data
+        reset: Drop and recreate all tables first (scratch databases only)
+
+    Returns:
+        Manifest with subject IDs and every account's credentials and test IDs
+    """
+    rng = random.Random(seed)
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            if reset:
+                await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        # One hash shared by every parent; bcrypt per account would dominate seeding
+        password_hash = hash_password(PARENT_PASSWORD)
+        run_tag = f"{seed}-{rng.randrange(16 ** 6):06x}"
+
+        manifest: Dict[str, Any] = {"password": PARENT_PASSWORD, "families": []}
+        async with session_factory() as db:
+            subject_ids = await _ensure_catalogues(db)
+            manifest["subject_ids"] = subject_ids
+
+            for family in range(families):
+                parent, = await bulk_insert_returning(db, User, [{
+                    "name": f"Load Parent {family + 1}",
+                    "email": f"loadtest-{run_tag}-{family + 1}@example.com",
+                    "password_hash": password_hash,
+                    "is_parent": True,
+                }])
+                students = await bulk_insert_returning(db, User, [
+                    {
+                        "name": f"Load Student {family + 1}.{i + 1}",
+                        "pin": f"{1000 + i:04d}",
+                        "parent_id": parent.user_id,
+                        "is_parent": False,
+                    }
+                    for i in range(students_per_family)
+                ])
+
+                entry = {"parent_id": parent.user_id, "email": parent.email, "students": []}
+                for student in students:
+                    test_ids = await _seed_history(db, student.user_id, subject_ids, history, rng)
+                    entry["students"].append({
+                        "user_id": student.user_id,
+                        "pin": student.pin,
+                        "test_ids": test_ids,
+                    })
+                manifest["families"].append(entry)
+                await db.commit()
+    finally:
+        await engine.dispose()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./loadtest.db")
+    parser.add_argument("--families", type=int, default=20)
+    parser.add_argument("--students-per-family", type=int, default=2)
+    parser.add_argument("--history", type=int, default=30, help="Submitted tests per student")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    parser.add_argument("--manifest", default="loadtest-accounts.json", help="Where to write the accounts")
+    args = parser.parse_args()
+
+    manifest = asyncio.run(seed_families(
+        args.database_url,
+        families=args.families,
+        students_per_family=args.students_per_family,
+        history=args.history,
+        seed=args.seed,
+        reset=args.reset,
+    ))
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f)
+
+    students = sum(len(family["students"]) for family in manifest["families"])
+    print(f"Seeded {len(manifest['families'])} families, {students} students, "
+          f"{students * args.history} tests; manifest in {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -135,6 +135,45 @@ class TestAdaptiveDifficultyAlgorithms:
         assert self.service.LOW_SCORE_THRESHOLD == 70.0
         assert self.service.MIN_TESTS_FOR_ADJUSTMENT == 3
 
+    def test_recommend_difficulty_needs_min_tests(self):
+        """Test default difficulty with too little history"""
+        rows = [(90, 100, 200, 3, 10), (95, 100, 200, 3, 10)]
+        assert self.service._recommend_difficulty(rows) == 2
+
+    def test_recommend_difficulty_increases_for_fast_high_scores(self):
+        """Test difficulty goes up for high scores answered quickly"""
+        # 3 tests x 10 questions at 20s each, well under 45s expected
+        rows = [(90, 100, 200, 2, 10)] * 3
+        assert self.service._recommend_difficulty(rows) == 3
+
+    def test_recommend_difficulty_decreases_for_low_scores(self):
+        """Test difficulty goes down when struggling"""
+        rows = [(50, 100, 450, 3, 10)] * 3
+        assert self.service._recommend_difficulty(rows) == 2
+
+    def test_recommend_difficulty_uses_real_question_count(self):
+        """Test time per question is divided by the questions actually asked"""
+        # 900s over 30 questions is 30s each: fast for level 2, so go up.
+        # Assuming 10 questions would make it 90s each, slow, and go down
+        rows = [(90, 100, 900, 2, 30)] * 3
+        assert self.service._recommend_difficulty(rows) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_difficulties_served_from_cache(self):
+        """Test that cached subjects need no database query"""
+        from app.core.cache import cache
+
+        cache.set(self.service._cache_key(7, 1, 5), 3)
+        cache.set(self.service._cache_key(7, 2, 5), 1)
+        try:
+            difficulties = await self.service.calculate_recommended_difficulties(
+                user_id=7, subject_ids=[1, 2], db=None
+            )
+        finally:
+            cache.delete_pattern("adaptive_difficulty:7:")
+
+        assert difficulties == {1: 3, 2: 1}
+
 
 @pytest.mark.asyncio
 class TestAdaptiveDifficultyBreakdown:
@@ -147,13 +186,13 @@ class TestAdaptiveDifficultyBreakdown:
     async def test_difficulty_breakdown_calculation(self):
         """Test difficulty breakdown by level"""
         test_results = [
-            (type('TestResult', (), {'score': 80, 'total_points': 100, 'time_taken_seconds': 600}),
+            (type('TestResult', (), {'score': 80, 'total_points': 100, 'time_taken_seconds': 600, 'question_count': 10, 'question_timings': None}),
              type('Test', (), {'difficulty_level': 1})),
-            (type('TestResult', (), {'score': 85, 'total_points': 100, 'time_taken_seconds': 720}),
+            (type('TestResult', (), {'score': 85, 'total_points': 100, 'time_taken_seconds': 720, 'question_count': 10, 'question_timings': None}),
              type('Test', (), {'difficulty_level': 2})),
-            (type('TestResult', (), {'score': 90, 'total_points': 100, 'time_taken_seconds': 840}),
+            (type('TestResult', (), {'score': 90, 'total_points': 100, 'time_taken_seconds': 840, 'question_count': 10, 'question_timings': None}),
              type('Test', (), {'difficulty_level': 2})),
-            (type('TestResult', (), {'score': 75, 'total_points': 100, 'time_taken_seconds': 900}),
+            (type('TestResult', (), {'score': 75, 'total_points': 100, 'time_taken_seconds': 900, 'question_count': 10, 'question_timings': None}),
              type('Test', (), {'difficulty_level': 3})),
         ]
 
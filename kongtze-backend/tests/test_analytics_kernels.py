@@ -0,0 +1,131 @@
+"""Parity tests for the array-backed analytics kernels"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.adaptive_difficulty_service import AdaptiveDifficultyService
+from app.services.analytics_kernels import (
+    answer_seconds,
+    columns_from_pairs,
+    difficulty_breakdown,
+    difficulty_trend,
+    question_timings,
+    result_columns,
+)
+
+
+def reference_breakdown(test_results):
+    """Row-by-row definition of the breakdown"""
+    breakdown = {}
+    for test_result, test in test_results:
+        difficulty = str(test.difficulty_level)
+        if difficulty not in breakdown:
+            breakdown[difficulty] = {"tests": 0, "avg_score": 0, "avg_time": 0, "total_score": 0,
+                                     "total_points": 0, "total_time": 0, "total_questions": 0}
+        breakdown[difficulty]["tests"] += 1
+        breakdown[difficulty]["total_score"] += test_result.score
+        breakdown[difficulty]["total_points"] += test_result.total_points
+        breakdown[difficulty]["total_time"] += answer_seconds(
+            test_result.time_taken_seconds, test_result.question_timings
+        )
+        breakdown[difficulty]["total_questions"] += test_result.question_count or test.total_questions
+
+    for data in breakdown.values():
+        if data["total_points"] > 0:
+            data["avg_score"] = round(data["total_score"] / data["total_points"] * 100, 2)
+        if data["total_questions"] > 0:
+            data["avg_time"] = round(data["total_time"] / data["total_questions"], 2)
+        del data["total_score"], data["total_points"], data["total_time"], data["total_questions"]
+    return breakdown
+
+
+def reference_trend(test_results):
+    """The row-by-row trend the kernel replaced"""
+    if len(test_results) < 3:
+        return "stable"
+    mid_point = len(test_results) // 2
+    first_half, second_half = test_results[:mid_point], test_results[mid_point:]
+    first = sum(tr.score / tr.total_points for tr, _ in first_half if tr.total_points > 0) / len(first_half)
+    second = sum(tr.score / tr.total_points for tr, _ in second_half if tr.total_points > 0) / len(second_half)
+    diff = second - first
+    if diff > 0.05:
+        return "improving"
+    elif diff < -0.05:
+        return "declining"
+    return "stable"
+
+
+def make_history(size, rng, points_choices=(100,), drift=0.0):
+    history = []
+    for i in range(size):
+        total_points = rng.choice(points_choices)
+        skill = min(1.0, max(0.0, 0.6 + drift * i / max(size - 1, 1) + rng.uniform(-0.2, 0.2)))
+        question_count = rng.choice([None, 5, 10, 30])
+        timings = None
+        if question_count and rng.random() < 0.5:
+            seconds = [rng.randint(5, 120) for _ in range(question_count)]
+            if rng.random() < 0.2:
+                seconds[0] = None  # Partially reported times are ignored
+            timings = {"question_ids": list(range(question_count)), "correct": [1] * question_count,
+                       "seconds": seconds}
+        history.append((
+            SimpleNamespace(
+                score=round(total_points * skill / 10) * 10,
+                total_points=total_points,
+                time_taken_seconds=rng.randint(60, 1800),
+                question_count=question_count,
+                question_timings=timings,
+            ),
+            SimpleNamespace(difficulty_level=rng.randint(1, 4), total_questions=10),
+        ))
+    return history
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 7, 50, 1000])
+@pytest.mark.parametrize("drift", [-0.3, 0.0, 0.3])
+def test_kernels_match_reference(size, drift):
+    rng = random.Random(size * 31 + int(drift * 10))
+    history = make_history(size, rng, points_choices=(0, 50, 100, 150), drift=drift)
+    scores, points, times, difficulties, question_counts = columns_from_pairs(history)
+
+    breakdown = difficulty_breakdown(scores, points, times, difficulties, question_counts)
+    expected = reference_breakdown(history)
+    assert breakdown == expected
+    assert list(breakdown) == list(expected)
+    assert difficulty_trend(scores, points) == reference_trend(history)
+
+
+def test_trend_matches_reference_at_threshold():
+    # Averages 0.80 and 0.85: the difference lands on the threshold, where
+    # any change in float summation would flip the label
+    for first, second in [(0.8, 0.85), (0.85, 0.8), (0.3, 0.35), (0.6, 0.65)]:
+        history = [
+            (SimpleNamespace(score=round(share * 100), total_points=100), None)
+            for share in [first] * 10 + [second] * 10
+        ]
+        scores, points = result_columns([(r.score, r.total_points, 0, 1, 10) for r, _ in history])[:2]
+        assert difficulty_trend(scores, points) == reference_trend(history)
+
+
+@pytest.mark.asyncio
+async def test_service_methods_use_kernels():
+    service = AdaptiveDifficultyService()
+    history = make_history(200, random.Random(5), drift=0.3)
+
+    assert await service._calculate_difficulty_breakdown(history) == reference_breakdown(history)
+    assert service._calculate_difficulty_trend(history) == reference_trend(history) == "improving"
+
+
+def test_question_timings_are_columnar():
+    timings = question_timings([7, 8, 9], [True, False, True], {"7": 12, "9": 30})
+    assert timings == {"question_ids": [7, 8, 9], "correct": [1, 0, 1], "seconds": [12, None, 30]}
+    assert question_timings([7], [False])["seconds"] is None
+
+
+def test_answer_seconds_needs_every_question_timed():
+    assert answer_seconds(600, {"seconds": [100, 200, 150]}) == 450
+    assert answer_seconds(600, {"seconds": [100, None, 150]}) == 600
+    assert answer_seconds(600, {"seconds": None}) == 600
+    assert answer_seconds(600, None) == 600
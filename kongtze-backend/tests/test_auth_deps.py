@@ -0,0 +1,69 @@
+"""Unit tests for claim-based authentication dependencies"""
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.deps import get_current_parent, get_current_student, get_token_data, require_metrics_token
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+def _credentials(**claims) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token(claims))
+
+
+def test_token_data_reads_claims():
+    token_data = asyncio.run(get_token_data(_credentials(user_id=7, is_parent=True, ver=3)))
+    assert (token_data.user_id, token_data.is_parent, token_data.token_version) == (7, True, 3)
+
+
+def test_tokens_issued_before_versioning_have_version_zero():
+    token_data = asyncio.run(get_token_data(_credentials(user_id=7, is_parent=False)))
+    assert token_data.token_version == 0
+
+
+@pytest.mark.parametrize("claims", [{"is_parent": True}, {"user_id": 7}])
+def test_missing_claims_are_rejected(claims):
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_token_data(_credentials(**claims)))
+    assert exc_info.value.status_code == 401
+
+
+def test_invalid_token_is_rejected():
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-jwt")
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_token_data(credentials))
+    assert exc_info.value.status_code == 401
+
+
+def test_role_checks_do_not_need_the_database():
+    student = asyncio.run(get_token_data(_credentials(user_id=1, is_parent=False)))
+    parent = asyncio.run(get_token_data(_credentials(user_id=2, is_parent=True)))
+
+    # db=None: the role is rejected from the claim alone
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_current_parent(student, db=None))
+    assert exc_info.value.status_code == 403
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_current_student(parent, db=None))
+    assert exc_info.value.status_code == 403
+
+
+def test_metrics_endpoint_is_off_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(require_metrics_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials="")))
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.parametrize("token", [None, "wrong", "scrape-secret-x"])
+def test_metrics_token_is_required(monkeypatch, token):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    credentials = token and HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(require_metrics_token(credentials))
+    assert exc_info.value.status_code == 401
+
+    asyncio.run(require_metrics_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials="scrape-secret")))
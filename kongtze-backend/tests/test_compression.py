@@ -0,0 +1,111 @@
+"""Unit tests for response compression"""
+
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressedBodyCache, CompressionMiddleware, negotiate_encoding
+
+BODY = "long enough to compress " * 100
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ("br", "gzip")) == expected
+
+
+def test_negotiate_encoding_without_brotli():
+    assert negotiate_encoding("br", ("gzip",)) is None
+    assert negotiate_encoding("br, gzip", ("gzip",)) == "gzip"
+
+
+def test_cache_evicts_least_recently_used_within_budget():
+    cache = CompressedBodyCache(max_bytes=10)
+    cache.set(("a", "1", "gzip"), b"aaaa")
+    cache.set(("b", "1", "gzip"), b"bbbb")
+    assert cache.get(("a", "1", "gzip")) == b"aaaa"
+    cache.set(("c", "1", "gzip"), b"cccc")
+    assert cache.get(("b", "1", "gzip")) is None
+    assert len(cache) == 2
+    cache.set(("d", "1", "gzip"), b"x" * 11)
+    assert cache.get(("d", "1", "gzip")) is None
+
+
+def _client():
+    app = FastAPI()
+    calls = []
+
+    @app.get("/tagged")
+    async def tagged():
+        calls.append(1)
+        return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\xff" * 4096, media_type="image/jpeg")
+
+    @app.get("/video")
+    async def video():
+        return Response(b"\xff" * 4096, media_type="video/mp4; codecs=avc1")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    middleware = CompressionMiddleware(app, minimum_size=500)
+    return TestClient(middleware), middleware
+
+
+def test_compresses_large_bodies_and_weakens_etag():
+    client, middleware = _client()
+    response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == BODY
+    assert len(middleware.cache) == 1
+
+    # Served from the cache the second time
+    key = next(iter(middleware.cache._entries))
+    middleware.cache.set(key, gzip.compress(b"cached"))
+    assert client.get("/tagged", headers={"Accept-Encoding": "gzip"}).text == "cached"
+
+
+def test_skips_small_and_precompressed_bodies():
+    client, _ = _client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert "content-encoding" not in client.get("/video", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_compresses_streaming_bodies():
+    client, middleware = _client()
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == BODY * 3
+    assert len(middleware.cache) == 0
@@ -0,0 +1,52 @@
+"""Unit tests for conditional GET helpers"""
+
+from datetime import datetime, timezone
+from email.utils import formatdate
+from starlette.requests import Request
+
+from app.core.http_cache import cache_headers, is_not_modified, make_etag
+
+MODIFIED = datetime(2026, 10, 19, 9, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_make_etag_is_quoted_and_stable():
+    etag = make_etag("test", 1, MODIFIED)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("test", 1, MODIFIED)
+    assert etag != make_etag("test", 2, MODIFIED)
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("test", 1)
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request(if_none_match="*"), etag)
+    assert not is_not_modified(_request(if_none_match='"other"'), etag)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = _request(
+        if_none_match='"other"',
+        if_modified_since=formatdate(MODIFIED.timestamp() + 60, usegmt=True),
+    )
+    assert not is_not_modified(request, make_etag("test", 1), MODIFIED)
+
+
+def test_if_modified_since_ignores_sub_second_precision():
+    header = formatdate(MODIFIED.timestamp(), usegmt=True)
+    assert is_not_modified(_request(if_modified_since=header), '"x"', MODIFIED)
+    earlier = formatdate(MODIFIED.timestamp() - 1, usegmt=True)
+    assert not is_not_modified(_request(if_modified_since=earlier), '"x"', MODIFIED)
+    assert not is_not_modified(_request(if_modified_since="garbage"), '"x"', MODIFIED)
+    assert not is_not_modified(_request(if_modified_since=header), '"x"')
+
+
+def test_cache_headers_include_last_modified_only_when_known():
+    headers = cache_headers('"x"', MODIFIED)
+    assert headers["Last-Modified"] == "Mon, 19 Oct 2026 09:30:15 GMT"
+    assert "Last-Modified" not in cache_headers('"x"')
@@ -0,0 +1,35 @@
+"""Unit tests for image derivative rendering"""
+
+import pytest
+from PIL import Image
+
+from app.services.image_derivatives import DERIVATIVE_SIZES, render_derivative
+
+
+class TestRenderDerivative:
+    """Test WebP thumbnail rendering run in the worker pool"""
+
+    @pytest.mark.parametrize("size_name", list(DERIVATIVE_SIZES))
+    def test_fits_size(self, tmp_path, size_name):
+        """Test that each size caps the longest edge and writes WebP"""
+        source = tmp_path / "source.jpg"
+        Image.new("RGB", (3000, 2000), (10, 200, 30)).save(source)
+        dest = tmp_path / "out" / "source.webp"
+
+        written = render_derivative(str(source), str(dest), DERIVATIVE_SIZES[size_name], 75)
+
+        assert written == dest.stat().st_size
+        with Image.open(dest) as result:
+            assert result.format == "WEBP"
+            assert max(result.size) == DERIVATIVE_SIZES[size_name]
+
+    def test_invalid_source_leaves_nothing(self, tmp_path):
+        """Test that an undecodable source raises and leaves no files"""
+        source = tmp_path / "source.jpg"
+        source.write_bytes(b"not an image")
+        dest = tmp_path / "out" / "source.webp"
+
+        with pytest.raises(ValueError):
+            render_derivative(str(source), str(dest), 160, 75)
+
+        assert list(dest.parent.iterdir()) == []
@@ -0,0 +1,108 @@
+"""Unit tests for upload image pre-processing"""
+
+import io
+import pytest
+from PIL import Image
+
+from app.services.image_processing import preprocess_image_bytes, preprocess_image_file
+
+
+def _encode(image: Image.Image, format: str = "JPEG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **kwargs)
+    return buffer.getvalue()
+
+
+class TestPreprocessImageBytes:
+    """Test the pre-processing pipeline run in the worker pool"""
+
+    def test_downscales_to_max_edge(self):
+        """Test that the longest edge is capped and aspect ratio kept"""
+        data = _encode(Image.new("RGB", (4000, 3000), (200, 40, 40)))
+
+        processed = preprocess_image_bytes(data, max_edge=1000, quality=80)
+
+        assert (processed.width, processed.height) == (1000, 750)
+        assert processed.original_size == len(data)
+
+    def test_small_image_not_upscaled(self):
+        """Test that images below the limit keep their size"""
+        data = _encode(Image.new("RGB", (640, 480), (200, 40, 40)))
+
+        processed = preprocess_image_bytes(data, max_edge=2048, quality=80)
+
+        assert (processed.width, processed.height) == (640, 480)
+
+    def test_applies_exif_orientation_and_strips_metadata(self):
+        """Test that EXIF rotation is applied and EXIF is not re-emitted"""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 CW
+        data = _encode(Image.new("RGB", (400, 200), (200, 40, 40)), exif=exif)
+
+        processed = preprocess_image_bytes(data, max_edge=2048, quality=80)
+
+        assert (processed.width, processed.height) == (200, 400)
+        with Image.open(io.BytesIO(processed.content)) as result:
+            assert result.format == "JPEG"
+            assert not result.getexif()
+
+    def test_document_photo_converted_to_grayscale(self):
+        """Test that a low-saturation page is stored as grayscale"""
+        data = _encode(Image.new("RGB", (800, 600), (235, 232, 228)))
+
+        processed = preprocess_image_bytes(data, max_edge=2048, quality=80)
+
+        assert processed.grayscale
+        with Image.open(io.BytesIO(processed.content)) as result:
+            assert result.mode == "L"
+
+    def test_colour_photo_kept_in_colour(self):
+        """Test that colourful images are not converted"""
+        data = _encode(Image.new("RGB", (800, 600), (30, 120, 220)))
+
+        processed = preprocess_image_bytes(data, max_edge=2048, quality=80)
+
+        assert not processed.grayscale
+
+    def test_transparent_png_flattened(self):
+        """Test that images with alpha are flattened onto white"""
+        data = _encode(Image.new("RGBA", (100, 100), (0, 0, 0, 0)), format="PNG")
+
+        processed = preprocess_image_bytes(data, max_edge=2048, quality=80)
+
+        with Image.open(io.BytesIO(processed.content)) as result:
+            assert result.getpixel((50, 50)) >= 250
+
+    def test_invalid_bytes_raise_value_error(self):
+        """Test that undecodable input is rejected"""
+        with pytest.raises(ValueError):
+            preprocess_image_bytes(b"not an image", max_edge=2048, quality=80)
+
+
+class TestPreprocessImageFile:
+    """Test the file-to-file variant used for streamed uploads"""
+
+    def test_writes_processed_jpeg(self, tmp_path):
+        """Test that output is written to disk and described correctly"""
+        source = tmp_path / "upload"
+        source.write_bytes(_encode(Image.new("RGB", (4000, 3000), (200, 40, 40))))
+        output = tmp_path / "out.jpg"
+
+        processed = preprocess_image_file(str(source), str(output), max_edge=1000, quality=80)
+
+        assert processed.content is None
+        assert processed.size == output.stat().st_size
+        assert processed.original_size == source.stat().st_size
+        with Image.open(output) as result:
+            assert result.size == (1000, 750)
+
+    def test_invalid_file_leaves_no_output(self, tmp_path):
+        """Test that a failed decode does not leave a partial output file"""
+        source = tmp_path / "upload"
+        source.write_bytes(b"\xff\xd8\xff" + b"garbage" * 100)
+        output = tmp_path / "out.jpg"
+
+        with pytest.raises(ValueError):
+            preprocess_image_file(str(source), str(output), max_edge=1000, quality=80)
+
+        assert not output.exists()
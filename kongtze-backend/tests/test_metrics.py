@@ -0,0 +1,91 @@
+"""Unit tests for request metrics aggregation"""
+
+from app.core.metrics import (
+    Histogram,
+    PrometheusWriter,
+    RequestMetrics,
+    RouteMetrics,
+    UNMATCHED_ROUTE,
+    _route_template,
+    server_timing,
+)
+from fastapi.routing import APIRoute
+
+
+def _metrics(statements=(), db_seconds=0.0) -> RequestMetrics:
+    metrics = RequestMetrics()
+    for statement in statements:
+        metrics.statements[statement] += 1
+        metrics.db_statements += 1
+    metrics.db_seconds = db_seconds
+    return metrics
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == 0.01
+    assert histogram.quantile(0.6) == 0.1
+    assert histogram.quantile(1.0) == 1.0
+    assert histogram.cumulative()[-1] == (float("inf"), 5)
+
+
+def test_record_aggregates_per_route():
+    routes = RouteMetrics(n_plus_one_threshold=10)
+    routes.record("GET", "/api/tests/{test_id}", 200, 0.02, _metrics(["SELECT 1"], db_seconds=0.004))
+    routes.record("GET", "/api/tests/{test_id}", 500, 0.04, _metrics(["SELECT 1", "SELECT 2"], db_seconds=0.006))
+
+    stats = routes.snapshot()["GET /api/tests/{test_id}"]
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+    assert stats["db_statements_avg"] == 1.5
+    assert round(stats["db_avg_ms"], 3) == 5.0
+    assert stats["n_plus_one"] == 0
+
+
+def test_repeated_statement_is_flagged_as_n_plus_one(capsys):
+    routes = RouteMetrics(n_plus_one_threshold=10)
+    loop = ["SELECT * FROM questions WHERE question_id = ?"] * 12
+    routes.record("POST", "/api/tests/generate", 200, 0.1, _metrics(loop + ["SELECT 1"]))
+
+    assert routes.snapshot()["POST /api/tests/generate"]["n_plus_one"] == 1
+    assert "ran 12 times" in capsys.readouterr().out
+
+
+def test_server_timing_header():
+    metrics = _metrics(["SELECT 1", "SELECT 2"], db_seconds=0.0035)
+    assert server_timing(0.0125, metrics) == 'app;dur=12.5, db;dur=3.5;desc="2 queries"'
+
+    metrics.ai_calls = 1
+    metrics.ai_seconds = 1.2
+    assert server_timing(1.3, metrics).endswith('ai;dur=1200.0;desc="1 calls"')
+
+
+def test_route_template_includes_router_prefix():
+    route = APIRoute("/tests/{test_id}", lambda test_id: None)
+    assert _route_template({"path": "/api/tests/7", "route": route}) == "/api/tests/{test_id}"
+    assert _route_template({"path": "/api/tests/7/"}) == UNMATCHED_ROUTE
+
+    health = APIRoute("/health", lambda: None)
+    assert _route_template({"path": "/health", "route": health}) == "/health"
+
+
+def test_prometheus_writer_renders_histograms_and_labels():
+    histogram = Histogram((0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(3.0)
+
+    writer = PrometheusWriter()
+    writer.histogram("request_seconds", "Request time", histogram, route='/a"b')
+    writer.histogram("request_seconds", "Request time", Histogram((0.1, 1.0)), route="/c")
+    writer.counter("errors_total", "Errors", 2)
+    lines = writer.render().splitlines()
+
+    assert lines.count("# TYPE kongtze_request_seconds histogram") == 1
+    assert 'kongtze_request_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+    assert 'kongtze_request_seconds_bucket{route="/a\\"b",le="+Inf"} 2' in lines
+    assert 'kongtze_request_seconds_count{route="/c"} 0' in lines
+    assert lines[-1] == "kongtze_errors_total 2"
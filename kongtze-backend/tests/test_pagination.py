@@ -0,0 +1,27 @@
+"""Unit tests for keyset pagination cursors"""
+
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import decode_cursor, encode_cursor, page_params
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 10, 19, 11, 0, 27, 804113, tzinfo=timezone.utc)
+    cursor = encode_cursor(timestamp, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", encode_cursor(datetime(2026, 1, 1), 1)[:-4]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_page_params_parses_fields():
+    params = page_params(limit=10, cursor=None, fields=" score, ,result_id ", include_total=True)
+    assert params.fields == ["score", "result_id"]
+    assert page_params(limit=10, cursor=None, fields=None, include_total=False).fields is None
@@ -0,0 +1,50 @@
+"""Unit tests for the off-loop password hasher"""
+
+import asyncio
+import threading
+import pytest
+
+from app.core.config import settings
+from app.core.security import PasswordHasher, PasswordHasherBusyError
+
+
+def test_runs_off_the_event_loop_and_records_stats():
+    hasher = PasswordHasher()
+    loop_thread = threading.get_ident()
+
+    async def main():
+        return await asyncio.gather(*[hasher._run(threading.get_ident) for _ in range(4)])
+
+    try:
+        threads = asyncio.run(main())
+    finally:
+        hasher.shutdown()
+
+    assert loop_thread not in threads
+    stats = hasher.stats()
+    assert stats["completed"] == 4
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+    assert stats["peak_queue_depth"] == max(4 - settings.PASSWORD_HASH_WORKERS, 0)
+
+
+def test_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_QUEUE", 1)
+    hasher = PasswordHasher()
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher._run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+
+    try:
+        asyncio.run(main())
+    finally:
+        hasher.shutdown()
+
+    assert hasher.rejected == 1
+    assert hasher.completed == 2
@@ -0,0 +1,163 @@
+"""Unit tests for perceptual hashing and the BK-tree index"""
+
+import io
+import random
+import pytest
+import pytest_asyncio
+from PIL import Image, ImageDraw, ImageFilter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import cache
+from app.services.image_processing import preprocess_image_bytes
+from app.services.perceptual_hash import (
+    BKTree,
+    PerceptualHashIndex,
+    dhash,
+    format_hash,
+    hamming_distance,
+)
+
+
+def _worksheet(seed: int, size=(1200, 1600)) -> Image.Image:
+    """Draw a page of random text-like bars"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (250, 250, 245))
+    draw = ImageDraw.Draw(image)
+    for y in range(80, size[1] - 80, 60):
+        x = 60
+        while x < size[0] - 120:
+            width = rng.randint(30, 140)
+            draw.rectangle([x, y, x + width, y + 24], fill=(30, 30, 30))
+            x += width + rng.randint(15, 40)
+    return image
+
+
+class TestDHash:
+    """Test difference hashing"""
+
+    def test_identical_images_match(self):
+        """Test that the same image hashes identically"""
+        page = _worksheet(1)
+        assert dhash(page) == dhash(page.copy())
+
+    def test_rephotographed_page_is_near(self):
+        """Test that rescaling, blur and brightness keep the hash close"""
+        page = _worksheet(1)
+        retaken = page.resize((900, 1200)).filter(ImageFilter.GaussianBlur(1.5))
+        retaken = retaken.point(lambda v: min(255, int(v * 0.9) + 12))
+
+        assert hamming_distance(dhash(page), dhash(retaken)) <= 6
+
+    def test_different_pages_are_far(self):
+        """Test that different pages are well separated"""
+        assert hamming_distance(dhash(_worksheet(1)), dhash(_worksheet(2))) > 10
+
+    def test_format_hash(self):
+        """Test hex formatting is fixed width"""
+        assert format_hash(0xAB) == "00000000000000ab"
+        assert len(format_hash(2**64 - 1)) == 16
+
+    def test_preprocess_includes_hash(self):
+        """Test that pre-processing reports a hash of the processed image"""
+        buffer = io.BytesIO()
+        _worksheet(3).save(buffer, format="JPEG")
+
+        processed = preprocess_image_bytes(buffer.getvalue(), max_edge=1024, quality=80)
+
+        assert len(processed.perceptual_hash) == 16
+        assert hamming_distance(
+            int(processed.perceptual_hash, 16), dhash(_worksheet(3))
+        ) <= 6
+
+
+class TestBKTree:
+    """Test BK-tree radius search"""
+
+    def test_search_matches_linear_scan(self):
+        """Test that results equal a brute-force scan"""
+        rng = random.Random(42)
+        keys = [rng.getrandbits(64) for _ in range(500)]
+        tree = BKTree()
+        for i, key in enumerate(keys):
+            tree.add(key, i)
+
+        query = keys[17] ^ 0b1011  # 3 bits away from a stored key
+        expected = sorted(
+            (hamming_distance(query, key), i)
+            for i, key in enumerate(keys)
+            if hamming_distance(query, key) <= 8
+        )
+
+        assert sorted(tree.search(query, 8)) == expected
+        assert tree.search(query, 8)[0] == (3, 17)
+
+    def test_duplicate_keys_keep_all_values(self):
+        """Test that identical hashes are all returned"""
+        tree = BKTree()
+        tree.add(0xFF, "a")
+        tree.add(0xFF, "b")
+        tree.add(0x0F, "c")
+
+        assert len(tree) == 3
+        assert sorted(v for _, v in tree.search(0xFF, 0)) == ["a", "b"]
+
+    def test_empty_tree(self):
+        """Test searching an empty tree"""
+        assert BKTree().search(0, 64) == []
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    yield async_sessionmaker(engine, class_=AsyncSession)
+    await engine.dispose()
+
+
+class TestIndexAfterCommit:
+    """Test that uploads join a loaded index only once committed"""
+
+    USER_ID = 901
+    HASH = format_hash(0xF0F0)
+
+    @pytest.fixture
+    def index(self):
+        index = PerceptualHashIndex()
+        cache.set(index._cache_key(self.USER_ID), BKTree())
+        yield index
+        cache.delete(index._cache_key(self.USER_ID))
+
+    def _tree(self, index) -> BKTree:
+        return cache.get(index._cache_key(self.USER_ID))
+
+    @pytest.mark.asyncio
+    async def test_added_on_commit(self, index, session_factory):
+        """Test the upload is searchable after the commit, not before"""
+        async with session_factory() as db:
+            await db.execute(text("SELECT 1"))
+            index.add_after_commit(db, self.USER_ID, self.HASH, "uploads/a.jpg", note_id=7)
+            assert len(self._tree(index)) == 0
+
+            await db.commit()
+
+        [(distance, match)] = self._tree(index).search(0xF0F0, 0)
+        assert (match.storage_path, match.note_id) == ("uploads/a.jpg", 7)
+
+    @pytest.mark.asyncio
+    async def test_dropped_on_rollback(self, index, session_factory):
+        """Test a rolled-back upload never reaches the index"""
+        async with session_factory() as db:
+            await db.execute(text("SELECT 1"))
+            index.add_after_commit(db, self.USER_ID, self.HASH, "uploads/a.jpg")
+            await db.rollback()
+
+            # A later commit on the same session must not resurrect it
+            await db.execute(text("SELECT 1"))
+            await db.commit()
+
+        assert len(self._tree(index)) == 0
@@ -0,0 +1,82 @@
+"""Student PIN login across families"""
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.auth import login
+from app.core.database import Base
+from app.core.security import verify_token
+from app.models import User
+from app.schemas.user import UserLogin
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"user_id": 1, "name": "Parent A", "email": "a@example.com", "is_parent": True},
+            {"user_id": 2, "name": "Parent B", "email": "b@example.com", "is_parent": True},
+        ])
+        await conn.execute(insert(User), [
+            # Created before families: no parent_id
+            {"user_id": 3, "name": "Legacy student", "pin": "1234", "parent_id": None, "is_parent": False},
+            {"user_id": 4, "name": "Student A", "pin": "1234", "parent_id": 1, "is_parent": False},
+            {"user_id": 5, "name": "Student B", "pin": "1234", "parent_id": 2, "is_parent": False},
+        ])
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _login_user_id(db, **credentials) -> int:
+    token = await login(UserLogin(**credentials), db=db)
+    return verify_token(token.access_token)["user_id"]
+
+
+@pytest.mark.asyncio
+async def test_shared_pin_logs_in_each_family_and_the_legacy_student(db):
+    assert await _login_user_id(db, pin="1234", family_id=1) == 4
+    assert await _login_user_id(db, pin="1234", family_id=2) == 5
+    assert await _login_user_id(db, pin="1234") == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("credentials", [
+    {"pin": "1234", "family_id": 99},
+    {"pin": "4321"},
+    {"pin": "4321", "family_id": 1},
+])
+async def test_unknown_pin_gets_the_generic_401(db, credentials):
+    with pytest.raises(HTTPException) as exc_info:
+        await login(UserLogin(**credentials), db=db)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid PIN"
+
+
+@pytest.mark.asyncio
+async def test_family_student_needs_family_id(db):
+    await db.execute(insert(User), [
+        {"user_id": 6, "name": "Student C", "pin": "5555", "parent_id": 1, "is_parent": False},
+    ])
+    with pytest.raises(HTTPException) as exc_info:
+        await login(UserLogin(pin="5555"), db=db)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_legacy_pins_stay_globally_unique(db):
+    with pytest.raises(IntegrityError):
+        await db.execute(insert(User), [
+            {"user_id": 6, "name": "Another legacy student", "pin": "1234", "is_parent": False},
+        ])
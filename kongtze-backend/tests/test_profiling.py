@@ -0,0 +1,85 @@
+"""Unit tests for the sampling profiler and task dump"""
+
+import asyncio
+import sys
+import threading
+from collections import Counter
+
+import pytest
+
+from app.core.profiling import (
+    ProfilerBusyError,
+    SamplingProfiler,
+    await_chain,
+    classify_await,
+    collapse_stack,
+    dump_tasks,
+)
+
+
+def test_collapse_stack_is_root_first():
+    def inner():
+        return collapse_stack(sys._getframe())
+
+    stack = inner().split(";")
+    assert stack[-1].startswith("inner (")
+    assert stack[-2].startswith("test_collapse_stack_is_root_first (")
+
+
+def test_render_orders_hottest_first():
+    stacks = Counter({"MainThread;a;b": 2, "MainThread;a;c": 5})
+    assert SamplingProfiler.render(stacks) == "MainThread;a;c 5\nMainThread;a;b 2\n"
+
+
+def test_sample_collects_target_thread_and_rejects_overlap():
+    profiler = SamplingProfiler()
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait, name="waiter")
+    worker.start()
+    try:
+        profiler._lock.acquire()
+        with pytest.raises(ProfilerBusyError):
+            profiler.sample(0.01, 0.001)
+        profiler._lock.release()
+
+        stacks = profiler.sample(0.05, 0.005, {worker.ident})
+    finally:
+        stop.set()
+        worker.join()
+
+    assert stacks
+    assert all(stack.startswith("waiter;") for stack in stacks)
+
+
+def test_classify_prefers_specific_callers_over_transport():
+    assert classify_await(["get_test (app/api/tests.py:10)", "execute (sqlalchemy/ext/asyncio/session.py:1)"]) == "db"
+    assert classify_await([
+        "generate_test_questions (app/services/ai_service.py:80)",
+        "_call_gemini_api (app/services/ai_service.py:30)",
+        "post (httpx/_client.py:1)",
+    ]) == "gemini"
+    assert classify_await(["fetch (app/x.py:1)", "post (httpx/_client.py:1)"]) == "http"
+    assert classify_await(["sleep (asyncio/tasks.py:1)", "<FutureIter>"]) == "other"
+
+
+def test_dump_tasks_follows_nested_awaits():
+    async def leaf(event):
+        await event.wait()
+
+    async def outer(event):
+        await leaf(event)
+
+    async def main():
+        event = asyncio.Event()
+        task = asyncio.create_task(outer(event), name="outer-task")
+        await asyncio.sleep(0)
+        chain = await_chain(task.get_coro())
+        dump = dump_tasks()
+        event.set()
+        await task
+        return chain, dump
+
+    chain, dump = asyncio.run(main())
+    assert chain[0].startswith("outer (") and chain[1].startswith("leaf (")
+    assert [task["name"] for task in dump["tasks"]] == ["outer-task"]
+    assert dump["total"] == 1
@@ -0,0 +1,135 @@
+"""Unit tests for the weekly schedule solver"""
+
+import time
+import pytest
+
+from app.services.schedule_solver import (
+    SubjectPlan,
+    parse_minutes,
+    solve_weekly_schedule,
+    validate_schedule,
+)
+
+SUBJECTS = [
+    SubjectPlan(subject_id=1, name="Math", difficulty=3),
+    SubjectPlan(subject_id=2, name="English", difficulty=2),
+    SubjectPlan(subject_id=3, name="Chinese", difficulty=1),
+    SubjectPlan(subject_id=4, name="Science", difficulty=4),
+]
+
+
+def _dicts(schedule):
+    return [session.to_dict() for session in schedule]
+
+
+class TestSolveWeeklySchedule:
+    """Test that solved schedules satisfy every rule"""
+
+    @pytest.mark.parametrize("subject_count", [1, 2, 3, 4])
+    @pytest.mark.parametrize("start_time", ["08:00", "14:00", "18:50", "21:00"])
+    def test_schedule_is_valid(self, subject_count, start_time):
+        """Test that any subject count and start time gives a valid week"""
+        subjects = SUBJECTS[:subject_count]
+
+        schedule = solve_weekly_schedule(subjects, hours_per_day=2, start_time=start_time)
+
+        assert validate_schedule(_dicts(schedule), subject_count) == []
+        assert {s.day_of_week for s in schedule} == set(range(7))
+
+    def test_full_week_shape(self):
+        """Test weekday 1+2 and weekend 2-session structure"""
+        schedule = solve_weekly_schedule(SUBJECTS)
+
+        per_day = [sum(1 for s in schedule if s.day_of_week == d) for d in range(7)]
+        assert per_day == [3, 3, 3, 3, 3, 2, 2]
+
+    def test_balanced_and_difficulty_weighted(self):
+        """Test subjects are spread evenly, with harder ones getting extra sessions"""
+        schedule = solve_weekly_schedule(SUBJECTS)
+
+        counts = {s.subject_id: 0 for s in SUBJECTS}
+        for session in schedule:
+            counts[session.subject_id] += 1
+
+        assert max(counts.values()) - min(counts.values()) <= 1
+        assert counts[4] >= counts[3]
+
+    def test_durations_follow_difficulty(self):
+        """Test advanced subjects get 45 minutes with a low daily target"""
+        schedule = solve_weekly_schedule(SUBJECTS, hours_per_day=0.5)
+
+        for session in schedule:
+            expected = 45 if session.difficulty >= 3 else 30
+            assert session.duration_minutes == expected
+
+    def test_hours_per_day_lengthens_sessions(self):
+        """Test a high daily target lengthens sessions to 45 minutes"""
+        schedule = solve_weekly_schedule(SUBJECTS, hours_per_day=3)
+
+        assert all(s.duration_minutes == 45 for s in schedule)
+
+    def test_deterministic(self):
+        """Test the same input always gives the same schedule"""
+        assert _dicts(solve_weekly_schedule(SUBJECTS)) == _dicts(solve_weekly_schedule(SUBJECTS))
+
+    def test_fast(self):
+        """Test solving is far below an LLM round-trip"""
+        started = time.perf_counter()
+        for _ in range(100):
+            solve_weekly_schedule(SUBJECTS)
+        assert (time.perf_counter() - started) / 100 < 0.01
+
+    @pytest.mark.parametrize("end_time", ["21:00", "21:15", "22:00"])
+    def test_sessions_end_by_end_time(self, end_time):
+        """Test every session ends by end_time and the week stays valid"""
+        schedule = solve_weekly_schedule(SUBJECTS, hours_per_day=3, start_time="18:50", end_time=end_time)
+
+        assert validate_schedule(_dicts(schedule), len(SUBJECTS)) == []
+        assert all(s.start_minutes + s.duration_minutes <= parse_minutes(end_time) for s in schedule)
+
+    def test_end_time_shortens_late_sessions(self):
+        """Test the last after-dinner slot is cut to 30 minutes to fit"""
+        schedule = solve_weekly_schedule(SUBJECTS, hours_per_day=3, end_time="21:00")
+
+        last_slots = [s for s in schedule if s.start_minutes == 20 * 60 + 30]
+        assert last_slots and all(s.duration_minutes == 30 for s in last_slots)
+
+    def test_end_time_too_early(self):
+        """Test an end time before a required slot can finish is rejected"""
+        with pytest.raises(ValueError, match="too early"):
+            solve_weekly_schedule(SUBJECTS, end_time="20:00")
+        # One subject only needs the pre-dinner session, moved earlier
+        schedule = solve_weekly_schedule(SUBJECTS[:1], start_time="18:00", end_time="18:00")
+        assert all(s.start_minutes + s.duration_minutes <= 18 * 60 for s in schedule if s.day_of_week < 5)
+
+    def test_requires_subjects(self):
+        """Test that an empty subject list is rejected"""
+        with pytest.raises(ValueError):
+            solve_weekly_schedule([])
+
+
+class TestValidateSchedule:
+    """Test rule checking on externally supplied schedules"""
+
+    def test_detects_violations(self):
+        """Test dinner overlap, duplicates, durations and weekend window"""
+        sessions = [
+            {"day_of_week": 0, "subject_name": "Math", "start_time": "18:45:00", "duration_minutes": 30},
+            {"day_of_week": 0, "subject_name": "Math", "start_time": "19:40:00", "duration_minutes": 60},
+            {"day_of_week": 5, "subject_name": "Math", "start_time": "17:00:00", "duration_minutes": 30},
+        ]
+
+        errors = validate_schedule(sessions)
+
+        assert any("dinner" in e for e in errors)
+        assert any("duplicate subject" in e for e in errors)
+        assert any("Invalid duration 60" in e for e in errors)
+        assert any("between 11:00 and 16:00" in e for e in errors)
+
+    def test_parse_minutes(self):
+        """Test time parsing and rejection of bad values"""
+        assert parse_minutes("19:40:00") == 1180
+        with pytest.raises(ValueError):
+            parse_minutes("25:00")
+        with pytest.raises(ValueError):
+            parse_minutes("noon")
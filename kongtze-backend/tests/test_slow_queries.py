@@ -0,0 +1,49 @@
+"""Unit tests for slow-query grouping"""
+
+from app.core.slow_queries import SlowQueryLog, normalize_statement, parameter_shape
+
+
+def test_normalize_statement_groups_paramstyles_and_literals():
+    expected = "SELECT rewards.points FROM rewards WHERE rewards.user_id = ? AND rewards.points > ?"
+    assert normalize_statement(
+        "SELECT rewards.points FROM rewards\n  WHERE rewards.user_id = $1::INTEGER AND rewards.points > 10"
+    ) == expected.replace("= ?", "= ?::INTEGER")
+    assert normalize_statement(
+        "SELECT rewards.points FROM rewards WHERE rewards.user_id = %(user_id_1)s AND rewards.points > 10"
+    ) == expected
+    assert normalize_statement("SELECT * FROM users WHERE name = 'O''Brien' AND pin IN (?, ?, ?)") == (
+        "SELECT * FROM users WHERE name = ? AND pin IN (?...)"
+    )
+    assert normalize_statement("SELECT anon_1.x FROM t WHERE id IN ($1::INTEGER, $2::INTEGER)") == (
+        "SELECT anon_1.x FROM t WHERE id IN (?...)"
+    )
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"user_id": 7, "ids": [1, 2, 3]}) == {"user_id": "int", "ids": "list[3]"}
+    assert parameter_shape((7, "secret")) == ["int", "str"]
+    assert parameter_shape([(1,), (2,)], executemany=True) == "2 x ['int']"
+
+
+def test_record_aggregates_and_orders():
+    log = SlowQueryLog(max_statements=10)
+    log.record("SELECT * FROM rewards WHERE user_id = $1", 300.0, route="GET /api/rewards", location="a.py:1")
+    log.record("SELECT * FROM rewards WHERE user_id = $1", 500.0, route="GET /api/rewards", location="a.py:1")
+    log.record("SELECT * FROM tests WHERE test_id = $1", 900.0)
+
+    by_total = log.top(order_by="total")
+    assert [entry["count"] for entry in by_total] == [1, 2]
+    rewards = log.top(order_by="count")[0]
+    assert rewards["total_ms"] == 800.0
+    assert rewards["max_ms"] == 500.0
+    assert rewards["routes"] == {"GET /api/rewards": 2}
+    assert rewards["locations"] == {"a.py:1": 2}
+
+
+def test_record_evicts_fastest_statement_when_full():
+    log = SlowQueryLog(max_statements=2)
+    log.record("SELECT 1 FROM a", 300.0)
+    log.record("SELECT 1 FROM b", 900.0)
+    log.record("SELECT 1 FROM c", 400.0)
+
+    assert {entry["statement"] for entry in log.top()} == {"SELECT ? FROM b", "SELECT ? FROM c"}
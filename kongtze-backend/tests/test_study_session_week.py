@@ -0,0 +1,89 @@
+"""Replacing the weekly study schedule in one request"""
+
+from datetime import time
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.study_sessions import replace_week
+from app.core.database import Base
+from app.models import StudySession, Subject, User
+from app.schemas.study_session import StudySessionWeekReplace
+
+STUDENT = SimpleNamespace(user_id=1)
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"user_id": 1, "name": "Student", "is_parent": False},
+            {"user_id": 2, "name": "Other student", "is_parent": False},
+        ])
+        await conn.execute(insert(Subject), [
+            {"subject_id": 1, "name": "math", "display_name": "Math"},
+            {"subject_id": 2, "name": "english", "display_name": "English"},
+        ])
+        await conn.execute(insert(StudySession), [
+            {"user_id": 1, "subject_id": 1, "day_of_week": 0, "start_time": time(16, 0), "duration_minutes": 30},
+            {"user_id": 2, "subject_id": 1, "day_of_week": 0, "start_time": time(16, 0), "duration_minutes": 30},
+        ])
+    # Same options as AsyncSessionLocal: the route reads rows after committing
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+def _week(*sessions) -> StudySessionWeekReplace:
+    return StudySessionWeekReplace(sessions=[
+        {"subject_id": subject_id, "day_of_week": day, "start_time": start}
+        for subject_id, day, start in sessions
+    ])
+
+
+async def _stored(db, user_id):
+    result = await db.execute(
+        select(StudySession.subject_id, StudySession.day_of_week, StudySession.start_time)
+        .where(StudySession.user_id == user_id)
+        .order_by(StudySession.session_id)
+    )
+    return [tuple(row) for row in result]
+
+
+@pytest.mark.asyncio
+async def test_replaces_the_users_week(db):
+    week = _week((2, 6, "11:00"), (1, 0, "19:40"), (2, 0, "15:00"))
+
+    response = await replace_week(week, db=db, current_user=STUDENT)
+
+    # Stored in request order, so IDs follow it; returned in calendar order
+    assert await _stored(db, 1) == [(2, 6, time(11, 0)), (1, 0, time(19, 40)), (2, 0, time(15, 0))]
+    assert [(s.day_of_week, s.start_time) for s in response] == [
+        (0, time(15, 0)), (0, time(19, 40)), (6, time(11, 0)),
+    ]
+    by_id = sorted(response, key=lambda s: s.session_id)
+    assert [(s.subject_id, s.day_of_week) for s in by_id] == [(2, 6), (1, 0), (2, 0)]
+    # Other users' sessions are untouched
+    assert await _stored(db, 2) == [(1, 0, time(16, 0))]
+
+
+@pytest.mark.asyncio
+async def test_unknown_subject_changes_nothing(db):
+    with pytest.raises(HTTPException) as exc_info:
+        await replace_week(_week((1, 1, "16:00"), (99, 2, "16:00")), db=db, current_user=STUDENT)
+    await db.rollback()
+
+    assert exc_info.value.status_code == 404
+    assert "99" in exc_info.value.detail
+    assert await _stored(db, 1) == [(1, 0, time(16, 0))]
@@ -0,0 +1,198 @@
+"""Unit tests for streaming upload staging and blob deletion"""
+
+import hashlib
+import io
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models import StoredFile
+from app.services.file_storage import (
+    FileStorageService,
+    UploadTooLargeError,
+    is_image_header,
+)
+
+
+def _jpeg_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (10, 20, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 256)
+    return FileStorageService()
+
+
+class TestIsImageHeader:
+    """Test magic-byte sniffing"""
+
+    def test_known_formats(self):
+        assert is_image_header(_jpeg_bytes()[:16])
+        assert is_image_header(b"\x89PNG\r\n\x1a\n\x00\x00")
+        assert is_image_header(b"RIFF\x10\x00\x00\x00WEBPVP8 ")
+
+    def test_rejects_other_files(self):
+        assert not is_image_header(b"%PDF-1.7")
+        assert not is_image_header(b"RIFF\x10\x00\x00\x00WAVEfmt ")
+
+
+class TestStageUpload:
+    """Test streaming an upload to a temp file"""
+
+    @pytest.mark.asyncio
+    async def test_streams_and_hashes(self, storage):
+        """Test that the staged file matches the upload and its SHA256"""
+        data = _jpeg_bytes()
+        staged = await storage.stage_upload(UploadFile(io.BytesIO(data)))
+
+        assert staged.size == len(data)
+        assert staged.content_hash == hashlib.sha256(data).hexdigest()
+        assert staged.path.read_bytes() == data
+
+        await staged.discard()
+        assert not staged.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_upload(self, storage, monkeypatch):
+        """Test that the size limit is enforced while streaming"""
+        monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 300)
+        data = _jpeg_bytes() + b"\x00" * 1000
+
+        with pytest.raises(UploadTooLargeError):
+            await storage.stage_upload(UploadFile(io.BytesIO(data)))
+
+        assert list((storage.storage_path / storage.TMP_DIR).iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_image(self, storage):
+        """Test that non-image uploads fail on the first chunk"""
+        with pytest.raises(ValueError):
+            await storage.stage_upload(UploadFile(io.BytesIO(b"%PDF-1.7" + b"x" * 500)))
+
+        assert list((storage.storage_path / storage.TMP_DIR).iterdir()) == []
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession)
+    await engine.dispose()
+
+
+class TestDeleteFile:
+    """Test that unreferenced blobs leave the disk only on commit"""
+
+    BLOB = "blobs/ab/abc.jpg"
+
+    @pytest_asyncio.fixture
+    async def blob(self, storage, session_factory):
+        blob = storage.storage_path / self.BLOB
+        blob.parent.mkdir(parents=True)
+        blob.write_bytes(_jpeg_bytes())
+        derivative = storage.derivative_path(self.BLOB, "thumb", ".webp")
+        derivative.parent.mkdir(parents=True)
+        derivative.write_bytes(b"webp")
+        async with session_factory() as db:
+            await db.execute(insert(StoredFile).values(
+                content_hash="abc", storage_path=self.BLOB, size_bytes=1, ref_count=1,
+            ))
+            await db.commit()
+        return blob
+
+    @pytest.mark.asyncio
+    async def test_removed_after_commit(self, storage, session_factory, blob):
+        async with session_factory() as db:
+            assert await storage.delete_file(self.BLOB, db)
+            assert not blob.exists()
+            await db.commit()
+
+        assert not blob.exists()
+        assert list((storage.storage_path / storage.TMP_DIR).iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_restored_on_rollback(self, storage, session_factory, blob):
+        async with session_factory() as db:
+            await storage.delete_file(self.BLOB, db)
+            await db.rollback()
+            assert await db.scalar(select(StoredFile.ref_count)) == 1
+
+        assert blob.exists()
+        assert list((storage.storage_path / storage.TMP_DIR).iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_restored_when_closed_without_commit(self, storage, session_factory, blob):
+        async with session_factory() as db:
+            await storage.delete_file(self.BLOB, db)
+
+        assert blob.exists()
+
+    @pytest.mark.asyncio
+    async def test_kept_while_referenced(self, storage, session_factory, blob):
+        async with session_factory() as db:
+            await db.execute(StoredFile.__table__.update().values(ref_count=2))
+            assert not await storage.delete_file(self.BLOB, db)
+            await db.commit()
+
+        assert blob.exists()
+
+
+class TestStore:
+    """Test that blobs placed for new rows leave the disk without a commit"""
+
+    def _staged(self, storage, name="staged.jpg"):
+        source = storage.storage_path / storage.TMP_DIR / name
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(_jpeg_bytes())
+        return source
+
+    @pytest.mark.asyncio
+    async def test_kept_after_commit(self, storage, session_factory):
+        async with session_factory() as db:
+            stored = await storage.store("abc", self._staged(storage), ".jpg", db)
+            blob = storage.storage_path / stored.storage_path
+            await db.commit()
+
+        assert blob.exists()
+
+    @pytest.mark.asyncio
+    async def test_removed_on_rollback(self, storage, session_factory):
+        async with session_factory() as db:
+            stored = await storage.store("abc", self._staged(storage), ".jpg", db)
+            blob = storage.storage_path / stored.storage_path
+            assert blob.exists()
+            await db.rollback()
+
+            # A later commit on the same session leaves it gone
+            await db.commit()
+
+        assert not blob.exists()
+
+    @pytest.mark.asyncio
+    async def test_existing_blob_kept_on_rollback(self, storage, session_factory):
+        async with session_factory() as db:
+            await storage.store("abc", self._staged(storage), ".jpg", db)
+            await db.commit()
+
+        async with session_factory() as db:
+            stored = await storage.store("abc", self._staged(storage), ".jpg", db)
+            assert stored.ref_count == 2
+            blob = storage.storage_path / stored.storage_path
+            await db.rollback()
+
+        assert blob.exists()
@@ -31,7 +31,8 @@ export default function GenerateSchedulePage() {
     subjectDifficulties: {},
     hoursPerDay: 2,
     startTime: '14:00',
-    endTime: '20:00',
+    // Two after-dinner sessions (from 19:40) need until at least 21:00
+    endTime: '21:30',
     goals: '',
     generateTests: false,
   });
@@ -89,9 +90,9 @@ export default function GenerateSchedulePage() {
       );
       setGeneratedSchedule(response.schedule);
       setStep(3);
-    } catch (error) {
+    } catch (error: any) {
       console.error('Failed to generate schedule:', error);
-      alert('Failed to generate schedule. Please try again.');
+      alert(error.detail || 'Failed to generate schedule. Please try again.');
     } finally {
       setIsGenerating(false);
     }
@@ -106,23 +107,20 @@ export default function GenerateSchedulePage() {
         'advanced': 3,
       };
 
-      // Create all sessions from generated schedule
-      const sessionPromises = generatedSchedule.map((session) => {
+      // Replace the weekly schedule with the generated one in a single request
+      const sessions = generatedSchedule.map((session) => {
         const difficultyText = preferences.subjectDifficulties[session.subject_id] || 'intermediate';
         const difficultyLevel = difficultyMap[difficultyText] || 2;
 
-        return studySessionsAPI.create(
-          {
-            subject_id: session.subject_id,
-            day_of_week: session.day_of_week,
-            start_time: session.start_time,
-            duration_minutes: session.duration_minutes,
-            difficulty_level: difficultyLevel,
-          },
-          token!
-        );
+        return {
+          subject_id: session.subject_id,
+          day_of_week: session.day_of_week,
+          start_time: session.start_time,
+          duration_minutes: session.duration_minutes,
+          difficulty_level: difficultyLevel,
+        };
       });
-      await Promise.all(sessionPromises);
+      await studySessionsAPI.replaceWeek(sessions, token!);
 
       // Create tests if checkbox is checked
       if (preferences.generateTests) {
@@ -319,7 +317,7 @@ export default function GenerateSchedulePage() {
               </div>
               <div>
                 <label className="block text-sm font-semibold text-gray-900 mb-3">
-                  Preferred End Time
+                  Latest End Time
                 </label>
                 <input
                   type="time"
@@ -459,6 +457,9 @@ export default function GenerateSchedulePage() {
             </div>
           </div>
 
+          <p className="text-sm text-gray-600 mb-3">
+            Accepting replaces your current weekly schedule.
+          </p>
           <div className="flex gap-3">
             <button
               onClick={() => setStep(2)}
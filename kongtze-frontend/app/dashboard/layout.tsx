@@ -109,7 +109,7 @@ export default function DashboardLayout({
                 <div className="text-right">
                   <p className="text-sm font-medium text-gray-900">{user?.name}</p>
                   <p className="text-xs text-gray-500">
-                    {user?.is_parent ? 'Parent' : 'Student'}
+                    {user?.is_parent ? `Parent · Family ID ${user.user_id}` : 'Student'}
                   </p>
                 </div>
                 <button
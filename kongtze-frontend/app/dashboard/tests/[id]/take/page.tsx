@@ -5,11 +5,12 @@
 
 'use client';
 
-import { useState, useEffect, use } from 'react';
+import { useState, useEffect, useRef, use } from 'react';
 import { useRouter } from 'next/navigation';
 import { useQuery, useMutation } from '@tanstack/react-query';
 import { useAuth } from '@/contexts/auth-context';
 import { testsAPI } from '@/lib/api';
+import type { TestSubmission } from '@/lib/types';
 
 export default function TakeTestPage({ params }: { params: Promise<{ id: string }> }) {
   const router = useRouter();
@@ -23,6 +24,10 @@ export default function TakeTestPage({ params }: { params: Promise<{ id: string
   const [questionTimeLeft, setQuestionTimeLeft] = useState(0);
   const [hasStarted, setHasStarted] = useState(false);
 
+  // Milliseconds spent on each question, and which question is on screen since when
+  const questionTimesRef = useRef<Record<string, number>>({});
+  const shownQuestionRef = useRef<{ questionId: number; shownAt: number } | null>(null);
+
   // Fetch test data
   const { data: test, isLoading } = useQuery({
     queryKey: ['test', testId],
@@ -32,8 +37,7 @@ export default function TakeTestPage({ params }: { params: Promise<{ id: string
 
   // Submit test mutation
   const submitMutation = useMutation({
-    mutationFn: (data: { test_id: number; answers: Record<string, string>; time_taken_seconds: number }) =>
-      testsAPI.submit(data, token!),
+    mutationFn: (data: TestSubmission) => testsAPI.submit(data, token!),
     onSuccess: (result) => {
       router.push(`/dashboard/tests/results/${result.result_id}`);
     },
@@ -51,12 +55,28 @@ export default function TakeTestPage({ params }: { params: Promise<{ id: string
     }
   }, [test, hasStarted]);
 
+  // Add the time since the shown question appeared to its total
+  const recordQuestionTime = () => {
+    const shown = shownQuestionRef.current;
+    if (shown) {
+      const now = Date.now();
+      questionTimesRef.current[shown.questionId] =
+        (questionTimesRef.current[shown.questionId] ?? 0) + (now - shown.shownAt);
+      shown.shownAt = now;
+    }
+  };
+
   // Reset question timer when changing questions
   useEffect(() => {
     if (test && hasStarted) {
       const currentQuestion = test.questions[currentQuestionIndex];
       if (currentQuestion) {
         setQuestionTimeLeft(currentQuestion.time_limit_seconds);
+        shownQuestionRef.current = { questionId: currentQuestion.question_id, shownAt: Date.now() };
+        return () => {
+          recordQuestionTime();
+          shownQuestionRef.current = null;
+        };
       }
     }
   }, [currentQuestionIndex, test, hasStarted]);
@@ -95,10 +115,15 @@ export default function TakeTestPage({ params }: { params: Promise<{ id: string
   const handleSubmit = () => {
     if (test) {
       const timeTaken = (test.time_limit_minutes * 60) - timeLeft;
+      recordQuestionTime();
+      const questionTimes = Object.fromEntries(
+        Object.entries(questionTimesRef.current).map(([questionId, ms]) => [questionId, Math.round(ms / 1000)])
+      );
       submitMutation.mutate({
         test_id: testId,
         answers,
         time_taken_seconds: timeTaken,
+        question_times: questionTimes,
       });
     }
   };
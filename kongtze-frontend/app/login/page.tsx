@@ -4,7 +4,7 @@
 
 'use client';
 
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { useForm } from 'react-hook-form';
 import { zodResolver } from '@hookform/resolvers/zod';
@@ -21,8 +21,13 @@ const parentLoginSchema = z.object({
 // Student login schema
 const studentLoginSchema = z.object({
   pin: z.string().regex(/^\d{4}$/, 'PIN must be exactly 4 digits'),
+  // Empty only for students created before family IDs
+  familyId: z.string().regex(/^\d*$/, 'Family ID must be a number'),
 });
 
+// Remembered so a student device only needs the family ID once
+const FAMILY_ID_KEY = 'kongtze_family_id';
+
 type ParentLoginForm = z.infer<typeof parentLoginSchema>;
 type StudentLoginForm = z.infer<typeof studentLoginSchema>;
 
@@ -47,9 +52,17 @@ export default function LoginPage() {
     resolver: zodResolver(studentLoginSchema),
     defaultValues: {
       pin: '',
+      familyId: '',
     },
   });
 
+  useEffect(() => {
+    const savedFamilyId = localStorage.getItem(FAMILY_ID_KEY);
+    if (savedFamilyId) {
+      studentForm.setValue('familyId', savedFamilyId);
+    }
+  }, [studentForm]);
+
   const handleParentLogin = async (data: ParentLoginForm) => {
     setIsLoading(true);
     setError('');
@@ -69,7 +82,13 @@ export default function LoginPage() {
     setError('');
 
     try {
-      await login({ pin: data.pin });
+      await login({
+        pin: data.pin,
+        family_id: data.familyId ? Number(data.familyId) : undefined,
+      });
+      if (data.familyId) {
+        localStorage.setItem(FAMILY_ID_KEY, data.familyId);
+      }
       router.push('/dashboard');
     } catch (err: any) {
       setError(err.detail || 'Invalid PIN');
@@ -197,6 +216,24 @@ export default function LoginPage() {
                   )}
                 </div>
 
+                <div>
+                  <label className="block text-sm font-medium text-gray-700 mb-1">
+                    Family ID
+                  </label>
+                  <input
+                    type="text"
+                    inputMode="numeric"
+                    {...studentForm.register('familyId')}
+                    className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+                    placeholder="e.g. 42"
+                  />
+                  {studentForm.formState.errors.familyId && (
+                    <p className="mt-1 text-sm text-red-600">
+                      {studentForm.formState.errors.familyId.message}
+                    </p>
+                  )}
+                </div>
+
                 <button
                   type="submit"
                   disabled={isLoading}
@@ -206,7 +243,7 @@ export default function LoginPage() {
                 </button>
 
                 <p className="text-sm text-gray-600 text-center">
-                  Ask your parent for your PIN
+                  Ask your parent for your PIN and family ID
                 </p>
               </div>
             </form>
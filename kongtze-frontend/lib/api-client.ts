@@ -4,6 +4,9 @@
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
 
+// Paginated list endpoints return at most this many rows per request
+const MAX_PAGE_SIZE = 200;
+
 export interface APIError {
   detail: string;
   status?: number;
@@ -64,6 +67,27 @@ class APIClient {
     return this.handleResponse<T>(response);
   }
 
+  /**
+   * Fetch every page of a paginated list endpoint, following X-Next-Cursor
+   */
+  async getAllPages<T>(endpoint: string, token?: string): Promise<T[]> {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const items: T[] = [];
+    let cursor: string | null = null;
+
+    do {
+      const cursorParam: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${this.baseURL}${endpoint}${separator}limit=${MAX_PAGE_SIZE}${cursorParam}`, {
+        method: 'GET',
+        headers: this.getHeaders(token),
+      });
+      cursor = response.ok ? response.headers.get('X-Next-Cursor') : null;
+      items.push(...(await this.handleResponse<T[]>(response)));
+    } while (cursor);
+
+    return items;
+  }
+
   async post<T>(endpoint: string, data?: any, token?: string): Promise<T> {
     const response = await fetch(`${this.baseURL}${endpoint}`, {
       method: 'POST',
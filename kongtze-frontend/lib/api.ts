@@ -66,6 +66,10 @@ export const studySessionsAPI = {
   create: (data: StudySessionCreate, token: string) =>
     apiClient.post<StudySession>('/study-sessions', data, token),
 
+  // Replaces the whole weekly schedule in one request and transaction
+  replaceWeek: (sessions: StudySessionCreate[], token: string) =>
+    apiClient.put<StudySession[]>('/study-sessions/week', { sessions }, token),
+
   update: (id: number, data: StudySessionUpdate, token: string) =>
     apiClient.put<StudySession>(`/study-sessions/${id}`, data, token),
 
@@ -83,7 +87,7 @@ export const testsAPI = {
 
   getAll: (token: string, subjectId?: number) => {
     const params = subjectId ? `?subject_id=${subjectId}` : '';
-    return apiClient.get<Test[]>(`/tests${params}`, token);
+    return apiClient.getAllPages<Test>(`/tests${params}`, token);
   },
 
   getById: (id: number, token: string) =>
@@ -96,7 +100,7 @@ export const testsAPI = {
     apiClient.get<TestResultWithReview>(`/tests/results/${resultId}`, token),
 
   getAllResults: (token: string) =>
-    apiClient.get<TestResult[]>('/tests/results', token),
+    apiClient.getAllPages<TestResult>('/tests/results', token),
 };
 
 // Homework API
@@ -116,7 +120,7 @@ export const homeworkAPI = {
     if (reviewed !== undefined) params.append('reviewed', reviewed.toString());
 
     const query = params.toString() ? `?${params.toString()}` : '';
-    return apiClient.get<Homework[]>(`/homework${query}`, token);
+    return apiClient.getAllPages<Homework>(`/homework${query}`, token);
   },
 
   getById: (id: number, token: string) =>
@@ -142,7 +146,7 @@ export const classNotesAPI = {
 
   getAll: (token: string, subjectId?: number) => {
     const params = subjectId ? `?subject_id=${subjectId}` : '';
-    return apiClient.get<ClassNote[]>(`/class-notes${params}`, token);
+    return apiClient.getAllPages<ClassNote>(`/class-notes${params}`, token);
   },
 
   getById: (id: number, token: string) =>
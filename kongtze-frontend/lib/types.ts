@@ -9,6 +9,7 @@ export interface User {
   name: string;
   email?: string;
   is_parent: boolean;
+  parent_id?: number;
   created_at: string;
   updated_at: string;
 }
@@ -27,6 +28,7 @@ export interface UserCreateStudent {
 export interface UserLogin {
   email?: string;
   pin?: string;
+  family_id?: number; // Student login: the parent's user_id
   password?: string;
 }
 
@@ -122,6 +124,7 @@ export interface TestSubmission {
   test_id: number;
   answers: Record<string, string>; // { question_id: "A" }
   time_taken_seconds: number;
+  question_times?: Record<string, number>; // { question_id: seconds on screen }
 }
 
 export interface TestResult {